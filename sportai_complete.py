@@ -25,18 +25,34 @@ import sqlite3
 import hashlib
 import uuid
 import json
+import csv
+import sys
+import argparse
 import time
 import random
-from datetime import datetime, timedelta
+import threading
+import queue
+import atexit
+import functools
+import contextvars
+import re
+import bisect
+import heapq
+import math
+import statistics
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union, Callable, Iterator
 from dataclasses import dataclass, asdict
 from enum import Enum
 import logging
 import secrets
 import smtplib
-from email.mime.text import MimeText
-from email.mime.multipart import MimeMultipart
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -54,6 +70,56 @@ class Config:
     
     # Database configuration
     DATABASE_PATH = "data/sportai_enterprise.db"
+    DB_POOL_SIZE = 8  # Max reader connections per database file
+    DB_POOL_TIMEOUT = 10.0  # Seconds to wait for a free pooled connection
+    DB_HEALTH_CHECK_INTERVAL = 60  # Idle seconds before a connection is re-validated
+    DB_BUSY_RETRIES = 5  # Retries when SQLite reports the database is busy/locked
+    DB_BUSY_BACKOFF = 0.05  # Base backoff in seconds, doubled on each retry
+    DB_FETCH_BATCH_SIZE = 1000  # Rows per fetchmany() call when streaming results
+    PAGE_SIZE = 50  # Default rows per keyset page in list views
+    BOOKING_SLOT_MINUTES = 15  # Granularity of availability bitmaps
+    OPERATING_HOURS = (6, 22)  # Opening and closing hour used as the utilization denominator
+    UTILIZATION_WINDOW_DAYS = 28  # Rolling booking window (half past, half ahead) for utilization
+    MEMBER_SEARCH_LIMIT = 10  # Ranked matches returned by member quick find
+    MEMBER_SEARCH_CANDIDATES = 1000  # Matches ranked by bm25 before falling back to prefix order
+    RENTAL_DEFAULT_DAYS = 3  # Loan period for equipment check-outs
+    RENTAL_REVENUE_DAYS = 30  # Window of settled rentals counted as equipment monthly revenue
+    EQUIPMENT_WEAR_PER_UNIT_DAY = 0.5  # Condition points lost per rented unit-day, spread over the fleet
+    MAINTENANCE_MIN_CONDITION = 7.0  # Condition score at which equipment is due for service
+    MAINTENANCE_INTERVAL_DAYS = 90  # Days until the next scheduled service after maintenance
+    MAINTENANCE_RATE_WINDOW_DAYS = 30  # Settled rentals used to estimate each item's wear rate
+    MAINTENANCE_REFRESH_SECONDS = 300  # Background resync of the maintenance queue
+    REGISTRATION_BATCH_SIZE = 500  # Most registration requests committed in one transaction
+    REGISTRATION_BATCH_WAIT = 0.002  # Seconds to wait for a burst to gather after the first request
+    REGISTRATION_TIMEOUT = 10.0  # Seconds a caller waits for its registration to commit
+    TOURNAMENT_GAME_MINUTES = 60  # Default fixture length
+    TOURNAMENT_REST_MINUTES = 30  # Default minimum break for a team between fixtures
+    TREND_WINDOW_DAYS = 30  # Days of member growth and revenue on the dashboard
+    UTILIZATION_TREND_DAYS = 7  # Days of booked occupancy on the dashboard
+    FORECAST_HORIZON_MONTHS = 12  # Months ahead on the predictive analytics charts
+    FORECAST_HISTORY_MONTHS = 36  # Completed months of history the forecast models are fitted on
+    FORECAST_MIN_MONTHS = 4  # Fewest months of history worth forecasting from
+    FORECAST_INTERVAL = 0.9  # Coverage of forecast prediction intervals
+    DASHBOARD_REFRESH_SECONDS = 60  # Background rebuild of the shared dashboard snapshot (writes trigger sooner)
+    
+    # Shared query result cache (LRU, invalidated by writes to the tables a query reads)
+    QUERY_CACHE_MAX_ENTRIES = 512
+    QUERY_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Approximate in-memory size bound
+    QUERY_CACHE_TTL = None  # Optional default expiry in seconds; None = until invalidated
+    
+    # Pragma profiles applied to every new connection
+    DB_PRAGMA_PROFILE = 'concurrent'
+    DB_PRAGMA_PROFILES = {
+        'default': {},
+        'concurrent': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'cache_size': -64000,  # Negative = KiB, i.e. 64 MB
+            'mmap_size': 268435456,  # 256 MB
+            'temp_store': 'MEMORY',
+            'busy_timeout': 5000  # Milliseconds
+        }
+    }
     
     # Security settings
     SECRET_KEY = secrets.token_hex(32)
@@ -198,298 +264,1154 @@ class Sponsor:
     benefits: List[str]
     created_at: datetime
 
+@dataclass
+class InsightRule:
+    """Declarative insight: a condition over one frame and the card shown when it holds.
+    
+    'threshold' rules compare an aggregate of the frame with threshold, 'entity' rules fire when
+    any row matches `where`, and 'trend' rules compare the percent change between the last
+    `window` rows of a series and the window before it with threshold.
+    """
+    name: str
+    frame: str
+    kind: str
+    type: str
+    priority: str
+    title: str
+    description: str  # Formatted with value, count, names and threshold
+    impact: str
+    action: str
+    column: Optional[str] = None
+    aggregate: str = 'mean'  # mean, sum, count, or share (percent of rows, by weight, matching where)
+    where: Optional[str] = None  # pandas query: rows aggregated, matched by an entity rule, or counted by share
+    weight: Optional[str] = None  # Column holding each row's weight in pre-grouped frames
+    op: str = '>'
+    threshold: float = 0.0
+    window: int = 7
+    sort_by: Optional[str] = None  # Entity rules name their first matches in this order
+    ascending: bool = True
+
+@dataclass(frozen=True)
+class DashboardSnapshot:
+    """Dashboard summary, trends and insights as of one moment, shared by every session"""
+    summary: Dict[str, Any]
+    trends: Dict[str, List[Dict]]
+    insights: List[Dict]
+    computed_at: datetime
+    build_ms: float
+    versions: tuple  # Table versions the snapshot was built from
+
 # =============================================================================
 # DATABASE LAYER
 # =============================================================================
 
+@st.cache_resource
+def _process_state() -> Dict[str, Any]:
+    """Process-lifetime registry that survives Streamlit reruns.
+    
+    Streamlit re-executes this module on every rerun, so class attributes and
+    module globals are rebuilt each time; shared state must live here instead.
+    """
+    return {}
+
+ALLOWED_PRAGMAS = {'journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'temp_store', 'busy_timeout'}
+
+def resolve_pragma_profile(profile: Union[str, Dict, None]) -> Dict[str, Any]:
+    """Resolve a profile name or explicit pragma dict into validated pragmas"""
+    if profile is None:
+        return {}
+    
+    pragmas = Config.DB_PRAGMA_PROFILES[profile] if isinstance(profile, str) else profile
+    
+    for name, value in pragmas.items():
+        # Pragma values cannot be bound as parameters, so only allow plain tokens
+        if name not in ALLOWED_PRAGMAS:
+            raise ValueError(f"Unsupported pragma: {name}")
+        if not isinstance(value, int) and not str(value).isalnum():
+            raise ValueError(f"Invalid value for pragma {name}: {value!r}")
+    return dict(pragmas)
+
+def is_busy_error(error: Exception) -> bool:
+    """True for SQLITE_BUSY / SQLITE_LOCKED errors that are worth retrying"""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    code = getattr(error, 'sqlite_errorcode', None)
+    if code is not None:
+        return code & 0xFF in (5, 6)  # SQLITE_BUSY, SQLITE_LOCKED
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+class ConnectionPool:
+    """Process-wide SQLite connection pool with pooled readers and a single writer"""
+    
+    def __init__(self, db_path: str, size: int = Config.DB_POOL_SIZE,
+                 timeout: float = Config.DB_POOL_TIMEOUT,
+                 health_check_interval: float = Config.DB_HEALTH_CHECK_INTERVAL,
+                 pragmas: Optional[Dict[str, Any]] = None):
+        self.db_path = db_path
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.pragmas = pragmas or {}
+        
+        self._idle = queue.LifoQueue()  # (connection, last_used) pairs, most recent first
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+        
+        self._writer = None
+        self._writer_last_used = 0.0
+        self._writer_lock = threading.RLock()
+        self._written_tables: set = set()  # Filled by the writer's authorizer
+        
+        self._stats = {
+            'reader_checkouts': 0,
+            'reader_hits': 0,
+            'reader_misses': 0,
+            'reader_waits': 0,
+            'writer_checkouts': 0,
+            'writer_waits': 0,
+            'wait_time': 0.0,
+            'health_check_failures': 0,
+            'busy_retries': 0
+        }
+    
+    def _connect(self, writer: bool = False) -> sqlite3.Connection:
+        """Open a new connection usable from any thread"""
+        # The writer's statement cache is disabled so the authorizer sees every statement
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False,
+                               cached_statements=0 if writer else 128)
+        conn.row_factory = sqlite3.Row
+        
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        
+        if writer:
+            conn.set_authorizer(self._track_writes)
+        return conn
+    
+    def _track_writes(self, action: int, arg1, arg2, db_name, source) -> int:
+        """Authorizer that records which tables the writer modifies (including via triggers)"""
+        if action in WRITE_ACTIONS:
+            self._written_tables.add(arg1)
+        elif action in SCHEMA_ACTIONS:
+            self._written_tables.add('*')
+        return sqlite3.SQLITE_OK
+    
+    def take_written_tables(self) -> set:
+        """Tables written since the last call; only meaningful while holding the writer"""
+        with self._writer_lock:
+            tables, self._written_tables = self._written_tables, set()
+            return tables
+    
+    def _is_healthy(self, conn: sqlite3.Connection) -> bool:
+        """Cheap liveness probe for a connection that has been idle"""
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            with self._lock:
+                self._stats['health_check_failures'] += 1
+            return False
+    
+    def _validate(self, conn: sqlite3.Connection, last_used: float, writer: bool = False) -> sqlite3.Connection:
+        """Re-check connections idle longer than the health check interval"""
+        if time.monotonic() - last_used < self.health_check_interval or self._is_healthy(conn):
+            return conn
+        
+        logger.warning(f"Replacing unhealthy pooled connection for {self.db_path}")
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        return self._connect(writer)
+    
+    def _record(self, key: str, waited: float = 0.0):
+        with self._lock:
+            self._stats[key] += 1
+            self._stats['wait_time'] += waited
+    
+    def _acquire_reader(self) -> sqlite3.Connection:
+        """Take an idle reader, open a new one under the size limit, or wait"""
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+        
+        try:
+            conn, last_used = self._idle.get_nowait()
+            self._record('reader_hits')
+            return self._validate(conn, last_used)
+        except queue.Empty:
+            pass
+        
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                self._created += 1
+        
+        if can_create:
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+            self._record('reader_misses')
+            return conn
+        
+        start = time.perf_counter()
+        try:
+            conn, last_used = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No pooled connection available after {self.timeout}s")
+        self._record('reader_waits', time.perf_counter() - start)
+        return self._validate(conn, last_used)
+    
+    def _release_reader(self, conn: sqlite3.Connection):
+        """Return a reader to the idle queue, or close it if the pool is shut down"""
+        if self._closed:
+            conn.close()
+            with self._lock:
+                self._created -= 1
+            return
+        self._idle.put((conn, time.monotonic()))
+    
+    @contextmanager
+    def reader(self, dedicated: bool = False):
+        """Check out a read connection, reusing the one this thread already holds.
+        
+        A dedicated checkout is never shared with or handed to nested readers, so it
+        can stay open across yields (e.g. inside a generator) without another caller
+        returning it to the pool underneath.
+        """
+        held = None if dedicated else getattr(self._local, 'reader', None)
+        if held is not None:
+            yield held
+            return
+        
+        conn = self._acquire_reader()
+        with self._lock:
+            self._stats['reader_checkouts'] += 1
+        if not dedicated:
+            self._local.reader = conn
+        try:
+            yield conn
+        finally:
+            if not dedicated:
+                self._local.reader = None
+            self._release_reader(conn)
+    
+    @contextmanager
+    def writer(self):
+        """Check out the single writer connection; writes are serialized process-wide"""
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+        
+        start = time.perf_counter()
+        if not self._writer_lock.acquire(blocking=False):
+            if not self._writer_lock.acquire(timeout=self.timeout):
+                raise TimeoutError(f"Writer connection busy for more than {self.timeout}s")
+            self._record('writer_waits', time.perf_counter() - start)
+        
+        try:
+            with self._lock:
+                self._stats['writer_checkouts'] += 1
+            if self._writer is None:
+                self._writer = self._connect(writer=True)
+            else:
+                self._writer = self._validate(self._writer, self._writer_last_used, writer=True)
+            yield self._writer
+        finally:
+            self._writer_last_used = time.monotonic()
+            self._writer_lock.release()
+    
+    def stats(self) -> Dict:
+        """Pool sizing and wait/hit metrics"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = self.size
+            stats['open_readers'] = self._created
+        
+        stats['idle_readers'] = self._idle.qsize()
+        checkouts = stats['reader_checkouts']
+        stats['hit_rate'] = round(stats['reader_hits'] / checkouts, 4) if checkouts else 0.0
+        waits = stats['reader_waits'] + stats['writer_waits']
+        stats['avg_wait_ms'] = round(stats['wait_time'] / waits * 1000, 3) if waits else 0.0
+        return stats
+    
+    def close(self):
+        """Close idle readers and the writer; checked-out readers close on release"""
+        self._closed = True
+        
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+        
+        with self._writer_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+WRITE_ACTIONS = {sqlite3.SQLITE_INSERT, sqlite3.SQLITE_UPDATE, sqlite3.SQLITE_DELETE}
+SCHEMA_ACTIONS = {
+    sqlite3.SQLITE_CREATE_TABLE, sqlite3.SQLITE_DROP_TABLE, sqlite3.SQLITE_ALTER_TABLE,
+    sqlite3.SQLITE_CREATE_INDEX, sqlite3.SQLITE_DROP_INDEX,
+    sqlite3.SQLITE_CREATE_VIEW, sqlite3.SQLITE_DROP_VIEW,
+    sqlite3.SQLITE_CREATE_TRIGGER, sqlite3.SQLITE_DROP_TRIGGER,
+    sqlite3.SQLITE_CREATE_VTABLE, sqlite3.SQLITE_DROP_VTABLE
+}
+
+class QueryResultCache:
+    """Shared LRU cache of query results, invalidated by writes to the tables they read"""
+    
+    def __init__(self, max_entries: int = Config.QUERY_CACHE_MAX_ENTRIES,
+                 max_bytes: int = Config.QUERY_CACHE_MAX_BYTES,
+                 default_ttl: Optional[float] = Config.QUERY_CACHE_TTL):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        
+        # key -> (rows, tables, approximate bytes, expires_at)
+        self._entries: OrderedDict = OrderedDict()
+        self._by_table: Dict[str, set] = {}
+        self._versions: Dict[str, int] = {}
+        self._query_tables: Dict[str, frozenset] = {}  # query text -> tables it reads
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0, 'expirations': 0}
+    
+    @staticmethod
+    def _estimate_size(rows: List[Dict]) -> int:
+        if not rows:
+            return 64
+        sample = rows[0]
+        row_size = sys.getsizeof(sample) + sum(sys.getsizeof(v) for v in sample.values())
+        return 64 + row_size * len(rows)
+    
+    def versions(self, tables: frozenset) -> tuple:
+        """Snapshot of table versions, taken before running a query"""
+        with self._lock:
+            return tuple(self._versions.get(t, 0) for t in sorted(tables))
+    
+    def table_version(self, table: str) -> int:
+        """Counter bumped every time a write to the table is committed"""
+        with self._lock:
+            return self._versions.get(table.lower(), 0)
+    
+    def query_tables(self, query: str) -> Optional[frozenset]:
+        """Tables previously recorded for a query, or None"""
+        with self._lock:
+            return self._query_tables.get(query)
+    
+    def remember_query_tables(self, query: str, tables: frozenset):
+        with self._lock:
+            if len(self._query_tables) >= self.max_entries * 4:
+                self._query_tables.clear()
+            self._query_tables[query] = tables
+    
+    def get(self, key: tuple) -> Optional[List[Dict]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            
+            rows, tables, size, expires_at = entry
+            if expires_at is not None and time.monotonic() >= expires_at:
+                self._remove(key)
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return rows
+    
+    def put(self, key: tuple, rows: List[Dict], tables: frozenset, versions: tuple,
+            ttl: Optional[float] = None):
+        """Store rows unless one of their tables was written while the query ran"""
+        size = self._estimate_size(rows)
+        if size > self.max_bytes:
+            return
+        
+        ttl = ttl if ttl is not None else self.default_ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        
+        with self._lock:
+            if tuple(self._versions.get(t, 0) for t in sorted(tables)) != versions:
+                return
+            if key in self._entries:
+                self._remove(key)
+            
+            self._entries[key] = (rows, tables, size, expires_at)
+            self._bytes += size
+            for table in tables:
+                self._by_table.setdefault(table, set()).add(key)
+            
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                self._stats['evictions'] += 1
+    
+    def _remove(self, key: tuple):
+        rows, tables, size, _ = self._entries.pop(key)
+        self._bytes -= size
+        for table in tables:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+    
+    def invalidate(self, tables: set):
+        """Drop every entry that read one of the written tables ('*' clears everything)"""
+        tables = {t.lower() for t in tables}
+        
+        with self._lock:
+            if '*' in tables:
+                tables |= set(self._by_table) | set(self._versions)
+                tables.discard('*')
+                self._query_tables.clear()  # Schema changed; views may now read other tables
+            
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+                for key in list(self._by_table.pop(table, ())):
+                    if key in self._entries:
+                        self._remove(key)
+                        self._stats['invalidations'] += 1
+    
+    def clear(self):
+        self.invalidate({'*'})
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['approx_bytes'] = self._bytes
+        
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        return stats
+
+def _column_array(values: tuple, dtype: Any = None) -> np.ndarray:
+    """Convert one fetched column to an array, inferring a numeric dtype where possible"""
+    if dtype is not None:
+        kind = np.dtype(dtype).kind
+        if kind in 'iub' and any(v is None for v in values):
+            # Integer arrays cannot hold NULL; widen to float so it becomes NaN
+            dtype, kind = np.float64, 'f'
+        if kind == 'f':
+            values = [np.nan if v is None else v for v in values]
+        return np.array(values, dtype=dtype)
+    
+    first = next((v for v in values if v is not None), None)
+    if isinstance(first, (int, float)) and not isinstance(first, bool):
+        array = np.array(values)
+        if array.dtype.kind in 'iuf':
+            return array
+        if all(v is None or isinstance(v, (int, float)) for v in values):
+            # Numeric column with NULLs: NaN keeps it vectorisable
+            return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+    # Text columns stay object arrays so pandas treats them as strings, not fixed-width unicode
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
 class DatabaseManager:
     """Comprehensive database management with full CRUD operations"""
     
-    def __init__(self, db_path: str = Config.DATABASE_PATH):
+    # Pools and result caches are shared by every DatabaseManager (and Streamlit session) in the process
+    _pools: Dict[str, ConnectionPool] = _process_state().setdefault('db_pools', {})
+    _caches: Dict[str, QueryResultCache] = _process_state().setdefault('db_caches', {})
+    _pools_lock = _process_state().setdefault('db_pools_lock', threading.Lock())
+    
+    # Ordered schema migrations: (version, name, method taking a cursor)
+    MIGRATIONS = [
+        (1, 'initial_schema', '_migrate_initial_schema'),
+        (2, 'sample_data', '_create_sample_data'),
+        (3, 'index_catalog', '_sync_index_catalog'),
+        (4, 'covering_member_stats_index', '_sync_index_catalog'),
+        (5, 'member_search_index', '_migrate_member_search_index'),
+        (6, 'rental_ledger', '_migrate_rental_ledger'),
+        (7, 'event_registrations', '_migrate_event_registrations'),
+        (8, 'tournament_fixtures', '_migrate_tournament_fixtures'),
+        (9, 'revenue_rollups', '_migrate_revenue_rollups'),
+        (10, 'member_join_date_index', '_sync_index_catalog'),
+        (11, 'event_roster_backfill', '_migrate_event_roster_backfill'),
+    ]
+    
+    # Managed secondary indexes: name -> (table, columns[, partial WHERE]); created by _sync_index_catalog
+    INDEX_CATALOG = {
+        'idx_facilities_name': ('facilities', 'name'),
+        'idx_members_name': ('members', 'name'),
+        'idx_members_tier_status_spent': ('members', 'tier, status, total_spent'),
+        'idx_members_status': ('members', 'status'),
+        'idx_members_join_date': ('members', 'join_date'),
+        'idx_equipment_category_name': ('equipment', 'category, name'),
+        'idx_events_start_date': ('events', 'start_date'),
+        'idx_bookings_facility_date': ('bookings', 'facility_id, booking_date'),
+        'idx_bookings_member': ('bookings', 'member_id'),
+        'idx_revenue_records_date': ('revenue_records', 'date'),
+        'idx_revenue_records_facility_date': ('revenue_records', 'facility_id, date'),
+        'idx_audit_logs_created_at': ('audit_logs', 'created_at'),
+        # Only open rentals are indexed by due date, so the overdue scan stays small as history grows
+        'idx_rentals_open_due': ('rentals', 'due_at', 'returned_at IS NULL'),
+        'idx_rentals_returned': ('rentals', 'returned_at, equipment_id, charge', 'returned_at IS NOT NULL'),
+        'idx_rentals_member': ('rentals', 'member_id'),
+        # Waitlist in arrival (id) order; promotion reads the first entry
+        'idx_event_registrations_waitlist': ('event_registrations', 'event_id, id', "status = 'waitlisted'"),
+        'idx_event_registrations_member': ('event_registrations', 'member_id'),
+        'idx_bookings_event': ('bookings', 'event_id', 'event_id IS NOT NULL'),
+        'idx_tournament_games_event': ('tournament_games', 'event_id, game_number'),
+    }
+    
+    # Databases already migrated by this process; later constructions skip all DDL
+    _migrated: set = _process_state().setdefault('db_migrated', set())
+    _migrations_lock = _process_state().setdefault('db_migrations_lock', threading.Lock())
+    
+    def __init__(self, db_path: str = Config.DATABASE_PATH, pool_size: int = Config.DB_POOL_SIZE,
+                 pragma_profile: Union[str, Dict, None] = Config.DB_PRAGMA_PROFILE,
+                 busy_retries: int = Config.DB_BUSY_RETRIES,
+                 busy_backoff: float = Config.DB_BUSY_BACKOFF):
         self.db_path = db_path
+        self.busy_retries = busy_retries
+        self.busy_backoff = busy_backoff
+        self._trace = None  # List of (sql, params) while trace_queries() is active
+        self._write_listeners: List[Callable[[set], None]] = []
         self._ensure_directory()
+        self.pool = self._get_pool(db_path, pool_size, resolve_pragma_profile(pragma_profile))
+        self.cache = self._get_cache(db_path)
         self._initialize_database()
         
     def _ensure_directory(self):
         """Ensure data directory exists"""
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+    
+    @property
+    def _key(self) -> str:
+        """Process-wide registry key for this database file"""
+        return str(Path(self.db_path).resolve())
+    
+    @classmethod
+    def _get_pool(cls, db_path: str, pool_size: int, pragmas: Dict[str, Any]) -> ConnectionPool:
+        """Get (or lazily create) the process-wide pool; the first caller's settings win"""
+        key = str(Path(db_path).resolve())
         
+        with cls._pools_lock:
+            pool = cls._pools.get(key)
+            if pool is None:
+                pool = ConnectionPool(db_path, size=pool_size, pragmas=pragmas)
+                cls._pools[key] = pool
+            return pool
+    
+    @classmethod
+    def _get_cache(cls, db_path: str) -> QueryResultCache:
+        """Get (or lazily create) the process-wide result cache for a database file"""
+        key = str(Path(db_path).resolve())
+        
+        with cls._pools_lock:
+            cache = cls._caches.get(key)
+            if cache is None:
+                cache = QueryResultCache()
+                cls._caches[key] = cache
+            return cache
+    
+    @contextmanager
     def get_connection(self):
-        """Get database connection with row factory"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        """Get the pooled writer connection; commits on success, rolls back on error"""
+        with self.pool.writer() as conn:
+            try:
+                with conn:
+                    yield conn
+            finally:
+                self._after_write(self.pool.take_written_tables())
+    
+    def _after_write(self, tables: set):
+        """Invalidate cached reads that depend on tables touched by a write, then notify listeners"""
+        if not tables:
+            return
+        self.cache.invalidate(tables)
+        RequestMemo.invalidate_current()
+        for listener in self._write_listeners:
+            try:
+                listener(tables)
+            except Exception as e:
+                logger.error(f"Write listener error: {e}")
+    
+    def add_write_listener(self, listener: Callable[[set], None]):
+        """Call listener(tables) after each committed write through this manager; it must not block"""
+        self._write_listeners.append(listener)
+    
+    def table_version(self, table: str) -> int:
+        """Monotonic per-table write counter, useful as a cache key for derived data"""
+        return self.cache.table_version(table)
+    
+    def pool_stats(self) -> Dict:
+        """Connection pool metrics for this database"""
+        return self.pool.stats()
+    
+    def cache_stats(self) -> Dict:
+        """Query result cache hit/miss/eviction metrics"""
+        return self.cache.stats()
+    
+    def _with_busy_retry(self, operation):
+        """Run operation, retrying with jittered exponential backoff on SQLITE_BUSY"""
+        for attempt in range(self.busy_retries + 1):
+            try:
+                return operation()
+            except sqlite3.OperationalError as e:
+                if not is_busy_error(e) or attempt == self.busy_retries:
+                    raise
+                self.pool._record('busy_retries')
+                delay = self.busy_backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+                logger.debug(f"Database busy, retrying in {delay:.3f}s (attempt {attempt + 1})")
+                time.sleep(delay)
+    
+    def close(self):
+        """Close this database's pool and drop it from the process registry"""
+        key = self._key
         
+        with self._pools_lock:
+            if self._pools.get(key) is self.pool:
+                del self._pools[key]
+            if self._caches.get(key) is self.cache:
+                del self._caches[key]
+        with self._migrations_lock:
+            self._migrated.discard(key)
+        self.pool.close()
+    
     def _initialize_database(self):
-        """Initialize database with complete schema"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Users table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    email TEXT UNIQUE NOT NULL,
-                    password_hash TEXT NOT NULL,
-                    role TEXT NOT NULL DEFAULT 'user',
-                    full_name TEXT NOT NULL,
-                    is_active BOOLEAN DEFAULT 1,
-                    subscription_tier TEXT DEFAULT 'starter',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    last_login TIMESTAMP
-                )
-            ''')
-            
-            # Facilities table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS facilities (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    type TEXT NOT NULL,
-                    capacity INTEGER NOT NULL,
-                    hourly_rate REAL NOT NULL,
-                    utilization REAL DEFAULT 0,
-                    revenue REAL DEFAULT 0,
-                    status TEXT DEFAULT 'active',
-                    location TEXT,
-                    equipment TEXT DEFAULT '[]',
-                    description TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Members table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS members (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    member_id TEXT UNIQUE NOT NULL,
-                    name TEXT NOT NULL,
-                    email TEXT UNIQUE,
-                    phone TEXT,
-                    tier TEXT NOT NULL,
-                    join_date TIMESTAMP NOT NULL,
-                    total_spent REAL DEFAULT 0,
-                    status TEXT DEFAULT 'active',
-                    address TEXT,
-                    emergency_contact TEXT,
-                    preferences TEXT DEFAULT '{}',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Equipment table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS equipment (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    category TEXT NOT NULL,
-                    available INTEGER NOT NULL,
-                    rented INTEGER DEFAULT 0,
-                    daily_rate REAL NOT NULL,
-                    monthly_revenue REAL DEFAULT 0,
-                    status TEXT DEFAULT 'available',
-                    condition_score REAL DEFAULT 10.0,
-                    last_maintenance TIMESTAMP,
-                    next_maintenance TIMESTAMP,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Events table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS events (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    event_type TEXT NOT NULL,
-                    start_date TIMESTAMP NOT NULL,
-                    end_date TIMESTAMP NOT NULL,
-                    facility_id INTEGER,
-                    capacity INTEGER,
-                    registered INTEGER DEFAULT 0,
-                    price REAL DEFAULT 0,
-                    status TEXT DEFAULT 'active',
-                    description TEXT,
-                    organizer TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (facility_id) REFERENCES facilities (id)
-                )
-            ''')
-            
-            # Bookings table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS bookings (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    member_id INTEGER NOT NULL,
-                    facility_id INTEGER NOT NULL,
-                    booking_date DATE NOT NULL,
-                    start_time TIME NOT NULL,
-                    end_time TIME NOT NULL,
-                    total_cost REAL NOT NULL,
-                    status TEXT DEFAULT 'confirmed',
-                    payment_status TEXT DEFAULT 'pending',
-                    notes TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (member_id) REFERENCES members (id),
-                    FOREIGN KEY (facility_id) REFERENCES facilities (id)
-                )
-            ''')
-            
-            # Sponsors table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS sponsors (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+        """Apply pending schema migrations once per process"""
+        key = self._key
+        
+        with self._migrations_lock:
+            if key in self._migrated:
+                return
+            self._run_migrations()
+            self._migrated.add(key)
+    
+    def schema_version(self) -> int:
+        """Highest applied migration version"""
+        with self.pool.reader() as conn:
+            row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+            return row[0] or 0
+    
+    def has_table(self, name: str) -> bool:
+        """Whether a table (including virtual tables) exists in the schema"""
+        return bool(self.execute_query(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+        ))
+    
+    def _run_migrations(self):
+        """Apply every migration newer than the recorded schema version in one transaction"""
+        with self.pool.writer() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
                     name TEXT NOT NULL,
-                    tier TEXT NOT NULL,
-                    annual_value REAL NOT NULL,
-                    engagement REAL DEFAULT 0,
-                    satisfaction REAL DEFAULT 0,
-                    status TEXT DEFAULT 'active',
-                    contract_start TIMESTAMP,
-                    contract_end TIMESTAMP,
-                    contact_name TEXT,
-                    contact_email TEXT,
-                    benefits TEXT DEFAULT '[]',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             ''')
             
-            # Revenue tracking table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS revenue_records (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    date DATE NOT NULL,
+            # IMMEDIATE takes the write lock up front so concurrent processes migrate one at a time
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                current = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()[0] or 0
+                cursor = conn.cursor()
+                
+                for version, name, method in self.MIGRATIONS:
+                    if version <= current:
+                        continue
+                    getattr(self, method)(cursor)
+                    cursor.execute(
+                        "INSERT INTO schema_version (version, name) VALUES (?, ?)", (version, name)
+                    )
+                    logger.info(f"Applied schema migration {version}: {name}")
+                
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                self._after_write(self.pool.take_written_tables())
+        
+    def _sync_index_catalog(self, cursor: sqlite3.Cursor):
+        """Create catalog indexes and drop managed (idx_*) indexes no longer in the catalog"""
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx\\_%' ESCAPE '\\'")
+        existing = {row[0] for row in cursor.fetchall()}
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        tables = {row[0]: None for row in cursor.fetchall()}
+        
+        for name in existing - set(self.INDEX_CATALOG):
+            cursor.execute(f"DROP INDEX IF EXISTS {name}")
+        
+        for name, (table, columns, *where) in self.INDEX_CATALOG.items():
+            # Tables and columns added by later migrations get their indexes when that migration re-syncs
+            if table not in tables:
+                continue
+            if tables[table] is None:
+                tables[table] = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})").fetchall()}
+            if not {column.strip() for column in columns.split(',')} <= tables[table]:
+                continue
+            partial = f" WHERE {where[0]}" if where else ""
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns}){partial}")
+        
+        # Refresh planner statistics so the new indexes are actually chosen
+        cursor.execute("ANALYZE")
+    
+    def _migrate_rental_ledger(self, cursor: sqlite3.Cursor):
+        """Migration 6: per-rental ledger behind the equipment available/rented counters"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS rentals (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                equipment_id INTEGER NOT NULL,
+                member_id INTEGER,
+                quantity INTEGER NOT NULL,
+                daily_rate REAL NOT NULL,
+                rented_at TIMESTAMP NOT NULL,
+                due_at TIMESTAMP NOT NULL,
+                returned_at TIMESTAMP,
+                charge REAL,
+                FOREIGN KEY (equipment_id) REFERENCES equipment (id),
+                FOREIGN KEY (member_id) REFERENCES members (id)
+            )
+        ''')
+        
+        # Units already out have no known renter; carry them as open walk-in rentals so
+        # equipment.rented always equals the open quantity in the ledger
+        cursor.execute('''
+            INSERT INTO rentals (equipment_id, member_id, quantity, daily_rate, rented_at, due_at)
+            SELECT id, NULL, rented, daily_rate, datetime('now', 'localtime'),
+                   datetime('now', 'localtime', ?)
+            FROM equipment WHERE rented > 0
+        ''', (f"+{Config.RENTAL_DEFAULT_DAYS} days",))
+        
+        self._sync_index_catalog(cursor)
+    
+    def _migrate_event_registrations(self, cursor: sqlite3.Cursor):
+        """Migration 7: named attendees and waitlist behind events.registered"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS event_registrations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                event_id INTEGER NOT NULL,
+                member_id INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                requested_at TIMESTAMP NOT NULL,
+                updated_at TIMESTAMP,
+                FOREIGN KEY (event_id) REFERENCES events (id),
+                FOREIGN KEY (member_id) REFERENCES members (id)
+            )
+        ''')
+        # At most one live registration per member and event; cancelled rows are kept as history.
+        # Not an idx_* name, so the index catalog leaves this constraint alone.
+        cursor.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS uq_event_registrations_active
+            ON event_registrations (event_id, member_id) WHERE status != 'cancelled'
+        ''')
+        self._sync_index_catalog(cursor)
+    
+    def _migrate_event_roster_backfill(self, cursor: sqlite3.Cursor):
+        """Migration 11: roster rows behind registration counts recorded before the roster existed"""
+        # Seeded attendees have no known member, so member_id must become nullable; as in
+        # migration 8, SQLite needs a table copy to relax NOT NULL
+        cursor.execute('''
+            CREATE TABLE event_registrations_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                event_id INTEGER NOT NULL,
+                member_id INTEGER,
+                status TEXT NOT NULL,
+                requested_at TIMESTAMP NOT NULL,
+                updated_at TIMESTAMP,
+                FOREIGN KEY (event_id) REFERENCES events (id),
+                FOREIGN KEY (member_id) REFERENCES members (id)
+            )
+        ''')
+        cursor.execute("INSERT INTO event_registrations_new SELECT * FROM event_registrations")
+        cursor.execute("DROP TABLE event_registrations")
+        cursor.execute("ALTER TABLE event_registrations_new RENAME TO event_registrations")
+        cursor.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS uq_event_registrations_active
+            ON event_registrations (event_id, member_id) WHERE status != 'cancelled'
+        ''')
+        
+        # Carry each uncounted seat as an anonymous attendee so events.registered always
+        # equals the registered rows on the roster
+        cursor.execute('''
+            WITH RECURSIVE missing (event_id, remaining) AS (
+                SELECT e.id, e.registered - (SELECT COUNT(*) FROM event_registrations r
+                                             WHERE r.event_id = e.id AND r.status = 'registered')
+                FROM events e
+                UNION ALL
+                SELECT event_id, remaining - 1 FROM missing WHERE remaining > 1
+            )
+            INSERT INTO event_registrations (event_id, member_id, status, requested_at)
+            SELECT event_id, NULL, 'registered', datetime('now', 'localtime')
+            FROM missing WHERE remaining > 0 ORDER BY event_id
+        ''')
+        self._sync_index_catalog(cursor)
+    
+    def _migrate_tournament_fixtures(self, cursor: sqlite3.Cursor):
+        """Migration 8: event-owned bookings and the tournament fixture list"""
+        # Fixtures book facilities for an event rather than a member. SQLite cannot relax NOT NULL
+        # in place, so copy bookings into a table with a nullable member_id and an event_id.
+        cursor.execute('''
+            CREATE TABLE bookings_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                member_id INTEGER,
+                facility_id INTEGER NOT NULL,
+                booking_date DATE NOT NULL,
+                start_time TIME NOT NULL,
+                end_time TIME NOT NULL,
+                total_cost REAL NOT NULL,
+                status TEXT DEFAULT 'confirmed',
+                payment_status TEXT DEFAULT 'pending',
+                notes TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                event_id INTEGER,
+                FOREIGN KEY (member_id) REFERENCES members (id),
+                FOREIGN KEY (facility_id) REFERENCES facilities (id),
+                FOREIGN KEY (event_id) REFERENCES events (id)
+            )
+        ''')
+        columns = ("id, member_id, facility_id, booking_date, start_time, end_time, total_cost, status, "
+                   "payment_status, notes, created_at")
+        cursor.execute(f"INSERT INTO bookings_new ({columns}) SELECT {columns} FROM bookings")
+        cursor.execute("DROP TABLE bookings")
+        cursor.execute("ALTER TABLE bookings_new RENAME TO bookings")
+        
+        # Later rounds of an elimination bracket name their entrants by source game ("W12")
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS tournament_games (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                event_id INTEGER NOT NULL,
+                game_number INTEGER NOT NULL,
+                round INTEGER NOT NULL,
+                home TEXT NOT NULL,
+                away TEXT NOT NULL,
+                booking_id INTEGER NOT NULL,
+                FOREIGN KEY (event_id) REFERENCES events (id),
+                FOREIGN KEY (booking_id) REFERENCES bookings (id)
+            )
+        ''')
+        self._sync_index_catalog(cursor)
+    
+    def _migrate_revenue_rollups(self, cursor: sqlite3.Cursor):
+        """Migration 9: daily, weekly and monthly revenue totals by source and facility"""
+        # facility_id 0 stands for "no facility" so it can take part in the primary key
+        for table, column, _ in RevenueService.ROLLUPS.values():
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS {table} (
+                    {column} DATE NOT NULL,
                     source TEXT NOT NULL,
-                    amount REAL NOT NULL,
-                    facility_id INTEGER,
-                    description TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (facility_id) REFERENCES facilities (id)
-                )
+                    facility_id INTEGER NOT NULL DEFAULT 0,
+                    amount REAL NOT NULL DEFAULT 0,
+                    transactions INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY ({column}, source, facility_id)
+                ) WITHOUT ROWID
             ''')
-            
-            # Audit log table
+        RevenueService.rebuild_rollups(cursor)
+    
+    def _migrate_member_search_index(self, cursor: sqlite3.Cursor):
+        """Migration 5: FTS5 index over member identifiers, kept in sync by triggers"""
+        try:
+            # External content: the index stores tokens only and reads rows back from members
             cursor.execute('''
-                CREATE TABLE IF NOT EXISTS audit_logs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER,
-                    action TEXT NOT NULL,
-                    table_name TEXT,
-                    record_id INTEGER,
-                    old_values TEXT,
-                    new_values TEXT,
-                    ip_address TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users (id)
+                CREATE VIRTUAL TABLE IF NOT EXISTS members_fts USING fts5(
+                    member_id, name, email, phone,
+                    content='members', content_rowid='id',
+                    prefix='1 2 3'
                 )
             ''')
+        except sqlite3.OperationalError as e:
+            logger.warning(f"FTS5 unavailable, member search falls back to LIKE scans: {e}")
+            return
+        
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS members_fts_insert AFTER INSERT ON members BEGIN
+                INSERT INTO members_fts (rowid, member_id, name, email, phone)
+                VALUES (new.id, new.member_id, new.name, new.email, new.phone);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS members_fts_delete AFTER DELETE ON members BEGIN
+                INSERT INTO members_fts (members_fts, rowid, member_id, name, email, phone)
+                VALUES ('delete', old.id, old.member_id, old.name, old.email, old.phone);
+            END
+        ''')
+        # Only searchable columns re-index; spending/status updates leave the index alone
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS members_fts_update
+            AFTER UPDATE OF member_id, name, email, phone ON members BEGIN
+                INSERT INTO members_fts (members_fts, rowid, member_id, name, email, phone)
+                VALUES ('delete', old.id, old.member_id, old.name, old.email, old.phone);
+                INSERT INTO members_fts (rowid, member_id, name, email, phone)
+                VALUES (new.id, new.member_id, new.name, new.email, new.phone);
+            END
+        ''')
+        cursor.execute("INSERT INTO members_fts (members_fts) VALUES ('rebuild')")
+    
+    def _migrate_initial_schema(self, cursor: sqlite3.Cursor):
+        """Migration 1: create the complete base schema"""
+        # Users table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                email TEXT UNIQUE NOT NULL,
+                password_hash TEXT NOT NULL,
+                role TEXT NOT NULL DEFAULT 'user',
+                full_name TEXT NOT NULL,
+                is_active BOOLEAN DEFAULT 1,
+                subscription_tier TEXT DEFAULT 'starter',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_login TIMESTAMP
+            )
+        ''')
+        
+        # Facilities table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS facilities (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                type TEXT NOT NULL,
+                capacity INTEGER NOT NULL,
+                hourly_rate REAL NOT NULL,
+                utilization REAL DEFAULT 0,
+                revenue REAL DEFAULT 0,
+                status TEXT DEFAULT 'active',
+                location TEXT,
+                equipment TEXT DEFAULT '[]',
+                description TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Members table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS members (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                member_id TEXT UNIQUE NOT NULL,
+                name TEXT NOT NULL,
+                email TEXT UNIQUE,
+                phone TEXT,
+                tier TEXT NOT NULL,
+                join_date TIMESTAMP NOT NULL,
+                total_spent REAL DEFAULT 0,
+                status TEXT DEFAULT 'active',
+                address TEXT,
+                emergency_contact TEXT,
+                preferences TEXT DEFAULT '{}',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Equipment table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS equipment (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                category TEXT NOT NULL,
+                available INTEGER NOT NULL,
+                rented INTEGER DEFAULT 0,
+                daily_rate REAL NOT NULL,
+                monthly_revenue REAL DEFAULT 0,
+                status TEXT DEFAULT 'available',
+                condition_score REAL DEFAULT 10.0,
+                last_maintenance TIMESTAMP,
+                next_maintenance TIMESTAMP,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Events table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                event_type TEXT NOT NULL,
+                start_date TIMESTAMP NOT NULL,
+                end_date TIMESTAMP NOT NULL,
+                facility_id INTEGER,
+                capacity INTEGER,
+                registered INTEGER DEFAULT 0,
+                price REAL DEFAULT 0,
+                status TEXT DEFAULT 'active',
+                description TEXT,
+                organizer TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (facility_id) REFERENCES facilities (id)
+            )
+        ''')
+        
+        # Bookings table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS bookings (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                member_id INTEGER NOT NULL,
+                facility_id INTEGER NOT NULL,
+                booking_date DATE NOT NULL,
+                start_time TIME NOT NULL,
+                end_time TIME NOT NULL,
+                total_cost REAL NOT NULL,
+                status TEXT DEFAULT 'confirmed',
+                payment_status TEXT DEFAULT 'pending',
+                notes TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (member_id) REFERENCES members (id),
+                FOREIGN KEY (facility_id) REFERENCES facilities (id)
+            )
+        ''')
+        
+        # Sponsors table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sponsors (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                tier TEXT NOT NULL,
+                annual_value REAL NOT NULL,
+                engagement REAL DEFAULT 0,
+                satisfaction REAL DEFAULT 0,
+                status TEXT DEFAULT 'active',
+                contract_start TIMESTAMP,
+                contract_end TIMESTAMP,
+                contact_name TEXT,
+                contact_email TEXT,
+                benefits TEXT DEFAULT '[]',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Revenue tracking table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS revenue_records (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                date DATE NOT NULL,
+                source TEXT NOT NULL,
+                amount REAL NOT NULL,
+                facility_id INTEGER,
+                description TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (facility_id) REFERENCES facilities (id)
+            )
+        ''')
+        
+        # Audit log table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS audit_logs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER,
+                action TEXT NOT NULL,
+                table_name TEXT,
+                record_id INTEGER,
+                old_values TEXT,
+                new_values TEXT,
+                ip_address TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users (id)
+            )
+        ''')
+    
+    def _create_sample_data(self, cursor: sqlite3.Cursor):
+        """Migration 2: create comprehensive sample data for demonstration"""
+        # Check if data already exists
+        cursor.execute("SELECT COUNT(*) FROM users")
+        if cursor.fetchone()[0] > 0:
+            return
             
-            conn.commit()
-            self._create_sample_data()
-            
-    def _create_sample_data(self):
-        """Create comprehensive sample data for demonstration"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Check if data already exists
-            cursor.execute("SELECT COUNT(*) FROM users")
-            if cursor.fetchone()[0] > 0:
-                return
-                
-            # Create admin user
-            admin_password = self._hash_password("admin123")
-            cursor.execute('''
-                INSERT INTO users (email, password_hash, role, full_name, subscription_tier)
-                VALUES (?, ?, ?, ?, ?)
-            ''', ("admin@sportai.com", admin_password, "admin", "System Administrator", "enterprise"))
-            
-            # Sample facilities
-            facilities = [
-                ("Basketball Court 1", "Indoor Court", 200, 150.0, 89.2, 18750.0, "active", "North Wing", '["Scoreboard", "Sound System"]', "Professional basketball court with regulation dimensions"),
-                ("Basketball Court 2", "Indoor Court", 150, 140.0, 84.5, 16450.0, "active", "South Wing", '["Volleyball Net", "Speakers"]', "Multi-purpose court for basketball and volleyball"),
-                ("Main Arena", "Multi-Sport", 500, 350.0, 93.1, 45250.0, "active", "Central Building", '["Retractable Seating", "PA System", "LED Scoreboard"]', "Premier multi-sport facility"),
-                ("Tennis Court 1", "Tennis Court", 50, 80.0, 78.3, 8640.0, "active", "West Complex", '["Net", "Court Lights", "Ball Machine"]', "Hard court tennis facility"),
-                ("Swimming Pool", "Aquatic Center", 100, 120.0, 65.8, 11840.0, "active", "Aquatic Wing", '["Lane Markers", "Timing System", "Diving Board"]', "Olympic-size swimming pool"),
-                ("Soccer Field A", "Soccer Field", 300, 100.0, 85.4, 12800.0, "active", "East Complex", '["Goals", "Benches", "Scoreboard"]', "FIFA regulation soccer field"),
-                ("Fitness Center", "Gym", 80, 60.0, 91.2, 8760.0, "active", "Fitness Wing", '["Free Weights", "Cardio Equipment", "Mirrors"]', "Fully equipped fitness center"),
-                ("Conference Room A", "Meeting Space", 25, 45.0, 45.2, 2880.0, "active", "Admin Wing", '["Projector", "Video Conferencing", "Whiteboard"]', "Professional meeting space")
-            ]
-            
-            cursor.executemany('''
-                INSERT INTO facilities (name, type, capacity, hourly_rate, utilization, revenue, status, location, equipment, description)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', facilities)
-            
-            # Sample equipment
-            equipment = [
-                ("Mountain Bikes", "Bicycles", 15, 8, 25.0, 6000.0, "available", 9.2, "2024-01-01", "2024-04-01"),
-                ("Tennis Rackets", "Sports Equipment", 25, 12, 15.0, 2700.0, "available", 8.5, "2024-01-15", "2024-03-15"),
-                ("Pool Equipment", "Aquatic", 100, 25, 2.0, 1500.0, "available", 9.8, "2024-01-01", "2024-03-01"),
-                ("Basketball Sets", "Sports Equipment", 20, 8, 12.0, 1440.0, "available", 9.0, "2024-01-10", "2024-04-10"),
-                ("Golf Carts", "Vehicles", 6, 4, 50.0, 9000.0, "available", 9.5, "2024-01-01", "2024-06-01"),
-                ("Fitness Equipment", "Exercise", 30, 15, 8.0, 1200.0, "available", 9.3, "2024-01-20", "2024-04-20"),
-                ("Soccer Balls", "Sports Equipment", 40, 18, 10.0, 720.0, "available", 8.9, "2024-01-05", "2024-03-05"),
-                ("Volleyball Nets", "Sports Equipment", 8, 4, 25.0, 1500.0, "available", 9.1, "2024-01-01", "2024-05-01"),
-                ("Kayaks", "Water Sports", 12, 3, 40.0, 3600.0, "available", 8.7, "2024-01-01", "2024-04-01"),
-                ("Gaming Consoles", "Entertainment", 10, 6, 35.0, 2100.0, "available", 9.4, "2024-01-15", "2024-07-15")
-            ]
-            
-            cursor.executemany('''
-                INSERT INTO equipment (name, category, available, rented, daily_rate, monthly_revenue, status, condition_score, last_maintenance, next_maintenance)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', equipment)
-            
-            # Sample members
-            members = [
-                ("M001", "John Smith", "john.smith@email.com", "555-0101", "Premium", "2024-01-15", 1250.0, "active", "123 Oak St", "Jane Smith: 555-0102", '{"sports": ["basketball", "tennis"], "notifications": true}'),
-                ("M002", "Sarah Johnson", "sarah.j@email.com", "555-0201", "Elite", "2023-11-08", 2100.0, "active", "456 Pine Ave", "Mike Johnson: 555-0202", '{"sports": ["swimming", "fitness"], "trainer": true}'),
-                ("M003", "Mike Wilson", "mike.w@email.com", "555-0301", "Basic", "2024-02-20", 850.0, "active", "789 Elm Dr", "Lisa Wilson: 555-0302", '{"sports": ["soccer"], "student": true}'),
-                ("M004", "Emily Davis", "emily.d@email.com", "555-0401", "Premium", "2023-12-05", 1450.0, "active", "321 Maple Ln", "Tom Davis: 555-0402", '{"sports": ["tennis", "swimming"], "family": true}'),
-                ("M005", "David Brown", "david.b@email.com", "555-0501", "Elite", "2023-10-12", 2800.0, "active", "654 Cedar Rd", "Amy Brown: 555-0502", '{"sports": ["all"], "corporate": true}'),
-                ("M006", "Lisa Anderson", "lisa.a@email.com", "555-0601", "Premium", "2024-01-03", 1750.0, "active", "987 Birch St", "John Anderson: 555-0602", '{"sports": ["yoga", "swimming"], "wellness": true}'),
-                ("M007", "Chris Taylor", "chris.t@email.com", "555-0701", "Basic", "2024-03-01", 650.0, "active", "147 Spruce Ave", "Pat Taylor: 555-0702", '{"sports": ["basketball"], "youth": true}'),
-                ("M008", "Amanda Miller", "amanda.m@email.com", "555-0801", "Elite", "2023-09-15", 3200.0, "active", "258 Willow Dr", "Steve Miller: 555-0802", '{"sports": ["tennis", "golf"], "executive": true}'),
-                ("M009", "Robert Garcia", "robert.g@email.com", "555-0901", "Premium", "2023-11-20", 1680.0, "active", "369 Palm St", "Maria Garcia: 555-0902", '{"sports": ["soccer", "fitness"], "bilingual": true}'),
-                ("M010", "Jennifer Lee", "jennifer.l@email.com", "555-1001", "Basic", "2024-02-14", 920.0, "active", "741 Oak Ave", "Kevin Lee: 555-1002", '{"sports": ["swimming"], "senior": true}')
-            ]
-            
-            cursor.executemany('''
-                INSERT INTO members (member_id, name, email, phone, tier, join_date, total_spent, status, address, emergency_contact, preferences)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', members)
-            
-            # Sample sponsors
-            sponsors = [
-                ("Wells Fargo Bank", "Diamond", 175000.0, 95.0, 9.2, "active", "2024-01-01", "2026-12-31", "Susan Wells", "partnerships@wellsfargo.com", '["Logo placement", "VIP events", "Newsletter mentions"]'),
-                ("HyVee Grocery", "Platinum", 62500.0, 88.0, 8.7, "active", "2024-01-01", "2025-12-31", "Mark Johnson", "sports@hyvee.com", '["Facility naming", "Event sponsorship", "Member discounts"]'),
-                ("TD Ameritrade", "Gold", 32000.0, 92.0, 8.9, "active", "2024-01-01", "2025-06-30", "Jennifer Lee", "community@tdameritrade.com", '["Equipment sponsorship", "Digital displays"]'),
-                ("Nike Sports", "Silver", 15000.0, 85.0, 8.5, "active", "2024-01-01", "2024-12-31", "Alex Rodriguez", "local@nike.com", '["Equipment partnership", "Athlete endorsements"]'),
-                ("Gatorade", "Bronze", 8000.0, 78.0, 8.0, "active", "2024-01-01", "2024-12-31", "Maria Garcia", "partnerships@gatorade.com", '["Beverage partnership", "Hydration stations"]'),
-                ("Local Auto Dealer", "Bronze", 5000.0, 82.0, 7.8, "active", "2024-01-01", "2024-12-31", "Bob Smith", "marketing@localauto.com", '["Parking sponsorship", "Transportation services"]')
-            ]
-            
-            cursor.executemany('''
-                INSERT INTO sponsors (name, tier, annual_value, engagement, satisfaction, status, contract_start, contract_end, contact_name, contact_email, benefits)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', sponsors)
-            
-            # Sample events
-            events = [
-                ("Summer Basketball League", "Tournament", "2024-06-01", "2024-08-31", 1, 32, 28, 50.0, "active", "Annual summer basketball tournament", "Sports Department"),
-                ("Swim Meet Championship", "Competition", "2024-07-15", "2024-07-17", 5, 50, 42, 25.0, "active", "Regional swimming championship", "Aquatic Center"),
-                ("Tennis Open", "Tournament", "2024-05-20", "2024-05-22", 4, 64, 55, 75.0, "active", "Open tennis tournament", "Tennis Pro"),
-                ("Fitness Challenge", "Program", "2024-04-01", "2024-05-31", 7, 100, 85, 30.0, "active", "8-week fitness transformation", "Fitness Team"),
-                ("Youth Soccer Camp", "Camp", "2024-06-10", "2024-06-14", 6, 40, 38, 120.0, "active", "Summer soccer camp for ages 8-16", "Soccer Academy"),
-                ("Corporate Team Building", "Event", "2024-05-10", "2024-05-10", 8, 80, 65, 200.0, "active", "Team building activities", "Event Coordinator")
-            ]
-            
-            cursor.executemany('''
-                INSERT INTO events (name, event_type, start_date, end_date, facility_id, capacity, registered, price, status, description, organizer)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', events)
-            
-            conn.commit()
-            logger.info("Sample data created successfully")
+        # Create admin user
+        admin_password = self._hash_password("admin123")
+        cursor.execute('''
+            INSERT INTO users (email, password_hash, role, full_name, subscription_tier)
+            VALUES (?, ?, ?, ?, ?)
+        ''', ("admin@sportai.com", admin_password, "admin", "System Administrator", "enterprise"))
+        
+        # Sample facilities
+        facilities = [
+            ("Basketball Court 1", "Indoor Court", 200, 150.0, 89.2, 18750.0, "active", "North Wing", '["Scoreboard", "Sound System"]', "Professional basketball court with regulation dimensions"),
+            ("Basketball Court 2", "Indoor Court", 150, 140.0, 84.5, 16450.0, "active", "South Wing", '["Volleyball Net", "Speakers"]', "Multi-purpose court for basketball and volleyball"),
+            ("Main Arena", "Multi-Sport", 500, 350.0, 93.1, 45250.0, "active", "Central Building", '["Retractable Seating", "PA System", "LED Scoreboard"]', "Premier multi-sport facility"),
+            ("Tennis Court 1", "Tennis Court", 50, 80.0, 78.3, 8640.0, "active", "West Complex", '["Net", "Court Lights", "Ball Machine"]', "Hard court tennis facility"),
+            ("Swimming Pool", "Aquatic Center", 100, 120.0, 65.8, 11840.0, "active", "Aquatic Wing", '["Lane Markers", "Timing System", "Diving Board"]', "Olympic-size swimming pool"),
+            ("Soccer Field A", "Soccer Field", 300, 100.0, 85.4, 12800.0, "active", "East Complex", '["Goals", "Benches", "Scoreboard"]', "FIFA regulation soccer field"),
+            ("Fitness Center", "Gym", 80, 60.0, 91.2, 8760.0, "active", "Fitness Wing", '["Free Weights", "Cardio Equipment", "Mirrors"]', "Fully equipped fitness center"),
+            ("Conference Room A", "Meeting Space", 25, 45.0, 45.2, 2880.0, "active", "Admin Wing", '["Projector", "Video Conferencing", "Whiteboard"]', "Professional meeting space")
+        ]
+        
+        cursor.executemany('''
+            INSERT INTO facilities (name, type, capacity, hourly_rate, utilization, revenue, status, location, equipment, description)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', facilities)
+        
+        # Sample equipment
+        equipment = [
+            ("Mountain Bikes", "Bicycles", 15, 8, 25.0, 6000.0, "available", 9.2, "2024-01-01", "2024-04-01"),
+            ("Tennis Rackets", "Sports Equipment", 25, 12, 15.0, 2700.0, "available", 8.5, "2024-01-15", "2024-03-15"),
+            ("Pool Equipment", "Aquatic", 100, 25, 2.0, 1500.0, "available", 9.8, "2024-01-01", "2024-03-01"),
+            ("Basketball Sets", "Sports Equipment", 20, 8, 12.0, 1440.0, "available", 9.0, "2024-01-10", "2024-04-10"),
+            ("Golf Carts", "Vehicles", 6, 4, 50.0, 9000.0, "available", 9.5, "2024-01-01", "2024-06-01"),
+            ("Fitness Equipment", "Exercise", 30, 15, 8.0, 1200.0, "available", 9.3, "2024-01-20", "2024-04-20"),
+            ("Soccer Balls", "Sports Equipment", 40, 18, 10.0, 720.0, "available", 8.9, "2024-01-05", "2024-03-05"),
+            ("Volleyball Nets", "Sports Equipment", 8, 4, 25.0, 1500.0, "available", 9.1, "2024-01-01", "2024-05-01"),
+            ("Kayaks", "Water Sports", 12, 3, 40.0, 3600.0, "available", 8.7, "2024-01-01", "2024-04-01"),
+            ("Gaming Consoles", "Entertainment", 10, 6, 35.0, 2100.0, "available", 9.4, "2024-01-15", "2024-07-15")
+        ]
+        
+        cursor.executemany('''
+            INSERT INTO equipment (name, category, available, rented, daily_rate, monthly_revenue, status, condition_score, last_maintenance, next_maintenance)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', equipment)
+        
+        # Sample members
+        members = [
+            ("M001", "John Smith", "john.smith@email.com", "555-0101", "Premium", "2024-01-15", 1250.0, "active", "123 Oak St", "Jane Smith: 555-0102", '{"sports": ["basketball", "tennis"], "notifications": true}'),
+            ("M002", "Sarah Johnson", "sarah.j@email.com", "555-0201", "Elite", "2023-11-08", 2100.0, "active", "456 Pine Ave", "Mike Johnson: 555-0202", '{"sports": ["swimming", "fitness"], "trainer": true}'),
+            ("M003", "Mike Wilson", "mike.w@email.com", "555-0301", "Basic", "2024-02-20", 850.0, "active", "789 Elm Dr", "Lisa Wilson: 555-0302", '{"sports": ["soccer"], "student": true}'),
+            ("M004", "Emily Davis", "emily.d@email.com", "555-0401", "Premium", "2023-12-05", 1450.0, "active", "321 Maple Ln", "Tom Davis: 555-0402", '{"sports": ["tennis", "swimming"], "family": true}'),
+            ("M005", "David Brown", "david.b@email.com", "555-0501", "Elite", "2023-10-12", 2800.0, "active", "654 Cedar Rd", "Amy Brown: 555-0502", '{"sports": ["all"], "corporate": true}'),
+            ("M006", "Lisa Anderson", "lisa.a@email.com", "555-0601", "Premium", "2024-01-03", 1750.0, "active", "987 Birch St", "John Anderson: 555-0602", '{"sports": ["yoga", "swimming"], "wellness": true}'),
+            ("M007", "Chris Taylor", "chris.t@email.com", "555-0701", "Basic", "2024-03-01", 650.0, "active", "147 Spruce Ave", "Pat Taylor: 555-0702", '{"sports": ["basketball"], "youth": true}'),
+            ("M008", "Amanda Miller", "amanda.m@email.com", "555-0801", "Elite", "2023-09-15", 3200.0, "active", "258 Willow Dr", "Steve Miller: 555-0802", '{"sports": ["tennis", "golf"], "executive": true}'),
+            ("M009", "Robert Garcia", "robert.g@email.com", "555-0901", "Premium", "2023-11-20", 1680.0, "active", "369 Palm St", "Maria Garcia: 555-0902", '{"sports": ["soccer", "fitness"], "bilingual": true}'),
+            ("M010", "Jennifer Lee", "jennifer.l@email.com", "555-1001", "Basic", "2024-02-14", 920.0, "active", "741 Oak Ave", "Kevin Lee: 555-1002", '{"sports": ["swimming"], "senior": true}')
+        ]
+        
+        cursor.executemany('''
+            INSERT INTO members (member_id, name, email, phone, tier, join_date, total_spent, status, address, emergency_contact, preferences)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', members)
+        
+        # Sample sponsors
+        sponsors = [
+            ("Wells Fargo Bank", "Diamond", 175000.0, 95.0, 9.2, "active", "2024-01-01", "2026-12-31", "Susan Wells", "partnerships@wellsfargo.com", '["Logo placement", "VIP events", "Newsletter mentions"]'),
+            ("HyVee Grocery", "Platinum", 62500.0, 88.0, 8.7, "active", "2024-01-01", "2025-12-31", "Mark Johnson", "sports@hyvee.com", '["Facility naming", "Event sponsorship", "Member discounts"]'),
+            ("TD Ameritrade", "Gold", 32000.0, 92.0, 8.9, "active", "2024-01-01", "2025-06-30", "Jennifer Lee", "community@tdameritrade.com", '["Equipment sponsorship", "Digital displays"]'),
+            ("Nike Sports", "Silver", 15000.0, 85.0, 8.5, "active", "2024-01-01", "2024-12-31", "Alex Rodriguez", "local@nike.com", '["Equipment partnership", "Athlete endorsements"]'),
+            ("Gatorade", "Bronze", 8000.0, 78.0, 8.0, "active", "2024-01-01", "2024-12-31", "Maria Garcia", "partnerships@gatorade.com", '["Beverage partnership", "Hydration stations"]'),
+            ("Local Auto Dealer", "Bronze", 5000.0, 82.0, 7.8, "active", "2024-01-01", "2024-12-31", "Bob Smith", "marketing@localauto.com", '["Parking sponsorship", "Transportation services"]')
+        ]
+        
+        cursor.executemany('''
+            INSERT INTO sponsors (name, tier, annual_value, engagement, satisfaction, status, contract_start, contract_end, contact_name, contact_email, benefits)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', sponsors)
+        
+        # Sample events
+        events = [
+            ("Summer Basketball League", "Tournament", "2024-06-01", "2024-08-31", 1, 32, 28, 50.0, "active", "Annual summer basketball tournament", "Sports Department"),
+            ("Swim Meet Championship", "Competition", "2024-07-15", "2024-07-17", 5, 50, 42, 25.0, "active", "Regional swimming championship", "Aquatic Center"),
+            ("Tennis Open", "Tournament", "2024-05-20", "2024-05-22", 4, 64, 55, 75.0, "active", "Open tennis tournament", "Tennis Pro"),
+            ("Fitness Challenge", "Program", "2024-04-01", "2024-05-31", 7, 100, 85, 30.0, "active", "8-week fitness transformation", "Fitness Team"),
+            ("Youth Soccer Camp", "Camp", "2024-06-10", "2024-06-14", 6, 40, 38, 120.0, "active", "Summer soccer camp for ages 8-16", "Soccer Academy"),
+            ("Corporate Team Building", "Event", "2024-05-10", "2024-05-10", 8, 80, 65, 200.0, "active", "Team building activities", "Event Coordinator")
+        ]
+        
+        cursor.executemany('''
+            INSERT INTO events (name, event_type, start_date, end_date, facility_id, capacity, registered, price, status, description, organizer)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', events)
+        
+        logger.info("Sample data created successfully")
     
     def _hash_password(self, password: str) -> str:
         """Hash password using PBKDF2"""
@@ -506,32 +1428,302 @@ class DatabaseManager:
         except:
             return False
     
-    def execute_query(self, query: str, params: tuple = ()) -> List[Dict]:
-        """Execute SELECT query and return results"""
+    @contextmanager
+    def trace_queries(self):
+        """Record every (sql, params) executed through this manager while active"""
+        self._trace = []
         try:
-            with self.get_connection() as conn:
+            yield self._trace
+        finally:
+            self._trace = None
+    
+    def explain(self, query: str, params: tuple = ()) -> List[str]:
+        """Return the EXPLAIN QUERY PLAN detail lines for a statement"""
+        with self.pool.reader() as conn:
+            return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()]
+    
+    def execute_query(self, query: str, params: tuple = (), cache: bool = False,
+                      ttl: Optional[float] = None) -> List[Dict]:
+        """Execute SELECT query and return results, optionally through the shared result cache"""
+        if self._trace is not None:
+            self._trace.append((query, params))
+        
+        if cache:
+            key = (query, tuple(params))
+            cached = self.cache.get(key)
+            if cached is not None:
+                return [dict(row) for row in cached]
+            try:
+                tables = self._tables_read(query, params)
+            except Exception as e:
+                logger.error(f"Query error: {e}")
+                return []
+            versions = self.cache.versions(tables)
+        
+        def run():
+            with self.pool.reader() as conn:
                 cursor = conn.execute(query, params)
                 return [dict(row) for row in cursor.fetchall()]
+        
+        try:
+            rows = self._with_busy_retry(run)
         except Exception as e:
             logger.error(f"Query error: {e}")
             return []
+        
+        if cache:
+            self.cache.put(key, rows, tables, versions, ttl)
+            return [dict(row) for row in rows]
+        return rows
     
-    def execute_update(self, query: str, params: tuple = ()) -> bool:
-        """Execute INSERT/UPDATE/DELETE query"""
-        try:
+    def _tables_read(self, query: str, params: tuple = ()) -> frozenset:
+        """Tables a SELECT reads, as reported by SQLite's authorizer while compiling it.
+        
+        Comma joins, subqueries, CTEs and views all resolve to their base tables, which a
+        textual scan of FROM/JOIN clauses would miss.
+        """
+        tables = self.cache.query_tables(query)
+        if tables is not None:
+            return tables
+        
+        found = set()
+        
+        def collect(action: int, arg1, arg2, db_name, source) -> int:
+            if action == sqlite3.SQLITE_READ and arg1:
+                found.add(arg1.lower())
+            return sqlite3.SQLITE_OK
+        
+        def run():
+            with self.pool.reader() as conn:
+                conn.set_authorizer(collect)
+                try:
+                    # EXPLAIN compiles the statement (firing the authorizer) without running it
+                    conn.execute(f"EXPLAIN {query}", params)
+                finally:
+                    conn.set_authorizer(None)
+        
+        self._with_busy_retry(run)
+        tables = frozenset(found)
+        self.cache.remember_query_tables(query, tables)
+        return tables
+    
+    def iter_query(self, query: str, params: tuple = (),
+                   batch_size: int = Config.DB_FETCH_BATCH_SIZE) -> Iterator[Dict]:
+        """Stream SELECT results row by row, fetching batch_size rows at a time.
+        
+        The reader stays checked out until the generator is exhausted or closed.
+        Errors propagate, since a partially consumed stream cannot become [].
+        """
+        if self._trace is not None:
+            self._trace.append((query, params))
+        
+        with self.pool.reader(dedicated=True) as conn:
+            cursor = self._with_busy_retry(lambda: conn.execute(query, params))
+            try:
+                while True:
+                    batch = cursor.fetchmany(batch_size)
+                    if not batch:
+                        break
+                    for row in batch:
+                        yield dict(row)
+            finally:
+                cursor.close()
+    
+    def execute_rowcount(self, query: str, params: tuple = ()) -> int:
+        """Execute INSERT/UPDATE/DELETE query and return the number of rows changed (-1 on error)"""
+        if self._trace is not None:
+            self._trace.append((query, params))
+        
+        def run():
             with self.get_connection() as conn:
-                conn.execute(query, params)
-                conn.commit()
-                return True
+                return conn.execute(query, params).rowcount
+        
+        try:
+            return self._with_busy_retry(run)
         except Exception as e:
             logger.error(f"Update error: {e}")
-            return False
-
-# =============================================================================
-# BUSINESS LOGIC SERVICES
-# =============================================================================
-
-class AuthenticationService:
+            return -1
+    
+    def transaction(self, operation: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Run operation(conn) as one write transaction, retried when busy; errors roll back and propagate"""
+        def run():
+            with self.get_connection() as conn:
+                return operation(conn)
+        
+        return self._with_busy_retry(run)
+    
+    def query_arrays(self, query: str, params: tuple = (),
+                     dtypes: Optional[Dict[str, Any]] = None) -> Dict[str, np.ndarray]:
+        """Execute SELECT query and return one NumPy array per result column"""
+        if self._trace is not None:
+            self._trace.append((query, params))
+        
+        def run():
+            with self.pool.reader() as conn:
+                cursor = conn.cursor()
+                cursor.row_factory = None  # plain tuples; skip building a Row per result
+                cursor.execute(query, params)
+                names = [d[0] for d in cursor.description]
+                return names, cursor.fetchall()
+        
+        try:
+            names, rows = self._with_busy_retry(run)
+            dtypes = dtypes or {}
+            columns = zip(*rows) if rows else [()] * len(names)
+            return {name: _column_array(values, dtypes.get(name))
+                    for name, values in zip(names, columns)}
+        except Exception as e:
+            logger.error(f"Query error: {e}")
+            return {}
+    
+    def query_page(self, select: str, order_by: tuple, where: Optional[List[str]] = None,
+                   params: tuple = (), after: Optional[tuple] = None, limit: int = Config.PAGE_SIZE,
+                   dtypes: Optional[Dict[str, Any]] = None,
+                   parse_dates: Optional[List[str]] = None) -> Dict:
+        """Fetch one keyset page: rows ordered by order_by that sort after the cursor `after`.
+        
+        order_by must end in a unique column and every order_by column must be selected;
+        the returned next_after cursor is that column tuple for the page's last row.
+        """
+        conditions = list(where or [])
+        params = tuple(params)
+        if after is not None:
+            # Row-value comparison lets SQLite seek the order_by index instead of OFFSET-scanning
+            conditions.append(f"({', '.join(order_by)}) > ({', '.join('?' * len(order_by))})")
+            params += tuple(after)
+        
+        query = select
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += f" ORDER BY {', '.join(order_by)} LIMIT ?"
+        
+        # One extra row tells us whether a next page exists without a COUNT(*)
+        frame = self.query_frame(query, params + (limit + 1,), dtypes, parse_dates)
+        has_more = len(frame) > limit
+        frame = frame.iloc[:limit]
+        keys = [column.split('.')[-1] for column in order_by]
+        next_after = tuple(frame[key].iloc[-1:].tolist()[0] for key in keys) if has_more else None
+        return {'rows': frame, 'next_after': next_after, 'has_more': has_more}
+    
+    def query_frame(self, query: str, params: tuple = (),
+                    dtypes: Optional[Dict[str, Any]] = None,
+                    parse_dates: Optional[List[str]] = None) -> pd.DataFrame:
+        """Execute SELECT query and return results as a DataFrame built column-wise"""
+        frame = pd.DataFrame(self.query_arrays(query, params, dtypes), copy=False)
+        for column in parse_dates or []:
+            if column in frame:
+                frame[column] = pd.to_datetime(frame[column], errors='coerce')
+        return frame
+    
+    def execute_update(self, query: str, params: tuple = ()) -> bool:
+        """Execute INSERT/UPDATE/DELETE query"""
+        if self._trace is not None:
+            self._trace.append((query, params))
+        
+        def run():
+            with self.get_connection() as conn:
+                conn.execute(query, params)
+                return True
+        
+        try:
+            return self._with_busy_retry(run)
+        except Exception as e:
+            logger.error(f"Update error: {e}")
+            return False
+
+# =============================================================================
+# REQUEST-SCOPED MEMOIZATION
+# =============================================================================
+
+# Kept in the process registry so memoized methods on cached services and the
+# current rerun's request_scope() refer to the same variable
+_current_request_memo: contextvars.ContextVar = _process_state().setdefault(
+    'request_memo_var', contextvars.ContextVar('sportai_request_memo', default=None)
+)
+
+class RequestMemo:
+    """Memo of service results for a single Streamlit rerun"""
+    
+    def __init__(self):
+        self._values: Dict[tuple, Any] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hits = 0
+        self.invalidations = 0
+    
+    @staticmethod
+    def current() -> Optional['RequestMemo']:
+        """Memo for the active request scope, if any"""
+        return _current_request_memo.get()
+    
+    @staticmethod
+    def invalidate_current():
+        """Drop memoized results after a write so later reads in the rerun see it"""
+        memo = _current_request_memo.get()
+        if memo is not None:
+            memo.clear()
+    
+    def get_or_compute(self, key: tuple, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            self.calls += 1
+            if key in self._values:
+                self.hits += 1
+                return self._values[key]
+        
+        value = compute()
+        
+        with self._lock:
+            self._values[key] = value
+        return value
+    
+    def clear(self):
+        with self._lock:
+            if self._values:
+                self.invalidations += 1
+            self._values.clear()
+    
+    def stats(self) -> Dict:
+        """Call counters; hits are duplicate calls that were served from the memo"""
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'duplicate_calls_removed': self.hits,
+                'computed': self.calls - self.hits,
+                'invalidations': self.invalidations
+            }
+
+@contextmanager
+def request_scope():
+    """Activate a fresh RequestMemo for the duration of one rerun"""
+    memo = RequestMemo()
+    token = _current_request_memo.set(memo)
+    try:
+        yield memo
+    finally:
+        _current_request_memo.reset(token)
+
+def memoize_per_request(method):
+    """Memoize a service method by (instance, method, arguments) within the active request scope"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        memo = _current_request_memo.get()
+        if memo is None:
+            return method(self, *args, **kwargs)
+        
+        key = (id(self), method.__qualname__, args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return method(self, *args, **kwargs)
+        return memo.get_or_compute(key, lambda: method(self, *args, **kwargs))
+    
+    return wrapper
+
+# =============================================================================
+# BUSINESS LOGIC SERVICES
+# =============================================================================
+
+class AuthenticationService:
     """Complete authentication and session management"""
     
     def __init__(self, db_manager: DatabaseManager):
@@ -573,13 +1765,29 @@ class FacilityService:
     def __init__(self, db_manager: DatabaseManager):
         self.db = db_manager
         
+    @memoize_per_request
     def get_all_facilities(self) -> List[Dict]:
         """Get all facilities with current status"""
-        return self.db.execute_query("SELECT * FROM facilities ORDER BY name")
+        return self.db.execute_query("SELECT * FROM facilities ORDER BY name", cache=True)
+    
+    @memoize_per_request
+    def get_facilities_page(self, after: Optional[tuple] = None, limit: int = Config.PAGE_SIZE,
+                            facility_type: Optional[str] = None) -> Dict:
+        """Get one keyset page of facilities ordered by name"""
+        where, params = [], []
+        if facility_type:
+            where.append("type = ?")
+            params.append(facility_type)
+        return self.db.query_page(
+            "SELECT id, name, type, capacity, hourly_rate, location, status FROM facilities",
+            ('name', 'id'), where, tuple(params), after, limit,
+            dtypes={'hourly_rate': np.float64}
+        )
     
+    @memoize_per_request
     def get_facility_by_id(self, facility_id: int) -> Optional[Dict]:
         """Get specific facility"""
-        results = self.db.execute_query("SELECT * FROM facilities WHERE id = ?", (facility_id,))
+        results = self.db.execute_query("SELECT * FROM facilities WHERE id = ?", (facility_id,), cache=True)
         return results[0] if results else None
     
     def create_facility(self, data: Dict) -> bool:
@@ -606,36 +1814,117 @@ class FacilityService:
             facility_id
         ))
     
+    @memoize_per_request
     def get_facility_utilization_stats(self) -> Dict:
         """Get comprehensive facility utilization statistics"""
-        facilities = self.get_all_facilities()
+        results = self.db.execute_query('''
+            SELECT COUNT(*) AS total_facilities,
+                   COALESCE(SUM(status = 'active'), 0) AS active_facilities,
+                   AVG(utilization) AS average_utilization,
+                   SUM(capacity) AS total_capacity,
+                   SUM(revenue) AS total_revenue,
+                   COALESCE(SUM(utilization > 85), 0) AS high_utilization_count,
+                   COALESCE(SUM(utilization < 60), 0) AS low_utilization_count
+            FROM facilities
+        ''', cache=True)
         
-        if not facilities:
+        if not results or not results[0]['total_facilities']:
             return {}
-            
-        total_utilization = sum(f['utilization'] for f in facilities)
-        avg_utilization = total_utilization / len(facilities)
         
-        return {
-            'total_facilities': len(facilities),
-            'active_facilities': len([f for f in facilities if f['status'] == 'active']),
-            'average_utilization': round(avg_utilization, 2),
-            'total_capacity': sum(f['capacity'] for f in facilities),
-            'total_revenue': sum(f['revenue'] for f in facilities),
-            'high_utilization_count': len([f for f in facilities if f['utilization'] > 85]),
-            'low_utilization_count': len([f for f in facilities if f['utilization'] < 60])
-        }
+        stats = results[0]
+        stats['average_utilization'] = round(stats['average_utilization'], 2)
+        return stats
 
 class MemberService:
     """Complete member management and CRM"""
     
     def __init__(self, db_manager: DatabaseManager):
         self.db = db_manager
+        self.search_enabled = self.db.has_table('members_fts')
         
+    @staticmethod
+    def _search_terms(text: str) -> List[str]:
+        """Split search input into the alphanumeric tokens FTS5's unicode61 tokenizer indexes"""
+        return re.findall(r'[^\W_]+', (text or '').lower())
+    
+    @memoize_per_request
+    def search_members(self, text: str, limit: int = Config.MEMBER_SEARCH_LIMIT) -> List[Dict]:
+        """Ranked prefix search over member ID, name, email and phone"""
+        terms = self._search_terms(text)
+        if not terms:
+            return []
+        if not self.search_enabled:
+            return self.get_members_page(limit=limit, search=text)['rows'].to_dict('records')
+        
+        match = ' '.join(f'"{term}"*' for term in terms)
+        columns = "m.id, m.member_id, m.name, m.email, m.phone, m.tier, m.status"
+        cap = Config.MEMBER_SEARCH_CANDIDATES
+        
+        # Rows where the input starts the member ID, the full name or the email rank first
+        prefix = terms[0] + '%'
+        starts_with = "m.member_id LIKE ? DESC, m.name LIKE ? DESC, m.name LIKE ? DESC, m.email LIKE ? DESC"
+        starts_with_params = (prefix, ' '.join(terms) + '%', prefix, prefix)
+        
+        # bm25 reads each term's whole doclist for its IDF, so rank with it only when every term is selective
+        if all(self._count_matches(f'"{term}"*', cap + 1) <= cap for term in terms):
+            return self.db.execute_query(f'''
+                SELECT {columns}
+                FROM members_fts JOIN members m ON m.id = members_fts.rowid
+                WHERE members_fts MATCH ?
+                ORDER BY {starts_with}, bm25(members_fts, 10.0, 5.0, 2.0, 1.0)
+                LIMIT ?
+            ''', (match,) + starts_with_params + (limit,))
+        
+        # Broad prefix (a letter or two, a shared area code): order a bounded candidate set instead
+        return self.db.execute_query(f'''
+            SELECT {columns}
+            FROM (SELECT rowid FROM members_fts WHERE members_fts MATCH ? LIMIT ?) AS candidates
+            JOIN members m ON m.id = candidates.rowid
+            ORDER BY {starts_with}, m.name
+            LIMIT ?
+        ''', (match, cap) + starts_with_params + (limit,))
+    
+    def _count_matches(self, match: str, cap: int) -> int:
+        """Number of members_fts rows matching an FTS5 expression, counted up to cap"""
+        counted = self.db.execute_query(
+            "SELECT COUNT(*) AS matches FROM (SELECT rowid FROM members_fts WHERE members_fts MATCH ? LIMIT ?)",
+            (match, cap)
+        )
+        return counted[0]['matches'] if counted else 0
+    
+    @memoize_per_request
     def get_all_members(self) -> List[Dict]:
         """Get all members with current status"""
         return self.db.execute_query("SELECT * FROM members ORDER BY name")
     
+    @memoize_per_request
+    def get_members_page(self, after: Optional[tuple] = None, limit: int = Config.PAGE_SIZE,
+                         tier: Optional[str] = None, status: Optional[str] = None,
+                         search: Optional[str] = None) -> Dict:
+        """Get one keyset page of the member directory, filtered in SQL"""
+        where, params = [], []
+        if tier:
+            where.append("tier = ?")
+            params.append(tier)
+        if status:
+            where.append("status = ?")
+            params.append(status)
+        if search and self.search_enabled:
+            terms = self._search_terms(search)
+            if terms:
+                where.append("id IN (SELECT rowid FROM members_fts WHERE members_fts MATCH ?)")
+                params.append(' '.join(f'"{term}"*' for term in terms))
+        elif search:
+            pattern = '%' + re.sub(r'([\\%_])', r'\\\1', search.strip()) + '%'
+            where.append("(name LIKE ? ESCAPE '\\' OR email LIKE ? ESCAPE '\\' OR member_id LIKE ? ESCAPE '\\')")
+            params.extend([pattern] * 3)
+        return self.db.query_page('''
+            SELECT id, member_id, name, email, tier, total_spent, status, date(join_date) AS join_date
+            FROM members
+        ''', ('name', 'id'), where, tuple(params), after, limit,
+            dtypes={'total_spent': np.float64}, parse_dates=['join_date'])
+    
+    @memoize_per_request
     def get_member_by_id(self, member_id: str) -> Optional[Dict]:
         """Get specific member by member_id"""
         results = self.db.execute_query("SELECT * FROM members WHERE member_id = ?", (member_id,))
@@ -661,27 +1950,32 @@ class MemberService:
             (amount, member_id)
         )
     
+    @memoize_per_request
     def get_member_statistics(self) -> Dict:
         """Get comprehensive member statistics"""
-        members = self.get_all_members()
+        # One row per tier; idx_members_tier_status_spent makes this an index-only scan
+        tiers = self.db.execute_query('''
+            SELECT tier,
+                   COUNT(*) AS members,
+                   SUM(status = 'active') AS active,
+                   COALESCE(SUM(total_spent), 0) AS spending
+            FROM members
+            GROUP BY tier
+        ''', cache=True)
         
-        if not members:
+        if not tiers:
             return {}
         
-        tier_counts = {}
-        total_spending = 0
-        
-        for member in members:
-            tier = member['tier']
-            tier_counts[tier] = tier_counts.get(tier, 0) + 1
-            total_spending += member['total_spent']
+        tier_counts = {t['tier']: t['members'] for t in tiers}
+        total_members = sum(tier_counts.values())
+        total_spending = sum(t['spending'] for t in tiers)
         
         return {
-            'total_members': len(members),
-            'active_members': len([m for m in members if m['status'] == 'active']),
+            'total_members': total_members,
+            'active_members': sum(t['active'] for t in tiers),
             'tier_distribution': tier_counts,
             'total_spending': round(total_spending, 2),
-            'average_spending': round(total_spending / len(members), 2) if members else 0,
+            'average_spending': round(total_spending / total_members, 2) if total_members else 0,
             'premium_members': tier_counts.get('Premium', 0) + tier_counts.get('Elite', 0)
         }
 
@@ -690,126 +1984,2113 @@ class EquipmentService:
     
     def __init__(self, db_manager: DatabaseManager):
         self.db = db_manager
+        self._listeners: List[Callable[[str, Dict], None]] = []
+    
+    def add_listener(self, listener: Callable[[str, Dict], None]):
+        """Call listener(event, change) after each check-out, check-in and service this service records"""
+        self._listeners.append(listener)
+    
+    def _notify(self, event: str, rental: Dict):
+        for listener in self._listeners:
+            try:
+                listener(event, rental)
+            except Exception as e:
+                logger.error(f"Equipment listener error: {e}")
+    
+    def _versions(self) -> tuple:
+        return self.db.table_version('equipment'), self.db.table_version('rentals')
+    
+    def _write_versions(self, before: tuple, wrote_rentals: bool) -> Dict:
+        """Version bookkeeping that lets listeners tell whether only our write happened"""
+        after = self._versions()
+        expected = (before[0] + 1, before[1] + int(wrote_rentals))
+        return {'previous_versions': before, 'versions': after, 'exclusive': after == expected}
         
+    @memoize_per_request
     def get_all_equipment(self) -> List[Dict]:
         """Get all equipment with current status"""
-        return self.db.execute_query("SELECT * FROM equipment ORDER BY category, name")
+        return self.db.execute_query("SELECT * FROM equipment ORDER BY category, name", cache=True)
+    
+    # Inventory columns; monthly_revenue is settled rental charges over the revenue window
+    INVENTORY_SELECT = '''
+        SELECT id, name, category, available, rented, daily_rate,
+               COALESCE(earned.revenue, 0) AS monthly_revenue, condition_score, status
+        FROM equipment
+        LEFT JOIN (
+            SELECT equipment_id, SUM(charge) AS revenue FROM rentals
+            WHERE returned_at IS NOT NULL AND returned_at >= ?
+            GROUP BY equipment_id
+        ) AS earned ON earned.equipment_id = equipment.id
+    '''
+    INVENTORY_DTYPES = {'daily_rate': np.float64, 'monthly_revenue': np.float64,
+                        'condition_score': np.float64}
+    
+    # Ledger timestamps are local wall-clock time, matching booking dates
+    TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+    
+    @classmethod
+    def _revenue_since(cls) -> str:
+        """Start of the rolling monthly revenue window"""
+        return (datetime.now() - timedelta(days=Config.RENTAL_REVENUE_DAYS)).strftime(cls.TIME_FORMAT)
     
+    @memoize_per_request
+    def get_equipment_page(self, after: Optional[tuple] = None, limit: int = Config.PAGE_SIZE,
+                           category: Optional[str] = None) -> Dict:
+        """Get one keyset page of equipment ordered by category and name"""
+        where, params = [], [self._revenue_since()]
+        if category:
+            where.append("category = ?")
+            params.append(category)
+        return self.db.query_page(self.INVENTORY_SELECT, ('category', 'name', 'id'), where, tuple(params),
+                                  after, limit, dtypes=self.INVENTORY_DTYPES)
+    
+    @memoize_per_request
+    def get_equipment_frame(self) -> pd.DataFrame:
+        """Get the equipment inventory as a DataFrame"""
+        return self.db.query_frame(self.INVENTORY_SELECT + " ORDER BY category, name",
+                                   (self._revenue_since(),), dtypes=self.INVENTORY_DTYPES)
+    
+    def _record_rental(self, conn: sqlite3.Connection, equipment_id: int, member_id: Optional[int],
+                       quantity: int, rented_at: datetime, due_at: datetime) -> Optional[int]:
+        """Take stock and write the ledger row in the caller's transaction; None if too few are available"""
+        if conn.execute(self.RENT_SQL, (quantity, quantity, equipment_id, quantity)).rowcount != 1:
+            return None
+        cursor = conn.execute('''
+            INSERT INTO rentals (equipment_id, member_id, quantity, daily_rate, rented_at, due_at)
+            SELECT id, ?, ?, daily_rate, ?, ? FROM equipment WHERE id = ?
+        ''', (member_id, quantity, rented_at.strftime(self.TIME_FORMAT),
+              due_at.strftime(self.TIME_FORMAT), equipment_id))
+        return cursor.lastrowid
+    
+    def check_out(self, equipment_id: int, member_id: Optional[int], quantity: int = 1,
+                  days: int = Config.RENTAL_DEFAULT_DAYS, now: Optional[datetime] = None) -> Optional[int]:
+        """Rent equipment to a member and record it in the ledger; returns the rental id or None"""
+        if quantity <= 0 or days <= 0:
+            return None
+        rented_at = now or datetime.now()
+        due_at = rented_at + timedelta(days=days)
+        
+        versions = self._versions()
+        try:
+            rental_id = self.db.transaction(
+                lambda conn: self._record_rental(conn, equipment_id, member_id, quantity, rented_at, due_at))
+        except Exception as e:
+            logger.error(f"Check-out error: {e}")
+            return None
+        
+        # Rejected check-outs still count as an equipment write, so listeners hear about them too
+        self._notify('rented', dict(self._write_versions(versions, rental_id is not None),
+                                    id=rental_id, equipment_id=equipment_id, quantity=quantity))
+        return rental_id
+    
+    def check_out_batch(self, items: Dict[int, int], member_id: Optional[int],
+                        days: int = Config.RENTAL_DEFAULT_DAYS,
+                        now: Optional[datetime] = None) -> Optional[List[int]]:
+        """Rent several items ({equipment_id: quantity}) in one transaction; all or nothing.
+        
+        Returns the rental ids in item order, or None if any item is short.
+        """
+        if not items or days <= 0 or any(quantity <= 0 for quantity in items.values()):
+            return None
+        rented_at = now or datetime.now()
+        due_at = rented_at + timedelta(days=days)
+        
+        def record_all(conn: sqlite3.Connection) -> List[int]:
+            rental_ids = []
+            for equipment_id, quantity in items.items():
+                rental_id = self._record_rental(conn, equipment_id, member_id, quantity, rented_at, due_at)
+                if rental_id is None:
+                    raise ValueError(f"Equipment {equipment_id} has fewer than {quantity} available")
+                rental_ids.append(rental_id)
+            return rental_ids
+        
+        versions = self._versions()
+        try:
+            rental_ids = self.db.transaction(record_all)
+        except Exception as e:
+            logger.warning(f"Batch check-out rolled back: {e}")
+            return None
+        
+        self._notify('rented', dict(self._write_versions(versions, True), ids=rental_ids,
+                                    equipment_id=None, items=dict(items)))
+        return rental_ids
+    
+    def _settle_rental(self, conn: sqlite3.Connection, rental_id: int, returned_at: datetime) -> Optional[Dict]:
+        """Close an open rental in the caller's transaction: charge it, restock and wear the equipment"""
+        rental = conn.execute(
+            "SELECT equipment_id, quantity, daily_rate, rented_at FROM rentals WHERE id = ? AND returned_at IS NULL",
+            (rental_id,)
+        ).fetchone()
+        if rental is None:
+            return None
+        
+        elapsed = returned_at - datetime.strptime(rental['rented_at'], self.TIME_FORMAT)
+        days = max(1, math.ceil(elapsed.total_seconds() / 86400))
+        charge = round(days * rental['quantity'] * rental['daily_rate'], 2)
+        
+        # Guarded on returned_at so a concurrent check-in of the same rental cannot settle it twice
+        closed = conn.execute(
+            "UPDATE rentals SET returned_at = ?, charge = ? WHERE id = ? AND returned_at IS NULL",
+            (returned_at.strftime(self.TIME_FORMAT), charge, rental_id)
+        ).rowcount
+        if closed != 1:
+            return None
+        quantity = rental['quantity']
+        if conn.execute(self.RETURN_SQL, (quantity, quantity, rental['equipment_id'], quantity)).rowcount != 1:
+            raise ValueError(f"Equipment {rental['equipment_id']} has fewer than {quantity} rented")
+        
+        # Each unit-day of use wears the whole fleet's shared condition score a little
+        wear_units = Config.EQUIPMENT_WEAR_PER_UNIT_DAY * quantity * days
+        equipment = conn.execute('''
+            UPDATE equipment
+            SET condition_score = MAX(0, condition_score - ? / MAX(available + rented, 1))
+            WHERE id = ?
+            RETURNING condition_score, ? / MAX(available + rented, 1) AS wear
+        ''', (wear_units, rental['equipment_id'], wear_units)).fetchone()
+        return {
+            'id': rental_id, 'equipment_id': rental['equipment_id'], 'quantity': quantity,
+            'days': days, 'charge': charge, 'condition_score': equipment['condition_score'],
+            'wear': equipment['wear']
+        }
+    
+    def check_in(self, rental_id: int, now: Optional[datetime] = None) -> Optional[float]:
+        """Return a rental, charging each started day and wearing the equipment's condition.
+        
+        Returns the charge, or None if the rental is not open.
+        """
+        returned_at = now or datetime.now()
+        
+        versions = self._versions()
+        try:
+            rental = self.db.transaction(lambda conn: self._settle_rental(conn, rental_id, returned_at))
+        except Exception as e:
+            logger.error(f"Check-in error: {e}")
+            return None
+        if rental is None:
+            return None
+        
+        self._notify('returned', dict(rental, **self._write_versions(versions, True)))
+        return rental['charge']
+    
+    def complete_maintenance(self, equipment_id: int, interval_days: int = Config.MAINTENANCE_INTERVAL_DAYS,
+                             now: Optional[datetime] = None) -> bool:
+        """Record a service: restore full condition and schedule the next one"""
+        today = (now or datetime.now()).date()
+        versions = self._versions()
+        updated = self.db.execute_rowcount('''
+            UPDATE equipment SET condition_score = 10.0, last_maintenance = ?, next_maintenance = ?
+            WHERE id = ?
+        ''', (today.isoformat(), (today + timedelta(days=interval_days)).isoformat(), equipment_id)) == 1
+        if updated:
+            self._notify('serviced', dict(
+                self._write_versions(versions, False), equipment_id=equipment_id, condition_score=10.0,
+                next_maintenance=(today + timedelta(days=interval_days)).isoformat()
+            ))
+        return updated
+    
+    @memoize_per_request
+    def get_open_rentals(self, equipment_id: Optional[int] = None) -> List[Dict]:
+        """Get rentals not yet returned, oldest due first"""
+        where, params = "", ()
+        if equipment_id is not None:
+            where, params = "AND r.equipment_id = ?", (equipment_id,)
+        return self.db.execute_query(f'''
+            SELECT r.id, r.equipment_id, e.name AS equipment_name, r.member_id,
+                   COALESCE(m.name, 'Walk-in') AS member_name, r.quantity, r.rented_at, r.due_at
+            FROM rentals r
+            JOIN equipment e ON e.id = r.equipment_id
+            LEFT JOIN members m ON m.id = r.member_id
+            WHERE r.returned_at IS NULL {where}
+            ORDER BY r.due_at
+        ''', params)
+    
+    @memoize_per_request
+    def get_overdue_rentals(self, as_of: Optional[datetime] = None) -> List[Dict]:
+        """Get open rentals past their due time; a range scan of the open-rental due index"""
+        as_of = (as_of or datetime.now()).strftime(self.TIME_FORMAT)
+        return self.db.execute_query('''
+            SELECT r.id, r.equipment_id, e.name AS equipment_name, r.member_id,
+                   COALESCE(m.name, 'Walk-in') AS member_name, m.phone, r.quantity, r.due_at,
+                   CAST(julianday(?) - julianday(r.due_at) AS INTEGER) AS days_overdue
+            FROM rentals r
+            JOIN equipment e ON e.id = r.equipment_id
+            LEFT JOIN members m ON m.id = r.member_id
+            WHERE r.returned_at IS NULL AND r.due_at < ?
+            ORDER BY r.due_at
+        ''', (as_of, as_of))
+    
+    # Check and decrement in one statement, so concurrent rentals can never oversell
+    RENT_SQL = "UPDATE equipment SET available = available - ?, rented = rented + ? WHERE id = ? AND available >= ?"
+    RETURN_SQL = "UPDATE equipment SET available = available + ?, rented = rented - ? WHERE id = ? AND rented >= ?"
+    
+    # Counter-style API kept for existing callers; every unit still goes through the ledger as a walk-in rental
     def rent_equipment(self, equipment_id: int, quantity: int = 1) -> bool:
-        """Rent equipment (decrease available, increase rented)"""
-        equipment = self.db.execute_query("SELECT * FROM equipment WHERE id = ?", (equipment_id,))
+        """Rent walk-in equipment if enough is available"""
+        return self.check_out(equipment_id, None, quantity) is not None
+    
+    def rent_equipment_batch(self, items: Dict[int, int]) -> bool:
+        """Rent several walk-in items ({equipment_id: quantity}) in one transaction; all or nothing"""
+        return self.check_out_batch(items, None) is not None
+    
+    def return_equipment(self, equipment_id: int, quantity: int = 1, now: Optional[datetime] = None) -> bool:
+        """Return walk-in units, settling the item's oldest walk-in rentals first; False if fewer are out"""
+        if quantity <= 0:
+            return False
+        returned_at = now or datetime.now()
         
-        if not equipment:
+        def settle_units(conn: sqlite3.Connection) -> Optional[List[Dict]]:
+            open_rentals = conn.execute('''
+                SELECT id, quantity FROM rentals
+                WHERE equipment_id = ? AND member_id IS NULL AND returned_at IS NULL
+                ORDER BY rented_at, id
+            ''', (equipment_id,)).fetchall()
+            if sum(rental['quantity'] for rental in open_rentals) < quantity:
+                return None
+            
+            settled, remaining = [], quantity
+            for rental in open_rentals:
+                rental_id = rental['id']
+                if rental['quantity'] > remaining:
+                    # Split off the returned units as their own rental, leaving the rest open
+                    conn.execute("UPDATE rentals SET quantity = quantity - ? WHERE id = ?", (remaining, rental_id))
+                    rental_id = conn.execute('''
+                        INSERT INTO rentals (equipment_id, member_id, quantity, daily_rate, rented_at, due_at)
+                        SELECT equipment_id, member_id, ?, daily_rate, rented_at, due_at FROM rentals WHERE id = ?
+                    ''', (remaining, rental_id)).lastrowid
+                settled.append(self._settle_rental(conn, rental_id, returned_at))
+                remaining -= settled[-1]['quantity']
+                if not remaining:
+                    break
+            return settled
+        
+        versions = self._versions()
+        try:
+            settled = self.db.transaction(settle_units)
+        except Exception as e:
+            logger.error(f"Return error: {e}")
+            return False
+        if settled is None:
             return False
         
-        current = equipment[0]
-        if current['available'] >= quantity:
-            new_available = current['available'] - quantity
-            new_rented = current['rented'] + quantity
+        # One write settled every rental, so only a single settlement can be applied incrementally
+        change = self._write_versions(versions, True)
+        change['exclusive'] = change['exclusive'] and len(settled) == 1
+        for rental in settled:
+            self._notify('returned', dict(rental, **change))
+        return True
+
+class RegistrationBatcher:
+    """Single writer thread that commits bursts of event registrations in one transaction.
+    
+    Requests queue up while the previous batch commits, so a rush of clicks becomes a few
+    transactions instead of one each. Within a batch, seats go to requests in arrival order
+    and the rest join the event's FIFO waitlist. The thread exits when idle and restarts on
+    the next request.
+    """
+    
+    def __init__(self, db_manager: DatabaseManager, max_batch: int = Config.REGISTRATION_BATCH_SIZE,
+                 max_wait: float = Config.REGISTRATION_BATCH_WAIT, idle_timeout: float = 30.0):
+        self.db = db_manager
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.idle_timeout = idle_timeout
+        self._requests: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.batches = 0
+        self.requests = 0
+    
+    def submit(self, event_id: int, member_id: int) -> Future:
+        """Queue a registration; the future resolves to its outcome once committed"""
+        future = Future()
+        with self._lock:
+            self._requests.put((event_id, member_id, future))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="event-registrations", daemon=True)
+                self._thread.start()
+        return future
+    
+    def stop(self, timeout: float = 5.0):
+        """Finish queued requests and stop the worker"""
+        with self._lock:
+            thread = self._thread
+            if thread is not None:
+                self._requests.put(None)
+        if thread is not None:
+            thread.join(timeout)
+    
+    def _run(self):
+        while True:
+            try:
+                first = self._requests.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                with self._lock:
+                    if self._requests.empty():
+                        self._thread = None
+                        return
+                continue
             
-            return self.db.execute_update(
-                "UPDATE equipment SET available = ?, rented = ? WHERE id = ?",
-                (new_available, new_rented, equipment_id)
-            )
-        return False
+            batch, stopping = [first], first is None
+            deadline = time.perf_counter() + self.max_wait
+            while not stopping and len(batch) < self.max_batch:
+                try:
+                    request = self._requests.get(timeout=max(0.0, deadline - time.perf_counter()))
+                except queue.Empty:
+                    break
+                stopping = request is None
+                batch.append(request)
+            
+            self._process([request for request in batch if request is not None])
+            if stopping:
+                with self._lock:
+                    self._thread = None
+                return
     
-    def return_equipment(self, equipment_id: int, quantity: int = 1) -> bool:
-        """Return equipment (increase available, decrease rented)"""
-        equipment = self.db.execute_query("SELECT * FROM equipment WHERE id = ?", (equipment_id,))
+    def _process(self, batch: List[tuple]):
+        """Commit one batch and resolve each request's future"""
+        batch = [request for request in batch if request[2].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        try:
+            outcomes = self.db.transaction(lambda conn: self._allocate(conn, batch))
+        except Exception as e:
+            logger.error(f"Registration batch failed: {e}")
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
         
-        if not equipment:
-            return False
+        self.batches += 1
+        self.requests += len(batch)
+        for (_, _, future), outcome in zip(batch, outcomes):
+            future.set_result(outcome)
+    
+    def _allocate(self, conn: sqlite3.Connection, batch: List[tuple]) -> List[Dict]:
+        """Seat or waitlist each request in arrival order; repeats return the member's live registration"""
+        now = datetime.now().strftime(EquipmentService.TIME_FORMAT)
+        outcomes: List[Optional[Dict]] = [None] * len(batch)
+        by_event: Dict[int, List[int]] = {}
+        for index, (event_id, _, _) in enumerate(batch):
+            by_event.setdefault(event_id, []).append(index)
         
-        current = equipment[0]
-        if current['rented'] >= quantity:
-            new_available = current['available'] + quantity
-            new_rented = current['rented'] - quantity
+        member_ids = sorted({member_id for _, member_id, _ in batch})
+        known = {row[0] for row in conn.execute(
+            f"SELECT id FROM members WHERE id IN ({', '.join('?' * len(member_ids))})", member_ids
+        )}
+        
+        for event_id, indices in by_event.items():
+            event = conn.execute(
+                "SELECT capacity, registered, status FROM events WHERE id = ?", (event_id,)
+            ).fetchone()
+            batch_members = sorted({batch[i][1] for i in indices})
+            live = {row['member_id']: dict(row) for row in conn.execute(f'''
+                SELECT id, member_id, status FROM event_registrations
+                WHERE event_id = ? AND status != 'cancelled' AND member_id IN ({', '.join('?' * len(batch_members))})
+            ''', (event_id, *batch_members))}
+            waiting = conn.execute(
+                "SELECT COUNT(*) FROM event_registrations WHERE event_id = ? AND status = 'waitlisted'", (event_id,)
+            ).fetchone()[0]
+            # No capacity means no limit, as before the roster existed
+            if event is None:
+                free = 0
+            elif event['capacity'] is None:
+                free = len(indices)
+            else:
+                free = max(0, event['capacity'] - event['registered'])
+            seated = 0
             
-            return self.db.execute_update(
-                "UPDATE equipment SET available = ?, rented = ? WHERE id = ?",
-                (new_available, new_rented, equipment_id)
-            )
-        return False
+            for index in indices:
+                member_id = batch[index][1]
+                outcome = {'event_id': event_id, 'member_id': member_id, 'registration_id': None,
+                           'status': 'rejected', 'waitlist_position': None, 'duplicate': False}
+                outcomes[index] = outcome
+                
+                if member_id in live:
+                    registration = live[member_id]
+                    if registration['status'] == 'waitlisted' and registration.get('position') is None:
+                        registration['position'] = conn.execute('''
+                            SELECT COUNT(*) FROM event_registrations
+                            WHERE event_id = ? AND status = 'waitlisted' AND id <= ?
+                        ''', (event_id, registration['id'])).fetchone()[0]
+                    outcome.update(registration_id=registration['id'], status=registration['status'],
+                                   waitlist_position=registration.get('position'), duplicate=True)
+                    continue
+                if event is None or event['status'] != 'active' or member_id not in known:
+                    continue
+                
+                # Seats only go to newcomers while nobody is already waiting for one
+                status = 'registered' if seated < free and waiting == 0 else 'waitlisted'
+                cursor = conn.execute('''
+                    INSERT INTO event_registrations (event_id, member_id, status, requested_at)
+                    VALUES (?, ?, ?, ?)
+                ''', (event_id, member_id, status, now))
+                if status == 'registered':
+                    seated += 1
+                else:
+                    waiting += 1
+                position = waiting if status == 'waitlisted' else None
+                live[member_id] = {'id': cursor.lastrowid, 'status': status, 'position': position}
+                outcome.update(registration_id=cursor.lastrowid, status=status, waitlist_position=position)
+            
+            if seated:
+                # The guard makes overbooking impossible even if capacity changed under us
+                updated = conn.execute('''
+                    UPDATE events SET registered = registered + ?
+                    WHERE id = ? AND (capacity IS NULL OR registered + ? <= capacity)
+                ''', (seated, event_id, seated)).rowcount
+                if updated != 1:
+                    raise ValueError(f"Event {event_id} capacity changed during registration")
+        
+        return outcomes
+    
+    def stats(self) -> Dict:
+        """Committed batches and requests"""
+        return {'batches': self.batches, 'requests': self.requests,
+                'average_batch': round(self.requests / self.batches, 2) if self.batches else 0,
+                'queued': self._requests.qsize()}
 
 class EventService:
     """Complete event and tournament management"""
     
-    def __init__(self, db_manager: DatabaseManager):
-        self.db = db_manager
+    def __init__(self, db_manager: DatabaseManager):
+        self.db = db_manager
+        self.registrations = RegistrationBatcher(db_manager)
+    
+    def close(self):
+        """Stop the registration writer after it commits what is queued"""
+        self.registrations.stop()
+        
+    @memoize_per_request
+    def get_all_events(self) -> List[Dict]:
+        """Get all events"""
+        return self.db.execute_query("SELECT * FROM events ORDER BY start_date", cache=True)
+    
+    @memoize_per_request
+    def get_events_page(self, after: Optional[tuple] = None, limit: int = Config.PAGE_SIZE,
+                        event_type: Optional[str] = None, status: Optional[str] = None) -> Dict:
+        """Get one keyset page of events ordered by start date"""
+        where, params = [], []
+        if event_type:
+            where.append("event_type = ?")
+            params.append(event_type)
+        if status:
+            where.append("status = ?")
+            params.append(status)
+        return self.db.query_page('''
+            SELECT id, name, event_type, start_date, end_date, registered, capacity, price,
+                   status, organizer
+            FROM events
+        ''', ('start_date', 'id'), where, tuple(params), after, limit,
+            dtypes={'price': np.float64})
+    
+    @memoize_per_request
+    def get_events_frame(self) -> pd.DataFrame:
+        """Get all events as a DataFrame"""
+        return self.db.query_frame('''
+            SELECT name, event_type, date(start_date) AS start_date, date(end_date) AS end_date,
+                   registered || '/' || capacity AS registration, price, status, organizer
+            FROM events ORDER BY events.start_date
+        ''', dtypes={'price': np.float64}, parse_dates=['start_date', 'end_date'])
+    
+    @memoize_per_request
+    def get_upcoming_events(self) -> List[Dict]:
+        """Get upcoming events"""
+        return self.db.execute_query(
+            "SELECT * FROM events WHERE start_date > date('now') ORDER BY start_date",
+            cache=True, ttl=300  # date('now') moves, so bound staleness even without writes
+        )
+    
+    def register_for_event(self, event_id: int, member_id: int,
+                           timeout: float = Config.REGISTRATION_TIMEOUT) -> Dict:
+        """Register a member, or waitlist them when full; repeating a registration returns the original.
+        
+        Returns the outcome dict; its status is 'registered', 'waitlisted' or 'rejected'
+        (unknown or inactive event, unknown member, or a failed write).
+        """
+        future = self.registrations.submit(event_id, member_id)
+        try:
+            try:
+                outcome = future.result(timeout)
+            except FutureTimeout:
+                # Withdraw the queued request so it cannot seat the member after we report failure;
+                # if its batch is already committing, its real outcome is only moments away
+                if future.cancel():
+                    raise
+                outcome = future.result()
+        except Exception as e:
+            logger.error(f"Event registration error: {e!r}")
+            return {'event_id': event_id, 'member_id': member_id, 'registration_id': None,
+                    'status': 'rejected', 'waitlist_position': None, 'duplicate': False}
+        # The write ran on the batch thread, so drop this rerun's memoized reads here
+        RequestMemo.invalidate_current()
+        return outcome
+    
+    def cancel_registration(self, event_id: int, member_id: int) -> bool:
+        """Cancel a member's registration; a freed seat goes to the longest-waiting member"""
+        now = datetime.now().strftime(EquipmentService.TIME_FORMAT)
+        
+        def cancel(conn: sqlite3.Connection) -> bool:
+            registration = conn.execute('''
+                SELECT id, status FROM event_registrations
+                WHERE event_id = ? AND member_id = ? AND status != 'cancelled'
+            ''', (event_id, member_id)).fetchone()
+            if registration is None:
+                return False
+            
+            conn.execute("UPDATE event_registrations SET status = 'cancelled', updated_at = ? WHERE id = ?",
+                         (now, registration['id']))
+            if registration['status'] == 'registered':
+                promoted = conn.execute('''
+                    UPDATE event_registrations SET status = 'registered', updated_at = ?
+                    WHERE id = (SELECT id FROM event_registrations
+                                WHERE event_id = ? AND status = 'waitlisted' ORDER BY id LIMIT 1)
+                ''', (now, event_id)).rowcount
+                if not promoted:
+                    conn.execute("UPDATE events SET registered = registered - 1 WHERE id = ? AND registered > 0",
+                                 (event_id,))
+            return True
+        
+        try:
+            return self.db.transaction(cancel)
+        except Exception as e:
+            logger.error(f"Registration cancel error: {e}")
+            return False
+    
+    @memoize_per_request
+    def get_event_registrations(self, event_id: int) -> List[Dict]:
+        """Live registrations for an event: attendees first, then the waitlist in order"""
+        return self.db.execute_query('''
+            SELECT r.id, r.member_id, m.member_id AS member_code,
+                   COALESCE(m.name, 'Unnamed attendee') AS name, r.status, r.requested_at
+            FROM event_registrations r
+            LEFT JOIN members m ON m.id = r.member_id
+            WHERE r.event_id = ? AND r.status != 'cancelled'
+            ORDER BY r.status = 'waitlisted', r.id
+        ''', (event_id,))
+    
+    @memoize_per_request
+    def get_waitlist_counts(self) -> Dict[int, int]:
+        """Waitlisted members per event"""
+        rows = self.db.execute_query('''
+            SELECT event_id, COUNT(*) AS waiting FROM event_registrations
+            WHERE status = 'waitlisted' GROUP BY event_id
+        ''')
+        return {row['event_id']: row['waiting'] for row in rows}
+
+def time_to_minutes(value: str) -> int:
+    """Convert an 'HH:MM' or 'HH:MM:SS' time string to minutes after midnight"""
+    hours, minutes = value.split(':')[:2]
+    return int(hours) * 60 + int(minutes)
+
+def minutes_to_time(minutes: int) -> str:
+    """Format minutes after midnight as 'HH:MM'"""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+class DaySchedule:
+    """Bookings for one facility on one date, as intervals sorted by start time"""
+    
+    SLOTS = 24 * 60 // Config.BOOKING_SLOT_MINUTES
+    
+    def __init__(self):
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self.ids: List[int] = []
+        # reach[i] = index of the latest-ending interval among 0..i, so overlap tests need one bisect
+        self.reach: List[int] = []
+        # Bookings covering each slot of the day; partial slots count as taken
+        self.occupancy = np.zeros(self.SLOTS, dtype=np.int16)
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def conflict(self, start: int, end: int) -> Optional[int]:
+        """Id of a booking overlapping [start, end), or None; O(log n)"""
+        i = bisect.bisect_left(self.starts, end)  # intervals before i start before `end`
+        if i and self.ends[self.reach[i - 1]] > start:
+            return self.ids[self.reach[i - 1]]
+        return None
+    
+    def add(self, start: int, end: int, booking_id: int):
+        """Insert an interval, keeping the lists sorted by start"""
+        i = bisect.bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        self.ids.insert(i, booking_id)
+        self.reach.insert(i, i)
+        self._refresh_reach(i)
+        self.occupancy[self._slots(start, end)] += 1
+    
+    def remove(self, booking_id: int) -> bool:
+        """Drop a booking's interval; returns False if it is not indexed"""
+        try:
+            i = self.ids.index(booking_id)
+        except ValueError:
+            return False
+        self.occupancy[self._slots(self.starts[i], self.ends[i])] -= 1
+        for column in (self.starts, self.ends, self.ids, self.reach):
+            del column[i]
+        self._refresh_reach(i)
+        return True
+    
+    def intervals(self) -> List[tuple]:
+        """(start, end, booking_id) tuples in start order"""
+        return list(zip(self.starts, self.ends, self.ids))
+    
+    @staticmethod
+    def _slots(start: int, end: int) -> slice:
+        slot = Config.BOOKING_SLOT_MINUTES
+        return slice(start // slot, -(-end // slot))
+    
+    def _refresh_reach(self, i: int):
+        for j in range(i, len(self.ids)):
+            if j and self.ends[self.reach[j - 1]] >= self.ends[j]:
+                self.reach[j] = self.reach[j - 1]
+            else:
+                self.reach[j] = j
+
+class BookingService:
+    """Facility reservations with in-memory conflict detection"""
+    
+    def __init__(self, db_manager: DatabaseManager):
+        self.db = db_manager
+        self._lock = threading.RLock()
+        self._schedules: Dict[tuple, DaySchedule] = {}
+        self._indexed_version = None
+        self._listeners: List[Callable[[str, Dict], None]] = []
+        
+    def add_listener(self, listener: Callable[[str, Dict], None]):
+        """Call listener(event, booking) after each booking this service creates or cancels"""
+        self._listeners.append(listener)
+    
+    def _notify(self, event: str, booking: Dict):
+        for listener in self._listeners:
+            try:
+                listener(event, booking)
+            except Exception as e:
+                logger.error(f"Booking listener error: {e}")
+    
+    def rebuild_index(self):
+        """Load every active booking from today on into the per-facility, per-date index"""
+        with self._lock:
+            version = self.db.table_version('bookings')
+            schedules = {}
+            rows = self.db.iter_query('''
+                SELECT id, facility_id, booking_date, start_time, end_time
+                FROM bookings
+                WHERE booking_date >= date('now') AND status != 'cancelled'
+            ''')
+            for row in rows:
+                key = (row['facility_id'], row['booking_date'])
+                schedules.setdefault(key, DaySchedule()).add(
+                    time_to_minutes(row['start_time']), time_to_minutes(row['end_time']), row['id']
+                )
+            self._schedules = schedules
+            self._indexed_version = version
+            logger.info(f"Booking index rebuilt: {sum(map(len, schedules.values()))} bookings "
+                        f"across {len(schedules)} facility-days")
+    
+    def _ensure_current(self):
+        """Rebuild when bookings were written outside this service since the last load"""
+        if self._indexed_version != self.db.table_version('bookings'):
+            self.rebuild_index()
+    
+    def find_conflict(self, facility_id: int, booking_date: str, start_time: str, end_time: str) -> Optional[int]:
+        """Id of an existing booking that overlaps the requested slot, or None"""
+        with self._lock:
+            self._ensure_current()
+            schedule = self._schedules.get((facility_id, booking_date))
+            if schedule is None:
+                return None
+            return schedule.conflict(time_to_minutes(start_time), time_to_minutes(end_time))
+    
+    def create_booking(self, member_id: int, facility_id: int, booking_date: str, start_time: str,
+                       end_time: str, notes: str = "") -> Optional[int]:
+        """Create a confirmed booking; returns its id, or None if invalid or the slot is taken"""
+        start, end = time_to_minutes(start_time), time_to_minutes(end_time)
+        if end <= start or booking_date < datetime.now().date().isoformat():
+            return None
+        
+        facility = self.db.execute_query(
+            "SELECT hourly_rate FROM facilities WHERE id = ? AND status = 'active'", (facility_id,)
+        )
+        if not facility:
+            return None
+        total_cost = round(facility[0]['hourly_rate'] * (end - start) / 60, 2)
+        start_time, end_time = minutes_to_time(start), minutes_to_time(end)
+        
+        with self._lock:
+            self._ensure_current()
+            key = (facility_id, booking_date)
+            if key in self._schedules and self._schedules[key].conflict(start, end) is not None:
+                return None
+            
+            version = self.db.table_version('bookings')
+            try:
+                with self.db.get_connection() as conn:
+                    # The NOT EXISTS guard also catches bookings made by other processes
+                    cursor = conn.execute('''
+                        INSERT INTO bookings (member_id, facility_id, booking_date, start_time, end_time,
+                                              total_cost, status, notes)
+                        SELECT ?, ?, ?, ?, ?, ?, 'confirmed', ?
+                        WHERE NOT EXISTS (
+                            SELECT 1 FROM bookings
+                            WHERE facility_id = ? AND booking_date = ? AND status != 'cancelled'
+                              AND start_time < ? AND end_time > ?
+                        )
+                    ''', (member_id, facility_id, booking_date, start_time, end_time, total_cost, notes,
+                          facility_id, booking_date, end_time, start_time))
+                    booking_id = cursor.lastrowid if cursor.rowcount else None
+            except Exception as e:
+                logger.error(f"Booking error: {e}")
+                return None
+            
+            if booking_id is None:
+                self.rebuild_index()
+                return None
+            
+            self._schedules.setdefault(key, DaySchedule()).add(start, end, booking_id)
+            exclusive = self._track_own_write(version)
+            self._notify('created', {
+                'id': booking_id, 'facility_id': facility_id, 'booking_date': booking_date,
+                'start_time': start_time, 'end_time': end_time,
+                'previous_version': version, 'exclusive': exclusive
+            })
+            return booking_id
+    
+    def cancel_booking(self, booking_id: int) -> bool:
+        """Cancel a booking and free its slot"""
+        with self._lock:
+            self._ensure_current()
+            version = self.db.table_version('bookings')
+            try:
+                with self.db.get_connection() as conn:
+                    row = conn.execute('''
+                        SELECT facility_id, booking_date, start_time, end_time
+                        FROM bookings WHERE id = ? AND status != 'cancelled'
+                    ''', (booking_id,)).fetchone()
+                    if row is None:
+                        return False
+                    conn.execute("UPDATE bookings SET status = 'cancelled' WHERE id = ?", (booking_id,))
+            except Exception as e:
+                logger.error(f"Booking error: {e}")
+                return False
+            
+            schedule = self._schedules.get((row['facility_id'], row['booking_date']))
+            if schedule is not None:
+                schedule.remove(booking_id)
+            exclusive = self._track_own_write(version)
+            self._notify('cancelled', dict(row, id=booking_id, previous_version=version, exclusive=exclusive))
+            return True
+    
+    def create_bookings(self, bookings: List[Dict],
+                        on_commit: Optional[Callable[[sqlite3.Connection, List[int]], None]] = None,
+                        replaces: Optional[List[int]] = None) -> Optional[List[int]]:
+        """Insert many bookings in one transaction; all or none, if any slot is taken or in the past.
+        
+        Each dict has facility_id, booking_date, start_time and end_time, and optionally
+        member_id, event_id, total_cost, payment_status and notes. on_commit(conn, ids) runs
+        inside the same transaction, to record what the bookings are for. Bookings listed in
+        replaces are cancelled in that transaction too, so their slots are free for the new ones.
+        """
+        replaces = list(replaces or [])
+        today = datetime.now().date().isoformat()
+        slots = [(b['facility_id'], b['booking_date'], time_to_minutes(b['start_time']), time_to_minutes(b['end_time']))
+                 for b in bookings]
+        if any(end <= start or day < today for _, day, start, end in slots):
+            return None
+        
+        def insert_all(conn: sqlite3.Connection) -> tuple:
+            released = []
+            if replaces:
+                released = [dict(row) for row in conn.execute(f'''
+                    UPDATE bookings SET status = 'cancelled'
+                    WHERE id IN ({', '.join('?' * len(replaces))}) AND status != 'cancelled'
+                    RETURNING id, facility_id, booking_date, start_time, end_time
+                ''', replaces).fetchall()]
+            ids = []
+            for booking, (facility_id, day, start, end) in zip(bookings, slots):
+                start_time, end_time = minutes_to_time(start), minutes_to_time(end)
+                cursor = conn.execute('''
+                    INSERT INTO bookings (member_id, event_id, facility_id, booking_date, start_time, end_time,
+                                          total_cost, status, payment_status, notes)
+                    SELECT ?, ?, ?, ?, ?, ?, ?, 'confirmed', ?, ?
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM bookings
+                        WHERE facility_id = ? AND booking_date = ? AND status != 'cancelled'
+                          AND start_time < ? AND end_time > ?
+                    )
+                ''', (booking.get('member_id'), booking.get('event_id'), facility_id, day, start_time, end_time,
+                      booking.get('total_cost', 0.0), booking.get('payment_status', 'pending'),
+                      booking.get('notes', ''), facility_id, day, end_time, start_time))
+                if not cursor.rowcount:
+                    raise ValueError(f"Facility {facility_id} is already booked on {day} at {start_time}")
+                ids.append(cursor.lastrowid)
+            if on_commit is not None:
+                on_commit(conn, ids)
+            return ids, released
+        
+        with self._lock:
+            self._ensure_current()
+            for facility_id, day, start, end in slots:
+                schedule = self._schedules.get((facility_id, day))
+                # A replaced booking may hide another overlap; the insert guard still catches that
+                conflict = schedule.conflict(start, end) if schedule is not None else None
+                if conflict is not None and conflict not in replaces:
+                    return None
+            
+            version = self.db.table_version('bookings')
+            try:
+                ids, released = self.db.transaction(insert_all)
+            except Exception as e:
+                logger.error(f"Booking error: {e}")
+                self.rebuild_index()
+                return None
+            
+            for row in released:
+                schedule = self._schedules.get((row['facility_id'], row['booking_date']))
+                if schedule is not None:
+                    schedule.remove(row['id'])
+            for booking_id, (facility_id, day, start, end) in zip(ids, slots):
+                self._schedules.setdefault((facility_id, day), DaySchedule()).add(start, end, booking_id)
+            self._track_own_write(version)
+            # One version bump covers many rows, so listeners resync rather than apply each one
+            for row in released:
+                self._notify('cancelled', dict(row, previous_version=version, exclusive=False))
+            for booking_id, (facility_id, day, start, end) in zip(ids, slots):
+                self._notify('created', {
+                    'id': booking_id, 'facility_id': facility_id, 'booking_date': day,
+                    'start_time': minutes_to_time(start), 'end_time': minutes_to_time(end),
+                    'previous_version': version, 'exclusive': False
+                })
+            return ids
+    
+    def _track_own_write(self, version_before: int) -> bool:
+        """Keep the index current after our own write, unless someone else also wrote meanwhile"""
+        if self.db.table_version('bookings') != version_before + 1:
+            return False
+        self._indexed_version = version_before + 1
+        return True
+    
+    @memoize_per_request
+    def get_bookings(self, booking_date: Optional[str] = None, facility_id: Optional[int] = None,
+                     include_cancelled: bool = False) -> List[Dict]:
+        """List bookings with facility and member names, ordered by date and start time"""
+        where, params = [], []
+        if booking_date:
+            where.append("b.booking_date = ?")
+            params.append(booking_date)
+        if facility_id:
+            where.append("b.facility_id = ?")
+            params.append(facility_id)
+        if not include_cancelled:
+            where.append("b.status != 'cancelled'")
+        
+        return self.db.execute_query(f'''
+            SELECT b.id, b.booking_date, b.start_time, b.end_time, b.total_cost, b.status,
+                   b.payment_status, b.notes, b.facility_id, f.name AS facility_name,
+                   b.member_id, COALESCE(m.name, e.name) AS member_name, b.event_id
+            FROM bookings b
+            JOIN facilities f ON f.id = b.facility_id
+            LEFT JOIN members m ON m.id = b.member_id
+            LEFT JOIN events e ON e.id = b.event_id
+            {"WHERE " + " AND ".join(where) if where else ""}
+            ORDER BY b.booking_date, b.start_time, f.name
+        ''', tuple(params))
+    
+    def slot_bitmaps(self, facility_ids: List[int], dates: List[str],
+                     ignore: frozenset = frozenset()) -> np.ndarray:
+        """Occupancy of every slot of the day as a bool array shaped [facility, date, slot].
+        
+        Bookings in ignore count as free, e.g. ones about to be replaced.
+        """
+        if not facility_ids or not dates:
+            return np.zeros((len(facility_ids), len(dates), DaySchedule.SLOTS), dtype=bool)
+        
+        vacant = DaySchedule().occupancy
+        with self._lock:
+            self._ensure_current()
+            rows = [self._schedules.get((facility_id, day)) for facility_id in facility_ids for day in dates]
+            counts = [vacant if schedule is None else schedule.occupancy for schedule in rows]
+            if ignore:
+                for i, schedule in enumerate(rows):
+                    released = [(start, end) for start, end, booking_id in
+                                (schedule.intervals() if schedule is not None else ()) if booking_id in ignore]
+                    if released:
+                        counts[i] = counts[i].copy()
+                        for start, end in released:
+                            counts[i][DaySchedule._slots(start, end)] -= 1
+            counts = np.concatenate(counts)
+        return (counts > 0).reshape(len(facility_ids), len(dates), DaySchedule.SLOTS)
+    
+    @memoize_per_request
+    def find_available_slots(self, start_date: str, end_date: str, start_time: str, end_time: str,
+                             min_capacity: int = 1, duration_minutes: Optional[int] = None,
+                             facility_type: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        """Cheapest facility-days with duration_minutes free (default: the whole window) in a time window"""
+        slot = Config.BOOKING_SLOT_MINUTES
+        first_slot = time_to_minutes(start_time) // slot
+        last_slot = -(-time_to_minutes(end_time) // slot)
+        needed = -(-(duration_minutes or (last_slot - first_slot) * slot) // slot)
+        
+        today = datetime.now().date()
+        first_day = max(datetime.fromisoformat(start_date).date(), today)
+        last_day = datetime.fromisoformat(end_date).date()
+        if needed <= 0 or needed > last_slot - first_slot or last_day < first_day:
+            return []
+        dates = [(first_day + timedelta(days=i)).isoformat() for i in range((last_day - first_day).days + 1)]
+        
+        where, params = ["status = 'active'", "capacity >= ?"], [min_capacity]
+        if facility_type:
+            where.append("type = ?")
+            params.append(facility_type)
+        facilities = self.db.execute_query(f'''
+            SELECT id, name, type, capacity, hourly_rate FROM facilities
+            WHERE {" AND ".join(where)}
+            ORDER BY hourly_rate, name
+        ''', tuple(params), cache=True)
+        if not facilities:
+            return []
+        
+        free = ~self.slot_bitmaps([f['id'] for f in facilities], dates)[..., first_slot:last_slot]
+        
+        # Free-slot prefix sums: a window of `needed` slots is open when its sum equals `needed`
+        runs = np.cumsum(free, axis=2, dtype=np.int16)
+        runs = np.concatenate([np.zeros(runs.shape[:2] + (1,), dtype=np.int16), runs], axis=2)
+        open_starts = (runs[..., needed:] - runs[..., :-needed]) == needed
+        
+        # Facilities are already in price order, so row-major nonzero() yields cheapest first
+        f_idx, d_idx = np.nonzero(open_starts.any(axis=2))
+        results = []
+        for f, d in zip(f_idx[:limit], d_idx[:limit]):
+            facility = facilities[f]
+            edges = np.diff(np.concatenate(([0], free[f, d].astype(np.int8), [0])))
+            ranges = [(minutes_to_time((first_slot + s) * slot), minutes_to_time((first_slot + e) * slot))
+                      for s, e in zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1))
+                      if e - s >= needed]
+            results.append({
+                'facility_id': facility['id'],
+                'facility_name': facility['name'],
+                'type': facility['type'],
+                'capacity': facility['capacity'],
+                'hourly_rate': facility['hourly_rate'],
+                'date': dates[d],
+                'earliest_start': ranges[0][0],
+                'free_ranges': ranges,
+                'estimated_cost': round(facility['hourly_rate'] * needed * slot / 60, 2)
+            })
+        return results
+    
+    def index_stats(self) -> Dict:
+        """Size of the in-memory booking index"""
+        with self._lock:
+            return {
+                'facility_days': len(self._schedules),
+                'bookings': sum(map(len, self._schedules.values())),
+                'indexed_version': self._indexed_version
+            }
+
+class UtilizationEngine:
+    """Per-facility hour-of-week occupancy built from bookings in a rolling window"""
+    
+    def __init__(self, db_manager: DatabaseManager, booking_service: Optional[BookingService] = None,
+                 window_days: int = Config.UTILIZATION_WINDOW_DAYS):
+        self.db = db_manager
+        # Whole weeks, so every hour-of-week cell is sampled the same number of times
+        self.window_days = max(7, window_days - window_days % 7)
+        self._lock = threading.RLock()
+        self._facilities: List[Dict] = []
+        self._rows: Dict[int, int] = {}
+        self._minutes = np.zeros((0, 7, 24))
+        self._window = None
+        self._versions = None
+        if booking_service is not None:
+            booking_service.add_listener(self._on_booking)
+    
+    def current_window(self) -> tuple:
+        """(first, last) dates covered: half the window behind today, half ahead"""
+        first = datetime.now().date() - timedelta(days=self.window_days // 2)
+        return first, first + timedelta(days=self.window_days - 1)
+    
+    def rebuild(self):
+        """Recompute the booked-minutes matrix from the bookings table"""
+        with self._lock:
+            versions = (self.db.table_version('bookings'), self.db.table_version('facilities'))
+            first, last = self.current_window()
+            facilities = self.db.execute_query(
+                "SELECT id, name, type FROM facilities WHERE status = 'active' ORDER BY name"
+            )
+            rows = {f['id']: i for i, f in enumerate(facilities)}
+            minutes = np.zeros((len(facilities), 7, 24))
+            
+            # Weekday and minute offsets are computed in SQL so the fetch is purely numeric
+            data = self.db.query_arrays('''
+                SELECT facility_id,
+                       (CAST(strftime('%w', booking_date) AS INTEGER) + 6) % 7 AS weekday,
+                       CAST(substr(start_time, 1, 2) AS INTEGER) * 60 + CAST(substr(start_time, 4, 2) AS INTEGER) AS start_minute,
+                       CAST(substr(end_time, 1, 2) AS INTEGER) * 60 + CAST(substr(end_time, 4, 2) AS INTEGER) AS end_minute
+                FROM bookings
+                WHERE booking_date BETWEEN ? AND ? AND status != 'cancelled'
+            ''', (first.isoformat(), last.isoformat()))
+            if data and len(data['facility_id']) and rows:
+                # facility_id -> matrix row; unknown and inactive facilities map to -1
+                lookup = np.full(max(rows) + 2, -1)
+                lookup[list(rows)] = list(rows.values())
+                facility_rows = lookup[np.clip(data['facility_id'], 0, len(lookup) - 1)]
+                self._accumulate(minutes, facility_rows, data['weekday'], data['start_minute'],
+                                 data['end_minute'], 1)
+            
+            self._facilities, self._rows, self._minutes = facilities, rows, minutes
+            self._window, self._versions = (first, last), versions
+    
+    @staticmethod
+    def _accumulate(minutes: np.ndarray, facility_rows: np.ndarray, weekdays: np.ndarray,
+                    starts: np.ndarray, ends: np.ndarray, sign: int):
+        """Add (or with sign=-1 remove) each interval's minutes to its hour-of-week cells"""
+        keep = facility_rows >= 0
+        hour_starts = np.arange(24) * 60
+        per_hour = np.clip(np.minimum(ends[keep, None], hour_starts + 60)
+                           - np.maximum(starts[keep, None], hour_starts), 0, 60)
+        np.add.at(minutes, (facility_rows[keep], weekdays[keep]), sign * per_hour)
+    
+    def _on_booking(self, event: str, booking: Dict):
+        """Apply a booking write incrementally, or mark the matrix stale if it can't be"""
+        with self._lock:
+            if (self._versions is None or not booking['exclusive']
+                    or self._versions[0] != booking['previous_version']):
+                self._versions = None
+                return
+            
+            self._versions = (booking['previous_version'] + 1, self._versions[1])
+            day = datetime.fromisoformat(booking['booking_date']).date()
+            row = self._rows.get(booking['facility_id'])
+            if row is None or not self._window[0] <= day <= self._window[1]:
+                return
+            self._accumulate(self._minutes, np.array([row]), np.array([day.weekday()]),
+                             np.array([time_to_minutes(booking['start_time'])]),
+                             np.array([time_to_minutes(booking['end_time'])]),
+                             1 if event == 'created' else -1)
+    
+    def _ensure_current(self):
+        versions = (self.db.table_version('bookings'), self.db.table_version('facilities'))
+        if self._versions != versions or self._window != self.current_window():
+            self.rebuild()
+    
+    def snapshot(self) -> tuple:
+        """(facilities, utilization) with utilization as percent booked, shaped [facility, weekday, hour]"""
+        with self._lock:
+            self._ensure_current()
+            # Each hour-of-week cell occurs window_days / 7 times in the window
+            capacity = 60.0 * self.window_days / 7
+            return list(self._facilities), np.minimum(self._minutes / capacity * 100, 100)
+    
+    def facility_utilization(self) -> Dict[int, float]:
+        """Percent of operating hours booked, per active facility"""
+        facilities, utilization = self.snapshot()
+        open_hour, close_hour = Config.OPERATING_HOURS
+        averages = utilization[:, :, open_hour:close_hour].mean(axis=(1, 2)) if facilities else []
+        return {f['id']: round(float(value), 2) for f, value in zip(facilities, averages)}
+    
+    def average_utilization(self) -> float:
+        """Percent of operating hours booked across all active facilities"""
+        facilities, utilization = self.snapshot()
+        if not facilities:
+            return 0.0
+        open_hour, close_hour = Config.OPERATING_HOURS
+        return round(float(utilization[:, :, open_hour:close_hour].mean()), 2)
+
+class TrendEngine:
+    """Daily member, revenue and occupancy series, cached per day bucket.
+    
+    A write to a series' tables recomputes only today's bucket; a count over the window then
+    confirms no earlier bucket moved. A mismatch, a write to a table every bucket depends on,
+    or a new day rebuilds the whole window.
+    """
+    
+    # Series -> (tables whose writes land in one day bucket, tables that change every bucket)
+    SERIES = {
+        'member_growth': (('members',), ()),
+        'revenue_trend': (('revenue_daily',), ()),
+        'utilization_trend': (('bookings',), ('facilities',)),
+    }
+    
+    def __init__(self, db_manager: DatabaseManager):
+        self.db = db_manager
+        self._lock = threading.RLock()
+        # (name, days) -> {'window', 'versions', 'values', 'counts', 'base'}
+        self._series: Dict[str, Dict] = {}
+        self._stats = {'hits': 0, 'bucket_updates': 0, 'rebuilds': 0}
+    
+    def _offsets(self, query: str, start: date, end: date) -> Optional[Dict[str, np.ndarray]]:
+        """Run a bucket query whose first parameter is the window start and last two its bounds"""
+        data = self.db.query_arrays(query, (start.isoformat(), start.isoformat(), end.isoformat()),
+                                    dtypes={'offset': np.int64})
+        return data or None
+    
+    def _member_buckets(self, start: date, end: date) -> Optional[tuple]:
+        # join_date holds dates or timestamps; a half-open range on the raw column uses its index
+        data = self._offsets('''
+            SELECT CAST(julianday(date(join_date)) - julianday(?) AS INTEGER) AS offset
+            FROM members
+            WHERE join_date >= ? AND join_date < ?
+        ''', start, end + timedelta(days=1))
+        if data is None:
+            return None
+        counts = np.bincount(data['offset'], minlength=(end - start).days + 1)
+        return counts.astype(np.float64), counts
+    
+    def _revenue_buckets(self, start: date, end: date) -> Optional[tuple]:
+        data = self._offsets('''
+            SELECT CAST(julianday(day) - julianday(?) AS INTEGER) AS offset, amount, transactions
+            FROM revenue_daily
+            WHERE day BETWEEN ? AND ?
+        ''', start, end)
+        if data is None:
+            return None
+        size = (end - start).days + 1
+        return (np.bincount(data['offset'], weights=data['amount'], minlength=size),
+                np.bincount(data['offset'], weights=data['transactions'], minlength=size).astype(np.int64))
+    
+    def _utilization_buckets(self, start: date, end: date) -> Optional[tuple]:
+        data = self._offsets('''
+            SELECT CAST(julianday(b.booking_date) - julianday(?) AS INTEGER) AS offset,
+                   CAST(substr(b.start_time, 1, 2) AS INTEGER) * 60 + CAST(substr(b.start_time, 4, 2) AS INTEGER) AS start_minute,
+                   CAST(substr(b.end_time, 1, 2) AS INTEGER) * 60 + CAST(substr(b.end_time, 4, 2) AS INTEGER) AS end_minute
+            FROM bookings b
+            JOIN facilities f ON f.id = b.facility_id
+            WHERE b.booking_date BETWEEN ? AND ? AND b.status != 'cancelled' AND f.status = 'active'
+        ''', start, end)
+        active = self.db.execute_query("SELECT COUNT(*) AS n FROM facilities WHERE status = 'active'")
+        if data is None or not active:
+            return None
+        
+        size = (end - start).days + 1
+        open_minute, close_minute = (hour * 60 for hour in Config.OPERATING_HOURS)
+        booked = np.clip(np.minimum(data['end_minute'], close_minute) - np.maximum(data['start_minute'], open_minute),
+                         0, None)
+        capacity = active[0]['n'] * (close_minute - open_minute)
+        minutes = np.bincount(data['offset'], weights=booked, minlength=size)
+        utilization = np.minimum(minutes / capacity * 100, 100) if capacity else np.zeros(size)
+        return utilization, np.bincount(data['offset'], minlength=size)
+    
+    def _window_count(self, name: str, start: date, end: date) -> Optional[int]:
+        """Rows behind the series up to the window end; members count from the beginning"""
+        if name == 'member_growth':
+            query = "SELECT COUNT(*) AS n FROM members WHERE join_date < ?"
+            params = ((end + timedelta(days=1)).isoformat(),)
+        elif name == 'revenue_trend':
+            query = "SELECT COALESCE(SUM(transactions), 0) AS n FROM revenue_daily WHERE day BETWEEN ? AND ?"
+            params = (start.isoformat(), end.isoformat())
+        else:
+            query = '''
+                SELECT COUNT(*) AS n FROM bookings b JOIN facilities f ON f.id = b.facility_id
+                WHERE b.booking_date BETWEEN ? AND ? AND b.status != 'cancelled' AND f.status = 'active'
+            '''
+            params = (start.isoformat(), end.isoformat())
+        result = self.db.execute_query(query, params)
+        return int(result[0]['n']) if result else None
+    
+    def _buckets(self, name: str, start: date, end: date) -> Optional[tuple]:
+        compute = {'member_growth': self._member_buckets, 'revenue_trend': self._revenue_buckets,
+                   'utilization_trend': self._utilization_buckets}[name]
+        return compute(start, end)
+    
+    def series(self, name: str, days: int) -> Optional[Dict]:
+        """Cached {'start', 'values', 'counts', 'base'} for the trailing window, or None on error"""
+        bucket_tables, shared_tables = self.SERIES[name]
+        end = datetime.now().date()
+        start = end - timedelta(days=days - 1)
+        
+        key = (name, days)
+        
+        with self._lock:
+            # Versions are read first, so a write racing the queries leaves the cache stale, not wrong
+            versions = tuple(self.db.table_version(t) for t in bucket_tables + shared_tables)
+            cached = self._series.get(key)
+            if cached is not None and cached['window'] == (start, end):
+                if cached['versions'] == versions:
+                    self._stats['hits'] += 1
+                    return cached
+                if cached['versions'][len(bucket_tables):] == versions[len(bucket_tables):]:
+                    newest, total = self._buckets(name, end, end), self._window_count(name, start, end)
+                    if newest is not None and total is not None:
+                        values, counts = cached['values'].copy(), cached['counts'].copy()
+                        values[-1], counts[-1] = newest[0][0], newest[1][0]
+                        if cached['base'] + int(counts.sum()) == total:
+                            self._stats['bucket_updates'] += 1
+                            cached = dict(cached, versions=versions, values=values, counts=counts)
+                            self._series[key] = cached
+                            return cached
+            
+            buckets, total = self._buckets(name, start, end), self._window_count(name, start, end)
+            if buckets is None or total is None:
+                return None
+            self._stats['rebuilds'] += 1
+            cached = {'window': (start, end), 'versions': versions, 'values': buckets[0],
+                      'counts': buckets[1], 'base': total - int(buckets[1].sum())}
+            self._series[key] = cached
+            return cached
+    
+    def _labelled(self, name: str, days: int, column: str, cumulative: bool = False,
+                  decimals: int = 2) -> List[Dict]:
+        series = self.series(name, days)
+        if series is None:
+            return []
+        values = series['base'] + np.cumsum(series['counts']) if cumulative else np.round(series['values'], decimals)
+        first = series['window'][0]
+        return [{'date': (first + timedelta(days=i)).isoformat(), column: value}
+                for i, value in enumerate(values.tolist())]
+    
+    def member_growth(self, days: int = Config.TREND_WINDOW_DAYS) -> List[Dict]:
+        """Total members at the end of each day"""
+        return self._labelled('member_growth', days, 'member_count', cumulative=True)
+    
+    def revenue_trend(self, days: int = Config.TREND_WINDOW_DAYS) -> List[Dict]:
+        """Recorded revenue per day"""
+        return self._labelled('revenue_trend', days, 'revenue')
+    
+    def utilization_trend(self, days: int = Config.UTILIZATION_TREND_DAYS) -> List[Dict]:
+        """Percent of active facilities' operating hours booked per day"""
+        return self._labelled('utilization_trend', days, 'utilization', decimals=1)
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            return dict(self._stats, series=len(self._series))
+
+class MaintenanceScheduler:
+    """Priority queue of equipment ordered by projected service date, then wear rate.
+    
+    An item is due at its scheduled next_maintenance or when its condition is projected to
+    reach MAINTENANCE_MIN_CONDITION at its recent wear rate, whichever comes first. Returns
+    and services update one entry in place; refresh() resyncs after any other writes.
+    """
+    
+    def __init__(self, db_manager: DatabaseManager, equipment_service: Optional[EquipmentService] = None,
+                 window_days: int = Config.MAINTENANCE_RATE_WINDOW_DAYS):
+        self.db = db_manager
+        self.window_days = window_days
+        self._lock = threading.RLock()
+        self._items: Dict[int, Dict] = {}
+        self._heap: List[tuple] = []
+        self._entries: Dict[int, tuple] = {}  # equipment_id -> its live heap entry; others are stale
+        self._versions = None
+        self.rebuilds = 0
+        if equipment_service is not None:
+            equipment_service.add_listener(self._on_equipment)
+    
+    def _versions_now(self) -> tuple:
+        return self.db.table_version('equipment'), self.db.table_version('rentals')
+    
+    def rebuild(self, now: Optional[datetime] = None):
+        """Reload condition, schedule and recent wear for every item"""
+        now = now or datetime.now()
+        since = (now - timedelta(days=self.window_days)).strftime(EquipmentService.TIME_FORMAT)
+        with self._lock:
+            versions = self._versions_now()
+            equipment = self.db.execute_query('''
+                SELECT e.id, e.name, e.category, e.condition_score, e.last_maintenance, e.next_maintenance,
+                       e.available + e.rented AS fleet, COALESCE(used.unit_days, 0) AS unit_days
+                FROM equipment e
+                LEFT JOIN (
+                    SELECT equipment_id,
+                           SUM(quantity * MAX(1, CAST(julianday(returned_at) - julianday(rented_at) + 0.999999 AS INTEGER)))
+                               AS unit_days
+                    FROM rentals WHERE returned_at IS NOT NULL AND returned_at >= ?
+                    GROUP BY equipment_id
+                ) AS used ON used.equipment_id = e.id
+            ''', (since,))
+            
+            self._items, self._heap, self._entries = {}, [], {}
+            for item in equipment:
+                # Condition points per day, from the wear settled by returns in the window
+                wear = Config.EQUIPMENT_WEAR_PER_UNIT_DAY * item.pop('unit_days') / max(item['fleet'], 1)
+                item['wear_per_day'] = wear / self.window_days
+                self._items[item['id']] = item
+                self._push(item, now)
+            self._versions = versions
+            self.rebuilds += 1
+    
+    def _push(self, item: Dict, now: datetime):
+        """Project the item's due date and make it the item's live heap entry"""
+        due, reason = datetime.max, None
+        if item['next_maintenance']:
+            due, reason = datetime.fromisoformat(str(item['next_maintenance'])), 'scheduled'
+        margin = (item['condition_score'] or 0) - Config.MAINTENANCE_MIN_CONDITION
+        if margin <= 0:
+            due, reason = now, 'condition'
+        elif item['wear_per_day'] > 0:
+            worn_out = now + timedelta(days=min(margin / item['wear_per_day'], 36500))
+            if worn_out < due:
+                due, reason = worn_out, 'condition'
+        item['due_at'], item['reason'] = due, reason
+        
+        entry = (due, -item['wear_per_day'], item['id'])
+        self._entries[item['id']] = entry
+        heapq.heappush(self._heap, entry)
+        # Superseded entries are skipped lazily; compact once they dominate the heap
+        if len(self._heap) > 2 * len(self._entries) + 16:
+            self._heap = list(self._entries.values())
+            heapq.heapify(self._heap)
+    
+    def _on_equipment(self, event: str, change: Dict):
+        """Apply a return or service to one item, or mark the queue stale if it can't be"""
+        with self._lock:
+            item = self._items.get(change['equipment_id'])
+            if not change['exclusive'] or self._versions != change['previous_versions']:
+                self._versions = None
+                return
+            if event == 'rented':
+                self._versions = change['versions']
+                return  # Wear is settled on return
+            if item is None:
+                self._versions = None
+                return
+            
+            self._versions = change['versions']
+            item['condition_score'] = change['condition_score']
+            if event == 'returned':
+                item['wear_per_day'] += change['wear'] / self.window_days
+            else:
+                item['next_maintenance'] = change['next_maintenance']
+            self._push(item, datetime.now())
+    
+    def refresh(self):
+        """Rebuild if equipment or rentals changed other than through tracked returns and services"""
+        if self._versions != self._versions_now():
+            self.rebuild()
+    
+    def work_list(self, limit: Optional[int] = None, horizon_days: Optional[int] = None,
+                  now: Optional[datetime] = None) -> List[Dict]:
+        """Items in service order from the in-memory queue; optionally only those due within horizon_days"""
+        now = now or datetime.now()
+        cutoff = now + timedelta(days=horizon_days) if horizon_days is not None else datetime.max
+        with self._lock:
+            live = (entry for entry in self._heap if self._entries.get(entry[2]) is entry)
+            entries = heapq.nsmallest(limit, live) if limit is not None else sorted(live)
+            work = []
+            for due, _, equipment_id in entries:
+                if due > cutoff:
+                    break
+                item = self._items[equipment_id]
+                work.append({
+                    'id': equipment_id, 'name': item['name'], 'category': item['category'],
+                    'condition_score': round(item['condition_score'] or 0, 2),
+                    'wear_per_day': round(item['wear_per_day'], 4),
+                    'next_maintenance': item['next_maintenance'],
+                    'due_at': None if due == datetime.max else due,
+                    'reason': item['reason'], 'overdue': due <= now
+                })
+            return work
+    
+    def stats(self) -> Dict:
+        """Queue size and rebuild count"""
+        with self._lock:
+            return {'items': len(self._items), 'heap_entries': len(self._heap), 'rebuilds': self.rebuilds,
+                    'current': self._versions == self._versions_now()}
+
+def _bracket_order(size: int) -> List[int]:
+    """Seed at each bracket position, so the top two seeds can only meet in the final"""
+    order = [1]
+    while len(order) < size:
+        order = [s for seed in order for s in (seed, 2 * len(order) + 1 - seed)]
+    return order
+
+def _free_runs(free: np.ndarray) -> np.ndarray:
+    """Consecutive free slots starting at each slot, per row of a [rows, slots] bool array"""
+    slots = free.shape[1]
+    blocked = np.where(free, slots, np.arange(slots))
+    next_blocked = np.minimum.accumulate(blocked[:, ::-1], axis=1)[:, ::-1]
+    return next_blocked - np.arange(slots)
+
+class TournamentScheduler:
+    """Round-robin and single-elimination fixtures, placed on free facility slots and booked.
+    
+    Fixtures are placed greedily in round order at the earliest slot, on any facility of the
+    event's type, that is free of existing bookings and respects each team's rest time and
+    the games a bracket game depends on.
+    """
+    
+    FORMATS = ('elimination', 'round_robin')
+    
+    def __init__(self, db_manager: DatabaseManager, booking_service: BookingService):
+        self.db = db_manager
+        self.booking_service = booking_service
+    
+    @staticmethod
+    def round_robin_fixtures(teams: List[str]) -> List[Dict]:
+        """Circle-method rounds in which every team meets every other team once"""
+        entrants = list(teams) + ([None] if len(teams) % 2 else [])
+        size = len(entrants)
+        fixtures = []
+        for round_number in range(1, size):
+            for i in range(size // 2):
+                home, away = entrants[i], entrants[size - 1 - i]
+                if home is None or away is None:
+                    continue
+                if i == 0 and round_number % 2 == 0:
+                    home, away = away, home  # The fixed entrant alternates home and away
+                fixtures.append({'game_number': len(fixtures) + 1, 'round': round_number,
+                                 'home': home, 'away': away, 'teams': [home, away], 'after': []})
+            entrants = [entrants[0], entrants[-1]] + entrants[1:-1]
+        return fixtures
+    
+    @staticmethod
+    def elimination_fixtures(teams: List[str]) -> List[Dict]:
+        """Single-elimination bracket seeded in list order; top seeds receive any byes"""
+        size = 1 << max(1, (len(teams) - 1).bit_length())
+        # Each bracket line holds ('team', name), ('game', number) for its winner, or None for a bye
+        lines = [('team', teams[seed - 1]) if seed <= len(teams) else None for seed in _bracket_order(size)]
+        fixtures = []
+        round_number = 0
+        while len(lines) > 1:
+            round_number += 1
+            winners = []
+            for a, b in zip(lines[::2], lines[1::2]):
+                if a is None or b is None:
+                    winners.append(a or b)
+                    continue
+                number = len(fixtures) + 1
+                fixtures.append({
+                    'game_number': number, 'round': round_number,
+                    'home': a[1] if a[0] == 'team' else f"W{a[1]}",
+                    'away': b[1] if b[0] == 'team' else f"W{b[1]}",
+                    'teams': [line[1] for line in (a, b) if line[0] == 'team'],
+                    'after': [line[1] for line in (a, b) if line[0] == 'game']
+                })
+                winners.append(('game', number))
+            lines = winners
+        return fixtures
+    
+    def assign_slots(self, fixtures: List[Dict], facility_ids: List[int], dates: List[str],
+                     game_minutes: int, rest_minutes: int,
+                     hours: tuple = Config.OPERATING_HOURS,
+                     replacing: frozenset = frozenset()) -> List[Optional[Dict]]:
+        """Earliest feasible (facility, date, time) for each fixture in order; None where nothing fits.
+        
+        Slots held by the bookings in replacing are treated as free.
+        """
+        slot = Config.BOOKING_SLOT_MINUTES
+        per_day = DaySchedule.SLOTS
+        need, rest = -(-game_minutes // slot), -(-rest_minutes // slot)
+        
+        busy = self.booking_service.slot_bitmaps(facility_ids, dates, ignore=replacing).copy()
+        busy[:, :, :hours[0] * 60 // slot] = True
+        busy[:, :, -(-hours[1] * 60 // slot):] = True
+        now = datetime.now()
+        if dates and dates[0] == now.date().isoformat():
+            busy[:, 0, :-(-(now.hour * 60 + now.minute) // slot)] = True
+        busy = busy.reshape(len(facility_ids), -1)
+        # Closed hours separate the days, so a free run never spans midnight
+        runs = _free_runs(~busy)
+        total = busy.shape[1]
+        
+        team_ready: Dict[str, int] = {}
+        game_end: Dict[int, Optional[int]] = {}
+        placed = []
+        for fixture in fixtures:
+            game_end[fixture['game_number']] = None
+            sources = [game_end[number] for number in fixture['after']]
+            if any(end is None for end in sources):
+                placed.append(None)
+                continue
+            earliest = max([team_ready.get(team, 0) for team in fixture['teams']]
+                           + [end + rest for end in sources] + [0])
+            fits = runs[:, earliest:] >= need if earliest < total else np.zeros((len(facility_ids), 0), dtype=bool)
+            if not fits.any():
+                placed.append(None)
+                continue
+            
+            offsets = np.where(fits.any(axis=1), fits.argmax(axis=1), total)
+            row = int(offsets.argmin())
+            start = earliest + int(offsets[row])
+            end = start + need
+            busy[row, start:end] = True
+            runs[row] = _free_runs(~busy[row:row + 1])[0]
+            
+            for team in fixture['teams']:
+                team_ready[team] = end + rest
+            game_end[fixture['game_number']] = end
+            placed.append({
+                'facility_id': facility_ids[row], 'booking_date': dates[start // per_day],
+                'start_time': minutes_to_time(start % per_day * slot),
+                'end_time': minutes_to_time((end - 1) % per_day * slot + slot)
+            })
+        return placed
+    
+    def schedule(self, event_id: int, teams: Optional[List[str]] = None, fixture_format: str = 'elimination',
+                 game_minutes: int = Config.TOURNAMENT_GAME_MINUTES,
+                 rest_minutes: int = Config.TOURNAMENT_REST_MINUTES,
+                 start_date: Optional[str] = None, end_date: Optional[str] = None,
+                 facility_type: Optional[str] = None, commit: bool = True, replace: bool = False) -> Dict:
+        """Generate fixtures for an event and book them; teams default to the event's registered members.
+        
+        Returns the plan with one entry per game. Nothing is booked unless every game fits;
+        replace=True swaps the event's existing fixtures for the new ones in the same
+        transaction, so they survive any plan that cannot be booked.
+        """
+        event = self.db.execute_query('''
+            SELECT e.id, e.name, e.start_date, e.end_date, f.type AS facility_type
+            FROM events e LEFT JOIN facilities f ON f.id = e.facility_id
+            WHERE e.id = ?
+        ''', (event_id,))
+        if not event:
+            return {'event_id': event_id, 'error': "Unknown event"}
+        event = event[0]
+        
+        if teams is None:
+            teams = [row['name'] for row in self.db.execute_query('''
+                SELECT m.name FROM event_registrations r JOIN members m ON m.id = r.member_id
+                WHERE r.event_id = ? AND r.status = 'registered' ORDER BY r.id
+            ''', (event_id,))]
+        teams = list(dict.fromkeys(team.strip() for team in teams if team and team.strip()))
+        if len(teams) < 2 or fixture_format not in self.FORMATS:
+            return {'event_id': event_id, 'error': "Need at least two teams and a known format"}
+        
+        facility_type = facility_type or event['facility_type']
+        facilities = self.db.execute_query(
+            "SELECT id, name FROM facilities WHERE status = 'active' AND type = ? ORDER BY name", (facility_type,)
+        )
+        today = datetime.now().date()
+        first = max(datetime.fromisoformat(start_date or event['start_date'][:10]).date(), today)
+        last = datetime.fromisoformat(end_date or event['end_date'][:10]).date()
+        dates = [(first + timedelta(days=i)).isoformat() for i in range((last - first).days + 1)]
+        if not facilities or not dates:
+            return {'event_id': event_id, 'error': f"No active {facility_type} facilities or no future dates"}
+        
+        replaced = [row['booking_id'] for row in self.db.execute_query(
+            "SELECT booking_id FROM tournament_games WHERE event_id = ?", (event_id,))]
+        if replaced and not replace:
+            return {'event_id': event_id, 'error': "Event already has fixtures"}
+        
+        started = time.perf_counter()
+        fixtures = (self.elimination_fixtures if fixture_format == 'elimination'
+                    else self.round_robin_fixtures)(teams)
+        placed = self.assign_slots(fixtures, [f['id'] for f in facilities], dates, game_minutes, rest_minutes,
+                                   replacing=frozenset(replaced))
+        names = {f['id']: f['name'] for f in facilities}
+        games = [
+            dict({key: fixture[key] for key in ('game_number', 'round', 'home', 'away')},
+                 **(slot or {'facility_id': None, 'booking_date': None, 'start_time': None, 'end_time': None}),
+                 facility_name=names.get(slot['facility_id']) if slot else None)
+            for fixture, slot in zip(fixtures, placed)
+        ]
+        plan = {
+            'event_id': event_id, 'format': fixture_format, 'teams': len(teams), 'games': games,
+            'unscheduled': sum(slot is None for slot in placed),
+            'facilities': len(facilities), 'days': len(dates),
+            'schedule_ms': round((time.perf_counter() - started) * 1000, 1), 'booking_ids': None
+        }
+        if not commit or plan['unscheduled']:
+            return plan
+        
+        def record_games(conn: sqlite3.Connection, ids: List[int]):
+            conn.execute("DELETE FROM tournament_games WHERE event_id = ?", (event_id,))
+            conn.executemany('''
+                INSERT INTO tournament_games (event_id, game_number, round, home, away, booking_id)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', [(event_id, g['game_number'], g['round'], g['home'], g['away'], booking_id)
+                  for g, booking_id in zip(games, ids)])
+        
+        plan['booking_ids'] = self.booking_service.create_bookings([
+            {'event_id': event_id, 'facility_id': g['facility_id'], 'booking_date': g['booking_date'],
+             'start_time': g['start_time'], 'end_time': g['end_time'], 'total_cost': 0.0,
+             'payment_status': 'waived', 'notes': f"{event['name']} G{g['game_number']}: {g['home']} vs {g['away']}"}
+            for g in games
+        ], on_commit=record_games, replaces=replaced)
+        if plan['booking_ids'] is None:
+            plan['error'] = "Slots were booked while scheduling; try again"
+        return plan
+    
+    def clear_schedule(self, event_id: int) -> int:
+        """Cancel an event's fixture bookings and forget its fixtures; returns the games removed"""
+        def clear(conn: sqlite3.Connection) -> int:
+            conn.execute('''
+                UPDATE bookings SET status = 'cancelled'
+                WHERE id IN (SELECT booking_id FROM tournament_games WHERE event_id = ?)
+            ''', (event_id,))
+            return conn.execute("DELETE FROM tournament_games WHERE event_id = ?", (event_id,)).rowcount
+        
+        try:
+            return self.db.transaction(clear)
+        except Exception as e:
+            logger.error(f"Tournament clear error: {e}")
+            return 0
+    
+    @memoize_per_request
+    def get_fixtures(self, event_id: int) -> List[Dict]:
+        """Booked fixtures for an event in playing order"""
+        return self.db.execute_query('''
+            SELECT g.game_number, g.round, g.home, g.away, b.booking_date, b.start_time, b.end_time,
+                   f.name AS facility_name
+            FROM tournament_games g
+            JOIN bookings b ON b.id = g.booking_id
+            JOIN facilities f ON f.id = b.facility_id
+            WHERE g.event_id = ?
+            ORDER BY b.booking_date, b.start_time, g.game_number
+        ''', (event_id,))
+
+class RevenueService:
+    """Revenue tracking and financial management"""
+    
+    # Rollup grain -> (table, period column, SQLite expression mapping a date to its period start)
+    ROLLUPS = {
+        'daily': ('revenue_daily', 'day', "date({})"),
+        'weekly': ('revenue_weekly', 'week_start', "date({}, '-6 days', 'weekday 1')"),
+        'monthly': ('revenue_monthly', 'month_start', "date({}, 'start of month')"),
+    }
+    
+    # Window rows from whichever rollups cover it; see _window_parts
+    WINDOW_ROW = "SELECT source, facility_id, amount, transactions FROM {table} WHERE {column} BETWEEN ? AND ?"
+    
+    def __init__(self, db_manager: DatabaseManager):
+        self.db = db_manager
+    
+    @classmethod
+    def rebuild_rollups(cls, conn: Union[sqlite3.Connection, sqlite3.Cursor]):
+        """Recompute every rollup table from revenue_records"""
+        for table, column, period in cls.ROLLUPS.values():
+            conn.execute(f"DELETE FROM {table}")
+            conn.execute(f'''
+                INSERT INTO {table} ({column}, source, facility_id, amount, transactions)
+                SELECT {period.format('date')}, source, COALESCE(facility_id, 0), SUM(amount), COUNT(*)
+                FROM revenue_records
+                GROUP BY 1, 2, 3
+            ''')
+    
+    def record_revenue(self, source: str, amount: float, facility_id: int = None, description: str = "") -> bool:
+        """Record revenue transaction and add it to each rollup in the same transaction"""
+        day = datetime.now().date().isoformat()
+        
+        def record(conn: sqlite3.Connection):
+            conn.execute('''
+                INSERT INTO revenue_records (date, source, amount, facility_id, description)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (day, source, amount, facility_id, description))
+            for table, column, period in self.ROLLUPS.values():
+                conn.execute(f'''
+                    INSERT INTO {table} ({column}, source, facility_id, amount, transactions)
+                    VALUES ({period.format('?')}, ?, ?, ?, 1)
+                    ON CONFLICT ({column}, source, facility_id) DO UPDATE
+                    SET amount = amount + excluded.amount, transactions = transactions + 1
+                ''', (day, source, facility_id or 0, amount))
+        
+        try:
+            self.db.transaction(record)
+            return True
+        except Exception as e:
+            logger.error(f"Revenue record error: {e}")
+            return False
+    
+    @staticmethod
+    def _window(days: int) -> tuple:
+        """First and last day of the trailing window ending today"""
+        today = datetime.now().date()
+        return today - timedelta(days=max(days, 0)), today
+    
+    def _window_parts(self, start: date, end: date) -> tuple:
+        """UNION ALL of rollup rows covering start..end, and its parameters.
+        
+        Whole calendar months come from the monthly rollup and the partial months at either
+        end from the daily one, so a window reads at most ~60 daily rows plus one row per month.
+        """
+        first_month = start if start.day == 1 else (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+        after_months = end + timedelta(days=1) if (end + timedelta(days=1)).day == 1 else end.replace(day=1)
+        
+        daily, monthly = self.ROLLUPS['daily'], self.ROLLUPS['monthly']
+        if first_month >= after_months:
+            ranges = [(daily, start, end)]
+        else:
+            ranges = [(daily, start, first_month - timedelta(days=1)),
+                      (monthly, first_month, after_months - timedelta(days=1)),
+                      (daily, after_months, end)]
+        
+        parts, params = [], []
+        for (table, column, _), low, high in ranges:
+            if low <= high:
+                parts.append(self.WINDOW_ROW.format(table=table, column=column))
+                params.extend([low.isoformat(), high.isoformat()])
+        return " UNION ALL ".join(parts), params
+    
+    @memoize_per_request
+    def get_revenue_summary(self, days: int = 30) -> Dict:
+        """Get revenue summary for specified period"""
+        rows, params = self._window_parts(*self._window(days))
+        result = self.db.execute_query(f'''
+            SELECT COALESCE(SUM(amount), 0) AS total, COALESCE(SUM(transactions), 0) AS count
+            FROM ({rows})
+        ''', tuple(params))
+        total_revenue = float(result[0]['total']) if result else 0.0
+        transactions = int(result[0]['count']) if result else 0
+        
+        return {
+            'total_revenue': total_revenue,
+            'transaction_count': transactions,
+            'average_transaction': total_revenue / transactions if transactions else 0,
+            'daily_average': total_revenue / days if days > 0 else 0
+        }
+    
+    @memoize_per_request
+    def get_revenue_trend(self, days: int = 30, grain: str = 'daily', source: Optional[str] = None,
+                          facility_id: Optional[int] = None) -> List[Dict]:
+        """Revenue per day, week or month over the trailing window, with empty periods as zero"""
+        if grain not in self.ROLLUPS:
+            raise ValueError(f"Unknown revenue grain: {grain}")
+        table, column, period = self.ROLLUPS[grain]
+        start, end = self._window(days)
         
-    def get_all_events(self) -> List[Dict]:
-        """Get all events"""
-        return self.db.execute_query("SELECT * FROM events ORDER BY start_date")
+        # Periods are labelled by their start, so the first one may begin before the window
+        filters, params = [], [start.isoformat(), end.isoformat()]
+        if source is not None:
+            filters.append("AND source = ?")
+            params.append(source)
+        if facility_id is not None:
+            filters.append("AND facility_id = ?")
+            params.append(facility_id)
+        rows = self.db.execute_query(f'''
+            SELECT {column} AS period, SUM(amount) AS revenue, SUM(transactions) AS transactions
+            FROM {table}
+            WHERE {column} BETWEEN {period.format('?')} AND ? {' '.join(filters)}
+            GROUP BY {column}
+            ORDER BY {column}
+        ''', tuple(params))
+        found = {row['period']: row for row in rows}
+        
+        if grain == 'daily':
+            periods = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        elif grain == 'weekly':
+            first = start - timedelta(days=start.weekday())
+            periods = [first + timedelta(weeks=i) for i in range((end - first).days // 7 + 1)]
+        else:
+            periods, month = [], start.replace(day=1)
+            while month <= end:
+                periods.append(month)
+                month = (month + timedelta(days=32)).replace(day=1)
+        
+        trend = []
+        for day in periods:
+            row = found.get(day.isoformat())
+            trend.append({
+                'date': day.isoformat(),
+                'revenue': float(row['revenue']) if row else 0.0,
+                'transactions': int(row['transactions']) if row else 0
+            })
+        return trend
     
-    def get_upcoming_events(self) -> List[Dict]:
-        """Get upcoming events"""
-        return self.db.execute_query(
-            "SELECT * FROM events WHERE start_date > date('now') ORDER BY start_date"
-        )
+    @memoize_per_request
+    def get_revenue_breakdown(self, days: int = 30, by: str = 'source') -> List[Dict]:
+        """Revenue over the trailing window grouped by source or by facility, largest first"""
+        rows, params = self._window_parts(*self._window(days))
+        if by == 'source':
+            query = f'''
+                SELECT source AS label, SUM(amount) AS revenue, SUM(transactions) AS transactions
+                FROM ({rows})
+                GROUP BY source
+                ORDER BY revenue DESC
+            '''
+        elif by == 'facility':
+            query = f'''
+                SELECT COALESCE(f.name, 'No facility') AS label, SUM(w.amount) AS revenue,
+                       SUM(w.transactions) AS transactions
+                FROM ({rows}) w
+                LEFT JOIN facilities f ON f.id = w.facility_id
+                GROUP BY w.facility_id
+                ORDER BY revenue DESC
+            '''
+        else:
+            raise ValueError(f"Unknown revenue breakdown: {by}")
+        return self.db.execute_query(query, tuple(params))
     
-    def register_for_event(self, event_id: int) -> bool:
-        """Register participant for event"""
-        return self.db.execute_update(
-            "UPDATE events SET registered = registered + 1 WHERE id = ? AND registered < capacity",
-            (event_id,)
+    def export_revenue_csv(self, path: Union[str, Path], batch_size: int = Config.DB_FETCH_BATCH_SIZE) -> int:
+        """Stream all revenue records to a CSV file and return the number of rows written"""
+        columns = ['id', 'date', 'source', 'amount', 'facility_id', 'description', 'created_at']
+        rows = self.db.iter_query(
+            f"SELECT {', '.join(columns)} FROM revenue_records ORDER BY id", batch_size=batch_size
         )
+        
+        count = 0
+        with open(path, 'w', newline='', encoding='utf-8') as handle:
+            writer = csv.DictWriter(handle, fieldnames=columns)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        return count
 
-class RevenueService:
-    """Revenue tracking and financial management"""
+INSIGHT_RULES = [
+    InsightRule(
+        'high_utilization', 'facilities', 'threshold', 'optimization', 'high', 'High Facility Utilization',
+        'Average utilization at {value:.1f}%. Consider dynamic pricing or expansion.',
+        'Revenue increase potential: $15K-25K/month', 'Implement surge pricing during peak hours',
+        column='utilization', op='>', threshold=85),
+    InsightRule(
+        'low_utilization', 'facilities', 'threshold', 'opportunity', 'medium', 'Underutilized Facilities',
+        'Average utilization only {value:.1f}%. Marketing could boost usage.',
+        'Revenue increase potential: $8K-15K/month', 'Launch targeted marketing campaigns',
+        column='utilization', op='<', threshold=60),
+    InsightRule(
+        'premium_share', 'members', 'threshold', 'growth', 'medium', 'Member Tier Upgrade Opportunity',
+        'Only {value:.1f}% are Premium/Elite members.',
+        'Revenue increase potential: $5K-12K/month', 'Create member upgrade incentive program',
+        aggregate='share', where="tier in ['Premium', 'Elite']", weight='members', op='<', threshold=40),
+    InsightRule(
+        'idle_facilities', 'facilities', 'entity', 'opportunity', 'low', 'Idle Facilities',
+        '{count} facilities have under {threshold:.0f}% of operating hours booked: {names}.',
+        'Off-peak bookings fill otherwise unused capacity', 'Offer off-peak rates on these facilities',
+        where='utilization < 20', threshold=20, sort_by='utilization'),
+    InsightRule(
+        'equipment_service_due', 'equipment', 'entity', 'maintenance', 'high', 'Equipment Needs Service',
+        '{count} items are below condition {threshold:.0f}: {names}.',
+        'Avoids failures and refunds on rentals', 'Schedule maintenance from the equipment queue',
+        where=f'condition_score < {Config.MAINTENANCE_MIN_CONDITION}', threshold=Config.MAINTENANCE_MIN_CONDITION,
+        sort_by='condition_score'),
+    InsightRule(
+        'equipment_sold_out', 'equipment', 'entity', 'growth', 'medium', 'Equipment Fully Rented',
+        'Every unit of {count} items is out on rental: {names}.',
+        'Rental demand is going unserved', 'Add stock for these items',
+        where='available == 0 and rented > 0', sort_by='rented', ascending=False),
+    InsightRule(
+        'events_nearly_full', 'events', 'entity', 'growth', 'medium', 'Events Nearly Full',
+        '{count} upcoming events are at least {threshold:.0%} full: {names}.',
+        'Waitlisted members are revenue at risk', 'Add sessions or move to a larger facility',
+        where='days_until >= 0 and fill >= 0.9', threshold=0.9, sort_by='start_date'),
+    InsightRule(
+        'events_underfilled', 'events', 'entity', 'opportunity', 'high', 'Under-Registered Events',
+        '{count} events starting within two weeks are under half full: {names}.',
+        'Empty places are lost registration revenue', 'Promote these events to matching members',
+        where='0 <= days_until <= 14 and fill < 0.5', sort_by='start_date'),
+    InsightRule(
+        'sponsor_renewals', 'sponsors', 'entity', 'retention', 'high', 'Sponsor Renewals Due',
+        '{count} contracts worth ${value:,.0f} a year end within 90 days: {names}.',
+        'Renewals protect existing sponsorship revenue', 'Open renewal conversations now',
+        column='annual_value', where='0 <= days_left <= 90', sort_by='days_left'),
+    InsightRule(
+        'sponsor_satisfaction', 'sponsors', 'entity', 'retention', 'medium', 'Sponsor Satisfaction Risk',
+        '{count} sponsors rate satisfaction below {threshold:.0f}: {names}.',
+        'Dissatisfied sponsors are unlikely to renew', 'Review benefits delivered with these sponsors',
+        where='satisfaction < 8', threshold=8, sort_by='satisfaction'),
+    InsightRule(
+        'revenue_decline', 'revenue_trend', 'trend', 'optimization', 'high', 'Revenue Falling',
+        'Revenue over the last {window} days is {value:+.1f}% against the {window} days before.',
+        'Early warning before the monthly figures show it', 'Check bookings and pricing for the drop',
+        column='revenue', op='<', threshold=-15),
+    InsightRule(
+        'revenue_growth', 'revenue_trend', 'trend', 'growth', 'low', 'Revenue Rising',
+        'Revenue over the last {window} days is {value:+.1f}% against the {window} days before.',
+        'Momentum worth reinforcing', 'Find which sources grew and extend them',
+        column='revenue', op='>', threshold=20),
+]
+
+class InsightEngine:
+    """Evaluates insight rules over one DataFrame per source, cached until a source table is written"""
     
-    def __init__(self, db_manager: DatabaseManager):
+    # Tables behind the frames (bookings and revenue_daily feed utilization and trends)
+    TABLES = ('facilities', 'members', 'equipment', 'events', 'sponsors', 'bookings', 'revenue_daily')
+    COMPARE = {'>': np.greater, '<': np.less, '>=': np.greater_equal, '<=': np.less_equal}
+    
+    def __init__(self, db_manager: DatabaseManager, utilization_engine: Optional[UtilizationEngine] = None,
+                 trend_engine: Optional[TrendEngine] = None, rules: Optional[List[InsightRule]] = None):
         self.db = db_manager
+        self.utilization_engine = utilization_engine
+        self.trend_engine = trend_engine or TrendEngine(db_manager)
+        self.rules = rules if rules is not None else INSIGHT_RULES
+        self._lock = threading.Lock()
+        self._cached: Optional[tuple] = None  # (key, insights)
+        self._timings = {rule.name: {'evaluations': 0, 'fired': 0, 'last_ms': 0.0, 'total_ms': 0.0}
+                         for rule in self.rules}
+        self._stats = {'hits': 0, 'evaluations': 0, 'frames_ms': 0.0, 'rules_ms': 0.0}
+    
+    def _frames(self) -> Dict[str, pd.DataFrame]:
+        """Every frame a rule can name, each loaded with one query"""
+        today = pd.Timestamp(datetime.now().date())
         
-    def record_revenue(self, source: str, amount: float, facility_id: int = None, description: str = "") -> bool:
-        """Record revenue transaction"""
-        return self.db.execute_update('''
-            INSERT INTO revenue_records (date, source, amount, facility_id, description)
-            VALUES (date('now'), ?, ?, ?, ?)
-        ''', (source, amount, facility_id, description))
+        facilities = self.db.query_frame(
+            "SELECT id, name, type, utilization FROM facilities WHERE status = 'active'",
+            dtypes={'utilization': np.float64})
+        if self.utilization_engine is not None and len(facilities):
+            facilities['utilization'] = facilities['id'].map(self.utilization_engine.facility_utilization()).fillna(0.0)
+        
+        # Members can run to millions of rows, so they arrive grouped and rules weight by count
+        members = self.db.query_frame('''
+            SELECT tier, status, COUNT(*) AS members, SUM(total_spent) AS spent
+            FROM members
+            GROUP BY tier, status
+        ''', dtypes={'members': np.int64, 'spent': np.float64})
+        
+        equipment = self.db.query_frame(
+            "SELECT id, name, category, available, rented, condition_score, status FROM equipment",
+            dtypes={'available': np.int64, 'rented': np.int64, 'condition_score': np.float64})
+        
+        # Event rules look ahead only, so past events stay behind the start_date index
+        events = self.db.query_frame('''
+            SELECT id, name, event_type, start_date, capacity, registered
+            FROM events
+            WHERE start_date >= ? AND status = 'active'
+        ''', (today.date().isoformat(),), dtypes={'capacity': np.float64, 'registered': np.float64},
+            parse_dates=['start_date'])
+        if len(events):
+            events['fill'] = events['registered'] / events['capacity'].where(events['capacity'] > 0)
+            events['days_until'] = (events['start_date'].dt.normalize() - today).dt.days
+        
+        sponsors = self.db.query_frame('''
+            SELECT id, name, tier, annual_value, engagement, satisfaction, contract_end
+            FROM sponsors
+            WHERE status = 'active'
+        ''', dtypes={'annual_value': np.float64, 'satisfaction': np.float64}, parse_dates=['contract_end'])
+        if len(sponsors):
+            sponsors['days_left'] = (sponsors['contract_end'].dt.normalize() - today).dt.days
+        
+        windows = max((rule.window for rule in self.rules if rule.kind == 'trend'), default=7)
+        return {
+            'facilities': facilities,
+            'members': members,
+            'equipment': equipment,
+            'events': events,
+            'sponsors': sponsors,
+            'revenue_trend': pd.DataFrame(self.trend_engine.revenue_trend(2 * windows)),
+            'utilization_trend': pd.DataFrame(self.trend_engine.utilization_trend(2 * windows))
+        }
     
-    def get_revenue_summary(self, days: int = 30) -> Dict:
-        """Get revenue summary for specified period"""
-        revenue_records = self.db.execute_query('''
-            SELECT * FROM revenue_records 
-            WHERE date >= date('now', '-{} days')
-            ORDER BY date DESC
-        '''.format(days))
+    def _value(self, rule: InsightRule, frame: pd.DataFrame) -> tuple:
+        """(value, matching rows) for a rule; value is NaN when the frame can't answer it"""
+        if frame.empty:
+            return math.nan, frame
+        
+        if rule.kind == 'trend':
+            series = frame[rule.column].to_numpy(dtype=np.float64)
+            if len(series) < 2 * rule.window:
+                return math.nan, frame
+            recent, previous = series[-rule.window:].sum(), series[-2 * rule.window:-rule.window].sum()
+            return ((recent / previous - 1) * 100 if previous else math.nan), frame
         
-        total_revenue = sum(r['amount'] for r in revenue_records)
+        mask = frame.eval(rule.where).to_numpy(dtype=bool) if rule.where else np.ones(len(frame), dtype=bool)
+        matched = frame[mask]
+        if rule.kind == 'entity':
+            value = float(matched[rule.column].sum()) if rule.column else float(len(matched))
+            return value, matched
+        
+        weights = frame[rule.weight].to_numpy(dtype=np.float64) if rule.weight else np.ones(len(frame))
+        if rule.aggregate == 'share':
+            total = weights.sum()
+            return (weights[mask].sum() / total * 100 if total else math.nan), matched
+        if rule.aggregate == 'count':
+            return float(weights[mask].sum()), matched
+        values = matched[rule.column].to_numpy(dtype=np.float64)
+        if rule.aggregate == 'sum':
+            return float((values * weights[mask]).sum()), matched
+        return (float(np.average(values, weights=weights[mask])) if weights[mask].sum() else math.nan), matched
+    
+    def _evaluate(self, rule: InsightRule, frames: Dict[str, pd.DataFrame]) -> Optional[Dict]:
+        """The rule's insight card, or None when it doesn't hold"""
+        value, matched = self._value(rule, frames[rule.frame])
+        if rule.kind == 'entity':
+            fired = len(matched) > 0
+        else:
+            fired = not math.isnan(value) and bool(self.COMPARE[rule.op](value, rule.threshold))
+        if not fired:
+            return None
         
+        names = []
+        if rule.kind == 'entity':
+            ordered = matched.sort_values(rule.sort_by, ascending=rule.ascending) if rule.sort_by else matched
+            names = ordered['name'].head(3).tolist()
+            if len(matched) > 3:
+                names.append(f"{len(matched) - 3} more")
+        fields = {'value': value, 'count': len(matched), 'names': ', '.join(map(str, names)),
+                  'threshold': rule.threshold, 'window': rule.window}
         return {
-            'total_revenue': total_revenue,
-            'transaction_count': len(revenue_records),
-            'average_transaction': total_revenue / len(revenue_records) if revenue_records else 0,
-            'daily_average': total_revenue / days if days > 0 else 0
+            'rule': rule.name,
+            'type': rule.type,
+            'priority': rule.priority,
+            'title': rule.title,
+            'description': rule.description.format(**fields),
+            'impact': rule.impact.format(**fields),
+            'action': rule.action.format(**fields)
         }
+    
+    def insights(self) -> List[Dict]:
+        """Insights from every rule that holds, highest priority first"""
+        key = (datetime.now().date(),) + tuple(self.db.table_version(t) for t in self.TABLES)
+        with self._lock:
+            if self._cached is not None and self._cached[0] == key:
+                self._stats['hits'] += 1
+                return self._cached[1]
+            
+            start = time.perf_counter()
+            frames = self._frames()
+            self._stats['frames_ms'] = round((time.perf_counter() - start) * 1000, 2)
+            
+            insights, rules_start = [], time.perf_counter()
+            for rule in self.rules:
+                rule_start = time.perf_counter()
+                try:
+                    insight = self._evaluate(rule, frames)
+                except Exception as e:
+                    logger.error(f"Insight rule {rule.name} failed: {e}")
+                    insight = None
+                elapsed = (time.perf_counter() - rule_start) * 1000
+                
+                timing = self._timings.setdefault(rule.name, {'evaluations': 0, 'fired': 0, 'last_ms': 0.0,
+                                                              'total_ms': 0.0})
+                timing['evaluations'] += 1
+                timing['fired'] += insight is not None
+                timing['last_ms'] = round(elapsed, 3)
+                timing['total_ms'] = round(timing['total_ms'] + elapsed, 3)
+                if insight is not None:
+                    insights.append(insight)
+            
+            self._stats['rules_ms'] = round((time.perf_counter() - rules_start) * 1000, 2)
+            self._stats['evaluations'] += 1
+            order = {'high': 0, 'medium': 1, 'low': 2}
+            insights.sort(key=lambda insight: order.get(insight['priority'], 3))
+            self._cached = (key, insights)
+            return insights
+    
+    def rule_timings(self) -> List[Dict]:
+        """Per-rule evaluation cost, slowest last evaluation first"""
+        with self._lock:
+            timings = [dict(timing, rule=name) for name, timing in self._timings.items()]
+        return sorted(timings, key=lambda timing: timing['last_ms'], reverse=True)
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            return dict(self._stats, rules=len(self.rules))
 
 class AnalyticsService:
     """AI-powered analytics and insights"""
     
-    def __init__(self, db_manager: DatabaseManager):
+    def __init__(self, db_manager: DatabaseManager,
+                 facility_service: Optional[FacilityService] = None,
+                 member_service: Optional[MemberService] = None,
+                 revenue_service: Optional[RevenueService] = None,
+                 utilization_engine: Optional[UtilizationEngine] = None,
+                 trend_engine: Optional[TrendEngine] = None,
+                 insight_engine: Optional[InsightEngine] = None):
         self.db = db_manager
-        self.facility_service = FacilityService(db_manager)
-        self.member_service = MemberService(db_manager)
-        self.revenue_service = RevenueService(db_manager)
+        self.facility_service = facility_service or FacilityService(db_manager)
+        self.member_service = member_service or MemberService(db_manager)
+        self.revenue_service = revenue_service or RevenueService(db_manager)
+        self.utilization_engine = utilization_engine
+        self.trend_engine = trend_engine or TrendEngine(db_manager)
+        self.insight_engine = insight_engine or InsightEngine(db_manager, utilization_engine, self.trend_engine)
         
+    def _average_utilization(self, facility_stats: Dict) -> float:
+        """Booked share of operating hours when bookings are tracked, else the stored facility figure"""
+        if self.utilization_engine is not None:
+            return self.utilization_engine.average_utilization()
+        return facility_stats.get('average_utilization', 0)
+    
+    @memoize_per_request
     def generate_dashboard_data(self) -> Dict:
         """Generate comprehensive dashboard analytics"""
-        facilities = self.facility_service.get_all_facilities()
-        members = self.member_service.get_all_members()
-        
-        facility_revenue = sum(f['revenue'] for f in facilities)
-        total_members = len(members)
-        active_members = len([m for m in members if m['status'] == 'active'])
+        facility_stats = self.facility_service.get_facility_utilization_stats()
+        member_stats = self.member_service.get_member_statistics()
         
         return {
             'summary': {
-                'total_facilities': len(facilities),
-                'active_facilities': len([f for f in facilities if f['status'] == 'active']),
-                'total_members': total_members,
-                'active_members': active_members,
-                'total_revenue': facility_revenue,
-                'average_utilization': sum(f['utilization'] for f in facilities) / len(facilities) if facilities else 0
+                'total_facilities': facility_stats.get('total_facilities', 0),
+                'active_facilities': facility_stats.get('active_facilities', 0),
+                'total_members': member_stats.get('total_members', 0),
+                'active_members': member_stats.get('active_members', 0),
+                'total_revenue': facility_stats.get('total_revenue', 0),
+                'average_utilization': self._average_utilization(facility_stats)
             },
             'trends': {
                 'member_growth': self._calculate_member_growth(),
@@ -820,103 +4101,534 @@ class AnalyticsService:
         }
     
     def _calculate_member_growth(self) -> List[Dict]:
-        """Calculate member growth over time"""
-        # Simulate member growth data
-        base_date = datetime.now() - timedelta(days=30)
-        growth_data = []
-        
-        for i in range(30):
-            date = base_date + timedelta(days=i)
-            # Simulate growth with some variance
-            growth = 245 + i * 2 + random.randint(-5, 15)
-            growth_data.append({
-                'date': date.strftime('%Y-%m-%d'),
-                'member_count': growth
-            })
-        
-        return growth_data
+        """Total members at the end of each day of the trend window"""
+        return self.trend_engine.member_growth()
     
     def _calculate_revenue_trend(self) -> List[Dict]:
-        """Calculate revenue trends"""
-        # Simulate revenue trend data
-        base_date = datetime.now() - timedelta(days=30)
-        revenue_data = []
-        
-        for i in range(30):
-            date = base_date + timedelta(days=i)
-            # Simulate revenue with seasonal patterns
-            base_revenue = 15000 + (i * 200) + random.randint(-2000, 3000)
-            # Weekend boost
-            if date.weekday() >= 5:
-                base_revenue *= 1.3
-            
-            revenue_data.append({
-                'date': date.strftime('%Y-%m-%d'),
-                'revenue': base_revenue
-            })
-        
-        return revenue_data
+        """Recorded revenue per day of the trend window"""
+        return self.trend_engine.revenue_trend()
     
     def _calculate_utilization_trend(self) -> List[Dict]:
-        """Calculate utilization trends"""
-        # Simulate utilization trend data
-        base_date = datetime.now() - timedelta(days=7)
-        utilization_data = []
-        
-        for i in range(7):
-            date = base_date + timedelta(days=i)
-            utilization = 75 + random.randint(-10, 20)
-            utilization_data.append({
-                'date': date.strftime('%Y-%m-%d'),
-                'utilization': min(100, max(0, utilization))
-            })
-        
-        return utilization_data
+        """Booked share of operating hours per day over the last week"""
+        return self.trend_engine.utilization_trend()
     
     def _generate_ai_insights(self) -> List[Dict]:
-        """Generate AI-powered insights"""
-        facilities = self.facility_service.get_all_facilities()
-        members = self.member_service.get_all_members()
-        
-        insights = []
+        """Insights from every declared rule that holds over the current data"""
+        return self.insight_engine.insights()
+
+# =============================================================================
+# FORECASTING
+# =============================================================================
+# Every model takes history shaped [series, time] and returns (forecast [series, horizon],
+# one-step fitted values [series, time], NaN where the model has no fit yet).
+
+# Holt-Winters smoothing parameters (alpha, beta, gamma) tried for every series
+HOLT_WINTERS_GRID = np.stack(np.meshgrid((0.1, 0.3, 0.5, 0.8), (0.01, 0.1, 0.3), (0.05, 0.2, 0.5),
+                                         indexing='ij'), axis=-1).reshape(-1, 3)
+
+def linear_trend_forecast(history: np.ndarray, horizon: int, period: int = 12) -> tuple:
+    """Least-squares straight line through each series"""
+    y = np.asarray(history, dtype=np.float64)
+    steps = np.arange(y.shape[1], dtype=np.float64)
+    centred = steps - steps.mean()
+    spread = (centred ** 2).sum()
+    slope = (centred * (y - y.mean(axis=1, keepdims=True))).sum(axis=1) / spread if spread else np.zeros(len(y))
+    intercept = y.mean(axis=1) - slope * steps.mean()
+    ahead = y.shape[1] - 1 + np.arange(1, horizon + 1)
+    return intercept[:, None] + slope[:, None] * ahead, intercept[:, None] + slope[:, None] * steps
+
+def seasonal_naive_forecast(history: np.ndarray, horizon: int, period: int = 12) -> tuple:
+    """Repeat the last full season (the last value when there is less than one)"""
+    y = np.asarray(history, dtype=np.float64)
+    length = y.shape[1]
+    lag = period if length >= period else 1
+    forecast = y[:, length - lag + np.arange(horizon) % lag]
+    fitted = np.full_like(y, np.nan)
+    fitted[:, lag:] = y[:, :-lag]
+    return forecast, fitted
+
+def holt_winters_forecast(history: np.ndarray, horizon: int, period: int = 12) -> tuple:
+    """Additive Holt-Winters with smoothing parameters picked per series by one-step squared error.
+    
+    All series and every HOLT_WINTERS_GRID combination are smoothed together, one time step at a
+    time. Seasonality needs two full periods of history; shorter series get Holt's linear trend.
+    """
+    y = np.asarray(history, dtype=np.float64)
+    count, length = y.shape
+    seasonal = length >= 2 * period
+    alpha, beta, gamma = (HOLT_WINTERS_GRID[:, i] for i in range(3))
+    combos = len(HOLT_WINTERS_GRID)
+    
+    if seasonal:
+        first, second = y[:, :period].mean(axis=1), y[:, period:2 * period].mean(axis=1)
+        trend = np.repeat(((second - first) / period)[:, None], combos, axis=1)
+        level = first[:, None] - trend * (period + 1) / 2
+        season = np.repeat((y[:, :period] - first[:, None])[:, None, :], combos, axis=1)
+        width, warmup = period, period
+    else:
+        gamma = np.zeros_like(gamma)
+        initial_trend = y[:, 1] - y[:, 0] if length > 1 else np.zeros(count)
+        trend = np.repeat(initial_trend[:, None], combos, axis=1)
+        level = y[:, :1] - trend
+        season = np.zeros((count, combos, 1))
+        width, warmup = 1, 1
+    
+    fitted = np.empty((count, combos, length))
+    sse = np.zeros((count, combos))
+    for t in range(length):
+        observed = y[:, t:t + 1]
+        seasonal_term = season[:, :, t % width]
+        fitted[:, :, t] = level + trend + seasonal_term
+        if t >= warmup:
+            sse += (observed - fitted[:, :, t]) ** 2
+        new_level = alpha * (observed - seasonal_term) + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        season[:, :, t % width] = gamma * (observed - new_level) + (1 - gamma) * seasonal_term
+        level = new_level
+    
+    rows, best = np.arange(count), sse.argmin(axis=1)
+    steps = np.arange(1, horizon + 1)
+    forecast = (level[rows, best][:, None] + steps * trend[rows, best][:, None]
+                + season[rows, best][:, (length + steps - 1) % width])
+    fitted = fitted[rows, best]
+    fitted[:, :warmup] = np.nan
+    return forecast, fitted
+
+FORECAST_MODELS = {
+    'holt_winters': holt_winters_forecast,
+    'seasonal_naive': seasonal_naive_forecast,
+    'linear': linear_trend_forecast,
+}
+
+def _row_nanmean(values: np.ndarray) -> np.ndarray:
+    """Mean of each row ignoring NaN; NaN for rows with no values"""
+    valid = ~np.isnan(values)
+    totals = np.where(valid, values, 0).sum(axis=1)
+    counts = valid.sum(axis=1)
+    return np.where(counts > 0, totals / np.maximum(counts, 1), np.nan)
+
+def backtest_forecasts(history: np.ndarray, holdout: int, period: int = 12) -> Dict[str, Dict[str, np.ndarray]]:
+    """Fit every model without the last `holdout` points and score it on them, per series"""
+    y = np.asarray(history, dtype=np.float64)
+    train, actual = y[:, :-holdout], y[:, -holdout:]
+    scores = {}
+    for name, model in FORECAST_MODELS.items():
+        error = model(train, holdout, period)[0] - actual
+        with np.errstate(divide='ignore', invalid='ignore'):
+            relative = np.where(actual != 0, np.abs(error) / np.abs(actual), np.nan)
+        scores[name] = {
+            'mae': np.abs(error).mean(axis=1),
+            'rmse': np.sqrt((error ** 2).mean(axis=1)),
+            'mape': _row_nanmean(relative) * 100
+        }
+    return scores
+
+def fit_forecasts(history: np.ndarray, horizon: int, period: int = 12,
+                  level: float = Config.FORECAST_INTERVAL) -> Dict:
+    """Forecast each series with the model that backtests best, plus prediction intervals.
+    
+    The holdout is the last min(horizon, length // 3) points. Intervals assume one-step
+    residuals compound like a random walk, widening with the square root of the step.
+    """
+    y = np.atleast_2d(np.asarray(history, dtype=np.float64))
+    count, length = y.shape
+    names = list(FORECAST_MODELS)
+    holdout = min(horizon, length // 3)
+    
+    if holdout and length - holdout >= 3:
+        scores = backtest_forecasts(y, holdout, period)
+        choice = np.stack([scores[name]['mae'] for name in names]).argmin(axis=0)
+    else:
+        scores, holdout = {}, 0
+        choice = np.full(count, names.index('linear'))
+    
+    forecast, fitted = np.empty((count, horizon)), np.empty((count, length))
+    for index, name in enumerate(names):
+        rows = choice == index
+        if rows.any():
+            forecast[rows], fitted[rows] = FORECAST_MODELS[name](y[rows], horizon, period)
+    
+    sigma = np.nan_to_num(np.sqrt(_row_nanmean((y - fitted) ** 2)))
+    z = statistics.NormalDist().inv_cdf(0.5 + level / 2)
+    spread = z * sigma[:, None] * np.sqrt(np.arange(1, horizon + 1))
+    return {
+        'model': [names[i] for i in choice],
+        'forecast': forecast,
+        'lower': forecast - spread,
+        'upper': forecast + spread,
+        'backtest': scores,
+        'holdout': holdout
+    }
+
+class ForecastEngine:
+    """Monthly membership and revenue forecasts, refit only when their source tables change"""
+    
+    # Series -> tables whose writes change its history
+    SERIES = {
+        'members': ('members',),
+        'revenue': ('revenue_monthly',),
+        'facility_revenue': ('revenue_monthly', 'facilities'),
+    }
+    
+    def __init__(self, db_manager: DatabaseManager, horizon: int = Config.FORECAST_HORIZON_MONTHS,
+                 history_months: int = Config.FORECAST_HISTORY_MONTHS, level: float = Config.FORECAST_INTERVAL):
+        self.db = db_manager
+        self.horizon = horizon
+        self.history_months = history_months
+        self.level = level
+        self._lock = threading.Lock()
+        self._cache: Dict[str, tuple] = {}  # series -> (key, result)
+        self._stats = {'hits': 0, 'fits': 0, 'last_fit_ms': 0.0}
+    
+    @staticmethod
+    def _shift_month(month: date, months: int) -> date:
+        index = month.year * 12 + month.month - 1 + months
+        return date(index // 12, index % 12 + 1, 1)
+    
+    def _months(self) -> List[date]:
+        """Starts of the completed months in the history window, oldest first"""
+        current = datetime.now().date().replace(day=1)
+        return [self._shift_month(current, -i) for i in range(self.history_months, 0, -1)]
+    
+    def _member_history(self, months: List[date]) -> Optional[np.ndarray]:
+        """Members at the end of each month"""
+        first, end = months[0].isoformat(), self._shift_month(months[-1], 1).isoformat()
+        before = self.db.execute_query("SELECT COUNT(*) AS n FROM members WHERE join_date < ?", (first,))
+        joined = self.db.execute_query('''
+            SELECT strftime('%Y-%m-01', join_date) AS month, COUNT(*) AS n
+            FROM members
+            WHERE join_date >= ? AND join_date < ?
+            GROUP BY month
+        ''', (first, end))
+        if not before:
+            return None
+        index = {month.isoformat(): i for i, month in enumerate(months)}
+        counts = np.zeros(len(months))
+        for row in joined:
+            if row['month'] in index:
+                counts[index[row['month']]] = row['n']
+        return before[0]['n'] + np.cumsum(counts)
+    
+    def _revenue_history(self, months: List[date]) -> tuple:
+        """(facility ids, revenue shaped [facility, month]); id 0 collects revenue with no facility"""
+        data = self.db.query_arrays('''
+            SELECT facility_id, month_start, SUM(amount) AS amount
+            FROM revenue_monthly
+            WHERE month_start BETWEEN ? AND ?
+            GROUP BY facility_id, month_start
+        ''', (months[0].isoformat(), months[-1].isoformat()), dtypes={'facility_id': np.int64})
+        if not data or not len(data['facility_id']):
+            return np.zeros(0, dtype=np.int64), np.zeros((0, len(months)))
         
-        if facilities:
-            avg_utilization = sum(f['utilization'] for f in facilities) / len(facilities)
-            
-            if avg_utilization > 85:
-                insights.append({
-                    'type': 'optimization',
-                    'priority': 'high',
-                    'title': 'High Facility Utilization',
-                    'description': f'Average utilization at {avg_utilization:.1f}%. Consider dynamic pricing or expansion.',
-                    'impact': 'Revenue increase potential: $15K-25K/month',
-                    'action': 'Implement surge pricing during peak hours'
-                })
-            elif avg_utilization < 60:
-                insights.append({
-                    'type': 'opportunity',
-                    'priority': 'medium',
-                    'title': 'Underutilized Facilities',
-                    'description': f'Average utilization only {avg_utilization:.1f}%. Marketing could boost usage.',
-                    'impact': 'Revenue increase potential: $8K-15K/month',
-                    'action': 'Launch targeted marketing campaigns'
-                })
+        ids, rows = np.unique(data['facility_id'], return_inverse=True)
+        columns = np.searchsorted(np.array([m.isoformat() for m in months]), data['month_start'].astype(str))
+        history = np.zeros((len(ids), len(months)))
+        np.add.at(history, (rows, columns), data['amount'].astype(np.float64))
+        return ids, history
+    
+    def _result(self, months: List[date], history: np.ndarray, fit: Dict, row: int) -> Dict:
+        """One series' history, forecast and backtest scores as plain lists"""
+        current = self._shift_month(months[-1], 1)
+        return {
+            'months': [m.isoformat() for m in months],
+            'history': history.tolist(),
+            'forecast_months': [self._shift_month(current, i).isoformat() for i in range(self.horizon)],
+            'forecast': np.maximum(fit['forecast'][row], 0).tolist(),
+            'lower': np.maximum(fit['lower'][row], 0).tolist(),
+            'upper': fit['upper'][row].tolist(),
+            'model': fit['model'][row],
+            'backtest': {name: {metric: float(values[row]) for metric, values in metrics.items()}
+                         for name, metrics in fit['backtest'].items()}
+        }
+    
+    def _single(self, months: List[date], history: Optional[np.ndarray]) -> Optional[Dict]:
+        """Forecast one series from its first non-zero month, or None with too little history"""
+        if history is None or not history.any():
+            return None
+        start = int(np.argmax(history != 0))
+        if len(months) - start < Config.FORECAST_MIN_MONTHS:
+            return None
+        fit = fit_forecasts(history[None, start:], self.horizon, level=self.level)
+        return self._result(months[start:], history[start:], fit, 0)
+    
+    def _build(self, name: str) -> Any:
+        months = self._months()
+        if name == 'members':
+            return self._single(months, self._member_history(months))
         
-        if members:
-            premium_count = len([m for m in members if m['tier'] in ['Premium', 'Elite']])
-            premium_ratio = premium_count / len(members) * 100
-            
-            if premium_ratio < 40:
-                insights.append({
-                    'type': 'growth',
-                    'priority': 'medium',
-                    'title': 'Member Tier Upgrade Opportunity',
-                    'description': f'Only {premium_ratio:.1f}% are Premium/Elite members.',
-                    'impact': 'Revenue increase potential: $5K-12K/month',
-                    'action': 'Create member upgrade incentive program'
-                })
+        ids, history = self._revenue_history(months)
+        if name == 'revenue':
+            return self._single(months, history.sum(axis=0) if len(ids) else None)
         
-        return insights
+        keep = ids != 0
+        ids, history = ids[keep], history[keep]
+        if not len(ids):
+            return []
+        names = {f['id']: f['name'] for f in self.db.execute_query("SELECT id, name FROM facilities")}
+        fit = fit_forecasts(history, self.horizon, level=self.level)
+        results = []
+        for row, facility_id in enumerate(ids.tolist()):
+            result = self._result(months, history[row], fit, row)
+            result.update(facility_id=facility_id, facility=names.get(facility_id, f"Facility {facility_id}"))
+            results.append(result)
+        return results
+    
+    def forecast(self, name: str) -> Any:
+        """Cached forecast for a series; refit when its tables are written or a month closes"""
+        key = (datetime.now().date().replace(day=1),) + tuple(self.db.table_version(t) for t in self.SERIES[name])
+        with self._lock:
+            cached = self._cache.get(name)
+            if cached is not None and cached[0] == key:
+                self._stats['hits'] += 1
+                return cached[1]
+            
+            start = time.perf_counter()
+            result = self._build(name)
+            self._stats['fits'] += 1
+            self._stats['last_fit_ms'] = round((time.perf_counter() - start) * 1000, 2)
+            self._cache[name] = (key, result)
+            return result
+    
+    def member_forecast(self) -> Optional[Dict]:
+        """Members at each month end, forecast over the horizon"""
+        return self.forecast('members')
+    
+    def revenue_forecast(self) -> Optional[Dict]:
+        """Monthly revenue across the site, forecast over the horizon"""
+        return self.forecast('revenue')
+    
+    def facility_revenue_forecasts(self) -> List[Dict]:
+        """Monthly revenue forecast for every facility with recorded revenue"""
+        return self.forecast('facility_revenue')
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            return dict(self._stats, series=len(self._cache))
+
+# =============================================================================
+# SERVICE CONTAINER
+# =============================================================================
+
+class PeriodicTask:
+    """Run a function on a daemon thread every interval seconds, or sooner when triggered"""
+    
+    def __init__(self, name: str, interval: float, function: Callable[[], Any]):
+        self.name = name
+        self.interval = interval
+        self.function = function
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.runs = 0
+        self.errors = 0
+        self.last_run: Optional[datetime] = None
+        self.last_duration = 0.0
+    
+    def start(self):
+        """Start the worker thread (no-op if already running)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name=f"task-{self.name}", daemon=True)
+        self._thread.start()
+    
+    def trigger(self):
+        """Run as soon as the worker is free instead of waiting out the interval"""
+        self._wake.set()
+    
+    def stop(self, timeout: float = 5.0):
+        """Stop the worker, waiting for a run in progress to finish"""
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+    
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stopping.is_set():
+                return
+            
+            start = time.perf_counter()
+            try:
+                self.function()
+                self.runs += 1
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Background task {self.name} error: {e}")
+            self.last_duration = time.perf_counter() - start
+            self.last_run = datetime.now()
+    
+    def stats(self) -> Dict:
+        """Run counts and timing"""
+        return {'name': self.name, 'interval': self.interval, 'runs': self.runs, 'errors': self.errors,
+                'last_run': self.last_run.isoformat(timespec='seconds') if self.last_run else None,
+                'last_duration_ms': round(self.last_duration * 1000, 2),
+                'running': self._thread is not None and self._thread.is_alive()}
+
+class DashboardPublisher:
+    """Builds the shared DashboardSnapshot off the render path and swaps it in atomically.
+    
+    A background task rebuilds it every interval and as soon as a write touches a dashboard
+    table; writes arriving during a build coalesce into one follow-up build.
+    """
+    
+    def __init__(self, db_manager: DatabaseManager, analytics_service: AnalyticsService,
+                 interval: float = Config.DASHBOARD_REFRESH_SECONDS):
+        self.db = db_manager
+        self.analytics_service = analytics_service
+        self.task = PeriodicTask('dashboard', interval, self.refresh)
+        self._snapshot: Optional[DashboardSnapshot] = None
+        self._build_lock = threading.Lock()
+        self.published = 0
+        db_manager.add_write_listener(self._on_write)
+    
+    def _versions(self) -> tuple:
+        return tuple(self.db.table_version(t) for t in InsightEngine.TABLES)
+    
+    def _on_write(self, tables: set):
+        if '*' in tables or not tables.isdisjoint(InsightEngine.TABLES):
+            self.task.trigger()
+    
+    def refresh(self) -> DashboardSnapshot:
+        """Build a snapshot from current data and publish it"""
+        with self._build_lock:
+            # Versions first: a write during the build leaves the snapshot marked stale, never wrongly current
+            versions = self._versions()
+            start = time.perf_counter()
+            data = self.analytics_service.generate_dashboard_data()
+            snapshot = DashboardSnapshot(
+                summary=data['summary'],
+                trends=data['trends'],
+                insights=data['insights'],
+                computed_at=datetime.now(),
+                build_ms=round((time.perf_counter() - start) * 1000, 2),
+                versions=versions
+            )
+            # One reference assignment: readers get the previous snapshot or this one, never a mix
+            self._snapshot = snapshot
+            self.published += 1
+            return snapshot
+    
+    def latest(self) -> DashboardSnapshot:
+        """Most recently published snapshot, built here only if none exists yet"""
+        snapshot = self._snapshot
+        return snapshot if snapshot is not None else self.refresh()
+    
+    def is_current(self, snapshot: DashboardSnapshot) -> bool:
+        """False once a dashboard table has been written since the snapshot was built"""
+        return snapshot.versions == self._versions()
+    
+    def stats(self) -> Dict:
+        snapshot = self._snapshot
+        return {
+            'published': self.published,
+            'computed_at': snapshot.computed_at.isoformat(timespec='seconds') if snapshot else None,
+            'build_ms': snapshot.build_ms if snapshot else None,
+            'current': self.is_current(snapshot) if snapshot else False
+        }
+
+class ServiceContainer:
+    """Process-wide owner of the database and service objects, with lifecycle hooks"""
+    
+    def __init__(self, db_path: str = Config.DATABASE_PATH):
+        self.db_path = db_path
+        self.started = False
+        self._lock = threading.RLock()
+        self._startup_hooks: List[Callable[['ServiceContainer'], None]] = []
+        self._shutdown_hooks: List[Callable[['ServiceContainer'], None]] = []
+        self.tasks: List[PeriodicTask] = []
+    
+    def on_startup(self, hook: Callable[['ServiceContainer'], None]):
+        """Register a hook run after the services are built (immediately if already started)"""
+        with self._lock:
+            self._startup_hooks.append(hook)
+            if self.started:
+                hook(self)
+    
+    def on_shutdown(self, hook: Callable[['ServiceContainer'], None]):
+        """Register a hook run before the database is closed, in reverse registration order"""
+        with self._lock:
+            self._shutdown_hooks.append(hook)
+    
+    def startup(self) -> 'ServiceContainer':
+        """Build the shared service graph once; safe to call from any thread"""
+        with self._lock:
+            if self.started:
+                return self
+            
+            self.db = DatabaseManager(self.db_path)
+            self.auth_service = AuthenticationService(self.db)
+            self.facility_service = FacilityService(self.db)
+            self.member_service = MemberService(self.db)
+            self.equipment_service = EquipmentService(self.db)
+            self.event_service = EventService(self.db)
+            self.revenue_service = RevenueService(self.db)
+            self.booking_service = BookingService(self.db)
+            self.utilization_engine = UtilizationEngine(self.db, self.booking_service)
+            self.trend_engine = TrendEngine(self.db)
+            self.analytics_service = AnalyticsService(
+                self.db,
+                facility_service=self.facility_service,
+                member_service=self.member_service,
+                revenue_service=self.revenue_service,
+                utilization_engine=self.utilization_engine,
+                trend_engine=self.trend_engine
+            )
+            
+            self.maintenance_scheduler = MaintenanceScheduler(self.db, self.equipment_service)
+            self.tournament_scheduler = TournamentScheduler(self.db, self.booking_service)
+            self.forecast_engine = ForecastEngine(self.db)
+            self.dashboard_publisher = DashboardPublisher(self.db, self.analytics_service)
+            
+            self.booking_service.rebuild_index()
+            self.utilization_engine.rebuild()
+            self.maintenance_scheduler.rebuild()
+            self.dashboard_publisher.refresh()
+            
+            # Background work runs off the render path, on one thread per task
+            self.tasks = [
+                PeriodicTask('maintenance', Config.MAINTENANCE_REFRESH_SECONDS, self.maintenance_scheduler.refresh),
+                self.dashboard_publisher.task
+            ]
+            
+            self.started = True
+            for hook in self._startup_hooks:
+                hook(self)
+            for task in self.tasks:
+                task.start()
+            
+            atexit.register(self.shutdown)
+            logger.info("Service container started")
+            return self
+    
+    def shutdown(self):
+        """Run shutdown hooks and release the connection pool"""
+        with self._lock:
+            if not self.started:
+                return
+            
+            for task in self.tasks:
+                task.stop()
+            self.event_service.close()
+            
+            for hook in reversed(self._shutdown_hooks):
+                try:
+                    hook(self)
+                except Exception as e:
+                    logger.error(f"Shutdown hook error: {e}")
+            
+            self.db.close()
+            self.started = False
+            atexit.unregister(self.shutdown)
+            logger.info("Service container stopped")
+
+@st.cache_resource
+def get_service_container() -> ServiceContainer:
+    """Started service container shared by every session and rerun in this process"""
+    return ServiceContainer().startup()
 
 # =============================================================================
 # STREAMLIT APPLICATION
@@ -925,15 +4637,22 @@ class AnalyticsService:
 class SportAIApp:
     """Main SportAI Enterprise Suite application"""
     
-    def __init__(self):
-        self.db = DatabaseManager()
-        self.auth_service = AuthenticationService(self.db)
-        self.facility_service = FacilityService(self.db)
-        self.member_service = MemberService(self.db)
-        self.equipment_service = EquipmentService(self.db)
-        self.event_service = EventService(self.db)
-        self.revenue_service = RevenueService(self.db)
-        self.analytics_service = AnalyticsService(self.db)
+    def __init__(self, services: Optional[ServiceContainer] = None):
+        self.services = services or get_service_container()
+        self.db = self.services.db
+        self.auth_service = self.services.auth_service
+        self.facility_service = self.services.facility_service
+        self.member_service = self.services.member_service
+        self.equipment_service = self.services.equipment_service
+        self.event_service = self.services.event_service
+        self.revenue_service = self.services.revenue_service
+        self.booking_service = self.services.booking_service
+        self.utilization_engine = self.services.utilization_engine
+        self.maintenance_scheduler = self.services.maintenance_scheduler
+        self.tournament_scheduler = self.services.tournament_scheduler
+        self.forecast_engine = self.services.forecast_engine
+        self.dashboard_publisher = self.services.dashboard_publisher
+        self.analytics_service = self.services.analytics_service
         
         # Initialize session state
         if 'authenticated' not in st.session_state:
@@ -953,11 +4672,15 @@ class SportAIApp:
         # Apply custom CSS
         self._apply_custom_styles()
         
-        # Route to appropriate interface
-        if not st.session_state.authenticated:
-            self._render_login()
-        else:
-            self._render_main_application()
+        # Route to appropriate interface; service reads are memoized for this rerun
+        with request_scope() as memo:
+            if not st.session_state.authenticated:
+                self._render_login()
+            else:
+                self._render_main_application()
+        
+        st.session_state.request_memo_stats = memo.stats()
+        logger.debug(f"Request memo: {memo.stats()}")
     
     def _apply_custom_styles(self):
         """Apply custom CSS styling"""
@@ -1096,6 +4819,7 @@ class SportAIApp:
             pages = {
                 "📊 Dashboard": "dashboard",
                 "🏟️ Facilities": "facilities",
+                "🗓️ Bookings": "bookings",
                 "👥 Members": "members",
                 "🔧 Equipment": "equipment",
                 "📅 Events": "events",
@@ -1110,14 +4834,15 @@ class SportAIApp:
             st.markdown("---")
             
             # Quick stats
-            dashboard_data = self.analytics_service.generate_dashboard_data()
-            summary = dashboard_data['summary']
+            snapshot = self.dashboard_publisher.latest()
+            summary = snapshot.summary
             
             st.markdown("### 📈 Quick Stats")
             st.metric("Facilities", summary['total_facilities'])
             st.metric("Members", summary['active_members'])
             st.metric("Revenue", f"${summary['total_revenue']:,.0f}")
             st.metric("Utilization", f"{summary['average_utilization']:.1f}%")
+            st.caption(self._snapshot_age(snapshot))
             
             st.markdown("---")
             
@@ -1131,6 +4856,8 @@ class SportAIApp:
             self._render_dashboard()
         elif page_key == "facilities":
             self._render_facilities()
+        elif page_key == "bookings":
+            self._render_bookings()
         elif page_key == "members":
             self._render_members()
         elif page_key == "equipment":
@@ -1144,14 +4871,22 @@ class SportAIApp:
         elif page_key == "settings":
             self._render_settings()
     
+    def _snapshot_age(self, snapshot: DashboardSnapshot) -> str:
+        """Staleness line for a dashboard snapshot"""
+        age = max(0, int((datetime.now() - snapshot.computed_at).total_seconds()))
+        when = "just now" if age < 5 else f"{age}s ago" if age < 120 else f"{age // 60} min ago"
+        status = "" if self.dashboard_publisher.is_current(snapshot) else " · refreshing after recent changes"
+        return f"🕒 Updated {when}{status}"
+    
     def _render_dashboard(self):
         """Render main dashboard"""
         st.markdown("## 📊 Executive Dashboard")
         
-        # Get dashboard data
-        dashboard_data = self.analytics_service.generate_dashboard_data()
-        summary = dashboard_data['summary']
-        insights = dashboard_data['insights']
+        # Shared snapshot, rebuilt in the background; rendering never waits on the aggregations
+        snapshot = self.dashboard_publisher.latest()
+        summary = snapshot.summary
+        insights = snapshot.insights
+        st.caption(self._snapshot_age(snapshot))
         
         # Key metrics
         col1, col2, col3, col4 = st.columns(4)
@@ -1189,7 +4924,7 @@ class SportAIApp:
         
         with col1:
             st.markdown("### 📈 Member Growth Trend")
-            member_growth = dashboard_data['trends']['member_growth']
+            member_growth = snapshot.trends['member_growth']
             
             if member_growth:
                 growth_df = pd.DataFrame(member_growth)
@@ -1208,7 +4943,7 @@ class SportAIApp:
         
         with col2:
             st.markdown("### 💰 Revenue Trend")
-            revenue_trend = dashboard_data['trends']['revenue_trend']
+            revenue_trend = snapshot.trends['revenue_trend']
             
             if revenue_trend:
                 revenue_df = pd.DataFrame(revenue_trend)
@@ -1286,6 +5021,7 @@ class SportAIApp:
         
         # Current facilities
         facilities = self.facility_service.get_all_facilities()
+        booked_share = self.utilization_engine.facility_utilization()
         
         if facilities:
             st.markdown("### 📋 Current Facilities")
@@ -1304,7 +5040,7 @@ class SportAIApp:
                             <p><strong>Type:</strong> {facility['type']}</p>
                             <p><strong>Capacity:</strong> {facility['capacity']}</p>
                             <p><strong>Rate:</strong> ${facility['hourly_rate']}/hour</p>
-                            <p><strong>Utilization:</strong> {facility['utilization']:.1f}%</p>
+                            <p><strong>Utilization:</strong> {booked_share.get(facility['id'], 0.0):.1f}%</p>
                             <p><strong>Revenue:</strong> ${facility['revenue']:,.0f}</p>
                             <p><strong>Status:</strong> <span class="{status_class}">{facility['status']}</span></p>
                         </div>
@@ -1334,6 +5070,29 @@ class SportAIApp:
             with col4:
                 st.metric("Average Spending", f"${member_stats['average_spending']:,.0f}")
         
+        # Front-desk lookup: ranked prefix search over ID, name, email and phone
+        quick_find = st.text_input("🔎 Find Member", placeholder="Start typing a name, email, phone or member ID",
+                                   key="member_quick_find")
+        if quick_find:
+            matches = self.member_service.search_members(quick_find)
+            if matches:
+                st.dataframe(
+                    pd.DataFrame(matches),
+                    use_container_width=True,
+                    hide_index=True,
+                    column_order=['member_id', 'name', 'email', 'phone', 'tier', 'status'],
+                    column_config={
+                        'member_id': 'ID',
+                        'name': 'Name',
+                        'email': 'Email',
+                        'phone': 'Phone',
+                        'tier': 'Tier',
+                        'status': 'Status'
+                    }
+                )
+            else:
+                st.info(f"No members match '{quick_find}'")
+        
         # Add new member
         with st.expander("➕ Add New Member"):
             with st.form("add_member"):
@@ -1370,27 +5129,63 @@ class SportAIApp:
                     else:
                         st.error("Please fill in required fields")
         
-        # Current members
-        members = self.member_service.get_all_members()
-        
-        if members:
-            st.markdown("### 📋 Member Directory")
-            
-            # Create DataFrame for display
-            display_data = []
-            for member in members:
-                display_data.append({
-                    'ID': member['member_id'],
-                    'Name': member['name'],
-                    'Email': member['email'],
-                    'Tier': member['tier'],
-                    'Total Spent': f"${member['total_spent']:,.0f}",
-                    'Status': member['status'],
-                    'Join Date': member['join_date'][:10] if member['join_date'] else 'N/A'
-                })
+        # Member directory, fetched one keyset page at a time
+        st.markdown("### 📋 Member Directory")
+        
+        col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
+        with col1:
+            search = st.text_input("Search", placeholder="Name, email or member ID", key="member_search")
+        with col2:
+            tier_filter = st.selectbox("Tier", ["All", "Basic", "Premium", "Elite"], key="member_tier_filter")
+        with col3:
+            status_filter = st.selectbox("Status", ["All", "active", "inactive"], key="member_status_filter")
+        with col4:
+            page_size = st.selectbox("Rows per page", [25, 50, 100], index=1, key="member_page_size")
+        
+        # Stack of page cursors (None = first page); reset whenever the filters change
+        filters = (search, tier_filter, status_filter, page_size)
+        if st.session_state.get('member_page_filters') != filters:
+            st.session_state.member_page_filters = filters
+            st.session_state.member_page_cursors = [None]
+        cursors = st.session_state.member_page_cursors
+        
+        page = self.member_service.get_members_page(
+            after=cursors[-1], limit=page_size,
+            tier=None if tier_filter == "All" else tier_filter,
+            status=None if status_filter == "All" else status_filter,
+            search=search or None
+        )
+        members = page['rows']
+        
+        if not members.empty:
+            st.dataframe(
+                members,
+                use_container_width=True,
+                hide_index=True,
+                column_order=['member_id', 'name', 'email', 'tier', 'total_spent', 'status', 'join_date'],
+                column_config={
+                    'member_id': 'ID',
+                    'name': 'Name',
+                    'email': 'Email',
+                    'tier': 'Tier',
+                    'total_spent': st.column_config.NumberColumn('Total Spent', format="$%.0f"),
+                    'status': 'Status',
+                    'join_date': st.column_config.DateColumn('Join Date', format="YYYY-MM-DD")
+                }
+            )
             
-            df = pd.DataFrame(display_data)
-            st.dataframe(df, use_container_width=True)
+            col1, col2, col3 = st.columns([1, 2, 1])
+            with col1:
+                st.button("◀ Previous", key="member_page_prev", disabled=len(cursors) == 1,
+                          on_click=cursors.pop)
+            with col2:
+                first_row = (len(cursors) - 1) * page_size + 1
+                st.caption(f"Page {len(cursors)} · members {first_row}–{first_row + len(members) - 1}")
+            with col3:
+                st.button("Next ▶", key="member_page_next", disabled=not page['has_more'],
+                          on_click=cursors.append, args=(page['next_after'],))
+        elif search or tier_filter != "All" or status_filter != "All":
+            st.info("No members match the current filters")
         else:
             st.info("No members found. Add your first member above!")
     
@@ -1399,14 +5194,15 @@ class SportAIApp:
         st.markdown("## 🔧 Equipment Management")
         
         equipment = self.equipment_service.get_all_equipment()
+        inventory = self.equipment_service.get_equipment_frame()
         
-        if equipment:
+        if equipment and not inventory.empty:
             # Equipment overview
             col1, col2, col3, col4 = st.columns(4)
             
-            total_items = sum(e['available'] + e['rented'] for e in equipment)
-            total_rented = sum(e['rented'] for e in equipment)
-            total_revenue = sum(e['monthly_revenue'] for e in equipment)
+            total_rented = int(inventory['rented'].sum())
+            total_items = int(inventory['available'].sum()) + total_rented
+            total_revenue = float(inventory['monthly_revenue'].sum())
             
             with col1:
                 st.metric("Total Items", total_items)
@@ -1427,52 +5223,297 @@ class SportAIApp:
             with col1:
                 st.markdown("#### 📤 Rent Equipment")
                 
+                member_query = st.text_input("Member", placeholder="Search by name, email, phone or member ID",
+                                             key="rental_member_search")
+                members = self.member_service.search_members(member_query) if member_query else []
+                
+                with st.form("rent_equipment"):
+                    available_equipment = [e for e in equipment if e['available'] > 0]
+                    
+                    if available_equipment:
+                        member = st.selectbox("Select Member", members,
+                                              format_func=lambda m: f"{m['name']} ({m['member_id']})")
+                        equipment_item = st.selectbox("Select Equipment", available_equipment,
+                                                      format_func=lambda e: f"{e['name']} (Available: {e['available']})")
+                        rent_quantity = st.number_input("Quantity", min_value=1, value=1)
+                        rent_days = st.number_input("Days", min_value=1, value=Config.RENTAL_DEFAULT_DAYS)
+                        
+                        if st.form_submit_button("Rent Equipment"):
+                            if not member:
+                                st.error("Please select a member")
+                            else:
+                                rental_id = self.equipment_service.check_out(
+                                    equipment_item['id'], member['id'], int(rent_quantity), int(rent_days)
+                                )
+                                
+                                if rental_id:
+                                    st.success(f"✅ Equipment rented (rental #{rental_id})")
+                                    st.rerun()
+                                else:
+                                    st.error("❌ Failed to rent equipment")
+                    else:
+                        st.info("No equipment available for rent")
+            
+            with col2:
+                st.markdown("#### 📥 Return Equipment")
+                
                 with st.form("return_equipment"):
-                    rented_equipment = [f"{e['name']} (Rented: {e['rented']})" for e in equipment if e['rented'] > 0]
+                    open_rentals = self.equipment_service.get_open_rentals()
                     
-                    if rented_equipment:
-                        selected_return = st.selectbox("Select Equipment", rented_equipment)
-                        return_quantity = st.number_input("Quantity", min_value=1, value=1)
+                    if open_rentals:
+                        rental = st.selectbox(
+                            "Select Rental", open_rentals,
+                            format_func=lambda r: f"#{r['id']} {r['equipment_name']} ×{r['quantity']} · "
+                                                  f"{r['member_name']} · due {r['due_at'][:16]}"
+                        )
                         
                         if st.form_submit_button("Return Equipment"):
-                            equipment_name = selected_return.split(" (Rented:")[0]
-                            equipment_item = next(e for e in equipment if e['name'] == equipment_name)
-                            
-                            success = self.equipment_service.return_equipment(equipment_item['id'], return_quantity)
+                            charge = self.equipment_service.check_in(rental['id'])
                             
-                            if success:
-                                st.success("Equipment returned successfully!")
+                            if charge is not None:
+                                st.success(f"Equipment returned · charged ${charge:,.2f}")
                                 st.rerun()
                             else:
                                 st.error("Failed to return equipment")
                     else:
                         st.info("No equipment currently rented")
             
-            # Equipment table
-            equipment_data = []
-            for item in equipment:
-                equipment_data.append({
-                    'Name': item['name'],
-                    'Category': item['category'],
-                    'Available': item['available'],
-                    'Rented': item['rented'],
-                    'Daily Rate': f"${item['daily_rate']:.0f}",
-                    'Monthly Revenue': f"${item['monthly_revenue']:,.0f}",
-                    'Condition': f"{item['condition_score']:.1f}/10",
-                    'Status': item['status']
-                })
+            overdue = self.equipment_service.get_overdue_rentals()
+            if overdue:
+                st.markdown(f"### ⏰ Overdue Rentals ({len(overdue)})")
+                st.dataframe(
+                    pd.DataFrame(overdue),
+                    use_container_width=True,
+                    hide_index=True,
+                    column_order=['id', 'equipment_name', 'quantity', 'member_name', 'phone', 'due_at',
+                                  'days_overdue'],
+                    column_config={
+                        'id': 'Rental',
+                        'equipment_name': 'Equipment',
+                        'quantity': 'Qty',
+                        'member_name': 'Member',
+                        'phone': 'Phone',
+                        'due_at': 'Due',
+                        'days_overdue': 'Days Overdue'
+                    }
+                )
+            
+            # Served from the scheduler's in-memory queue; a background task keeps it in sync
+            work = self.maintenance_scheduler.work_list(horizon_days=30)
+            if work:
+                st.markdown(f"### 🛠️ Maintenance Queue ({sum(w['overdue'] for w in work)} due now)")
+                st.dataframe(
+                    pd.DataFrame(work),
+                    use_container_width=True,
+                    hide_index=True,
+                    column_order=['name', 'category', 'condition_score', 'wear_per_day', 'next_maintenance',
+                                  'due_at', 'reason', 'overdue'],
+                    column_config={
+                        'name': 'Equipment',
+                        'category': 'Category',
+                        'condition_score': st.column_config.NumberColumn('Condition', format="%.2f/10"),
+                        'wear_per_day': st.column_config.NumberColumn('Wear / Day', format="%.3f"),
+                        'next_maintenance': 'Scheduled',
+                        'due_at': st.column_config.DatetimeColumn('Due', format="YYYY-MM-DD"),
+                        'reason': 'Reason',
+                        'overdue': 'Due Now'
+                    }
+                )
+                
+                with st.form("complete_maintenance"):
+                    serviced = st.selectbox("Equipment", work, format_func=lambda w: w['name'])
+                    if st.form_submit_button("Mark Serviced"):
+                        if self.equipment_service.complete_maintenance(serviced['id']):
+                            st.success(f"✅ {serviced['name']} serviced")
+                            st.rerun()
+                        else:
+                            st.error("Failed to record maintenance")
             
-            df = pd.DataFrame(equipment_data)
-            st.dataframe(df, use_container_width=True)
+            # Equipment table
+            st.dataframe(
+                inventory,
+                use_container_width=True,
+                hide_index=True,
+                column_order=['name', 'category', 'available', 'rented', 'daily_rate',
+                              'monthly_revenue', 'condition_score', 'status'],
+                column_config={
+                    'name': 'Name',
+                    'category': 'Category',
+                    'available': 'Available',
+                    'rented': 'Rented',
+                    'daily_rate': st.column_config.NumberColumn('Daily Rate', format="$%.0f"),
+                    'monthly_revenue': st.column_config.NumberColumn('Monthly Revenue', format="$%.0f"),
+                    'condition_score': st.column_config.NumberColumn('Condition', format="%.1f/10"),
+                    'status': 'Status'
+                }
+            )
         else:
             st.info("No equipment found in inventory")
     
+    def _render_bookings(self):
+        """Render facility booking management"""
+        st.markdown("## 🗓️ Facility Bookings")
+        
+        facilities = [f for f in self.facility_service.get_all_facilities() if f['status'] == 'active']
+        if not facilities:
+            st.info("Add an active facility before taking bookings")
+            return
+        facility_names = {f['id']: f['name'] for f in facilities}
+        
+        # New booking
+        with st.expander("➕ New Booking", expanded=True):
+            member_query = st.text_input("Member", placeholder="Search by name, email, phone or member ID",
+                                         key="booking_member_search")
+            members = self.member_service.search_members(member_query) if member_query else []
+            
+            with st.form("create_booking"):
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    member = st.selectbox("Select Member", members,
+                                          format_func=lambda m: f"{m['name']} ({m['member_id']})")
+                    facility_id = st.selectbox("Facility", list(facility_names), format_func=facility_names.get)
+                    notes = st.text_input("Notes")
+                
+                with col2:
+                    booking_date = st.date_input("Date", value=datetime.now().date(),
+                                                 min_value=datetime.now().date())
+                    start = st.time_input("Start Time", value=datetime.strptime("09:00", "%H:%M").time(),
+                                          step=timedelta(minutes=15))
+                    end = st.time_input("End Time", value=datetime.strptime("10:00", "%H:%M").time(),
+                                        step=timedelta(minutes=15))
+                
+                if st.form_submit_button("Book Facility"):
+                    start_time, end_time = start.strftime("%H:%M"), end.strftime("%H:%M")
+                    conflict = self.booking_service.find_conflict(
+                        facility_id, booking_date.isoformat(), start_time, end_time
+                    )
+                    
+                    if not member:
+                        st.error("Please select a member")
+                    elif end <= start:
+                        st.error("End time must be after start time")
+                    elif conflict is not None:
+                        st.error(f"❌ {facility_names[facility_id]} is already booked then (booking #{conflict})")
+                    else:
+                        booking_id = self.booking_service.create_booking(
+                            member['id'], facility_id, booking_date.isoformat(), start_time, end_time, notes
+                        )
+                        if booking_id:
+                            st.success(f"✅ Booking #{booking_id} confirmed")
+                            st.rerun()
+                        else:
+                            st.error("❌ Failed to create booking; the slot may have just been taken")
+        
+        # Free-slot search across every facility
+        with st.expander("🔍 Find Availability"):
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                today = datetime.now().date()
+                search_range = st.date_input("Dates", value=(today, today + timedelta(days=7)),
+                                             min_value=today, key="availability_dates")
+                min_capacity = st.number_input("Guests", min_value=1, value=10, key="availability_capacity")
+            with col2:
+                window_start = st.time_input("From", value=datetime.strptime("18:00", "%H:%M").time(),
+                                             step=timedelta(minutes=15), key="availability_from")
+                window_end = st.time_input("Until", value=datetime.strptime("21:00", "%H:%M").time(),
+                                           step=timedelta(minutes=15), key="availability_until")
+            with col3:
+                duration = st.selectbox("Duration", [None, 30, 60, 90, 120, 180],
+                                        format_func=lambda m: "Whole window" if m is None else f"{m} minutes",
+                                        key="availability_duration")
+                facility_type = st.selectbox("Facility Type", [None] + sorted({f['type'] for f in facilities}),
+                                             format_func=lambda t: "Any" if t is None else t,
+                                             key="availability_type")
+            
+            if isinstance(search_range, tuple) and len(search_range) == 2 and window_end > window_start:
+                slots = self.booking_service.find_available_slots(
+                    search_range[0].isoformat(), search_range[1].isoformat(),
+                    window_start.strftime("%H:%M"), window_end.strftime("%H:%M"),
+                    min_capacity=int(min_capacity), duration_minutes=duration, facility_type=facility_type
+                )
+                if slots:
+                    availability = pd.DataFrame(slots)
+                    availability['free_ranges'] = availability['free_ranges'].map(
+                        lambda ranges: ", ".join(f"{a}–{b}" for a, b in ranges)
+                    )
+                    st.dataframe(
+                        availability,
+                        use_container_width=True,
+                        hide_index=True,
+                        column_order=['facility_name', 'type', 'capacity', 'date', 'free_ranges',
+                                      'hourly_rate', 'estimated_cost'],
+                        column_config={
+                            'facility_name': 'Facility',
+                            'type': 'Type',
+                            'capacity': 'Capacity',
+                            'date': 'Date',
+                            'free_ranges': 'Free',
+                            'hourly_rate': st.column_config.NumberColumn('Hourly Rate', format="$%.0f"),
+                            'estimated_cost': st.column_config.NumberColumn('Estimated Cost', format="$%.2f")
+                        }
+                    )
+                else:
+                    st.info("No facility is free for that window")
+            else:
+                st.info("Choose a date range and a window that ends after it starts")
+        
+        # Bookings for a day
+        st.markdown("### 📋 Schedule")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            day = st.date_input("Day", value=datetime.now().date(), key="booking_schedule_day")
+        with col2:
+            facility_filter = st.selectbox("Facility", [None] + list(facility_names),
+                                           format_func=lambda i: "All facilities" if i is None else facility_names[i],
+                                           key="booking_schedule_facility")
+        
+        bookings = self.booking_service.get_bookings(day.isoformat(), facility_filter)
+        
+        if bookings:
+            st.dataframe(
+                pd.DataFrame(bookings),
+                use_container_width=True,
+                hide_index=True,
+                column_order=['id', 'facility_name', 'start_time', 'end_time', 'member_name',
+                              'total_cost', 'status', 'payment_status', 'notes'],
+                column_config={
+                    'id': 'Booking',
+                    'facility_name': 'Facility',
+                    'start_time': 'Start',
+                    'end_time': 'End',
+                    'member_name': 'Member',
+                    'total_cost': st.column_config.NumberColumn('Cost', format="$%.2f"),
+                    'status': 'Status',
+                    'payment_status': 'Payment',
+                    'notes': 'Notes'
+                }
+            )
+            
+            with st.form("cancel_booking"):
+                booking_id = st.selectbox(
+                    "Booking", [b['id'] for b in bookings],
+                    format_func=lambda i: next(f"#{b['id']} {b['facility_name']} {b['start_time']}-{b['end_time']}"
+                                               for b in bookings if b['id'] == i)
+                )
+                if st.form_submit_button("Cancel Booking"):
+                    if self.booking_service.cancel_booking(booking_id):
+                        st.success(f"✅ Booking #{booking_id} cancelled")
+                        st.rerun()
+                    else:
+                        st.error("❌ Failed to cancel booking")
+        else:
+            st.info("No bookings for this day")
+    
     def _render_events(self):
         """Render event management"""
         st.markdown("## Events & Tournaments")
         
         events = self.event_service.get_all_events()
         upcoming_events = self.event_service.get_upcoming_events()
+        waitlists = self.event_service.get_waitlist_counts()
         
         # Event statistics
         col1, col2, col3, col4 = st.columns(4)
@@ -1505,22 +5546,54 @@ class SportAIApp:
                     with col2:
                         st.write(f"**Capacity:** {event['capacity']}")
                         st.write(f"**Registered:** {event['registered']}")
+                        st.write(f"**Waitlist:** {waitlists.get(event['id'], 0)}")
                         st.write(f"**Price:** ${event['price']:.0f}")
                         st.write(f"**Status:** {event['status']}")
                     
                     if event['description']:
                         st.write(f"**Description:** {event['description']}")
                     
-                    if st.button(f"Register Participant", key=f"register_{event['id']}"):
-                        if event['registered'] < event['capacity']:
-                            success = self.event_service.register_for_event(event['id'])
-                            if success:
-                                st.success("Participant registered successfully!")
-                                st.rerun()
+                    member_query = st.text_input("Member", placeholder="Search by name, email, phone or member ID",
+                                                 key=f"register_search_{event['id']}")
+                    members = self.member_service.search_members(member_query) if member_query else []
+                    # Keyed by the query too, so a new search starts from its best match
+                    member = st.selectbox("Select Member", members, key=f"register_member_{event['id']}_{member_query}",
+                                          format_func=lambda m: f"{m['name']} ({m['member_id']})")
+                    
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        if st.button("Register Member", key=f"register_{event['id']}", disabled=member is None):
+                            outcome = self.event_service.register_for_event(event['id'], member['id'])
+                            if outcome['status'] == 'registered':
+                                st.success(f"{member['name']} is registered")
+                            elif outcome['status'] == 'waitlisted':
+                                st.warning(f"Event is full; {member['name']} is #{outcome['waitlist_position']} on the waitlist")
                             else:
                                 st.error("Registration failed")
-                        else:
-                            st.error("Event is at full capacity")
+                    with col2:
+                        if st.button("Cancel Registration", key=f"unregister_{event['id']}", disabled=member is None):
+                            if self.event_service.cancel_registration(event['id'], member['id']):
+                                st.success(f"Cancelled {member['name']}'s registration")
+                            else:
+                                st.error(f"{member['name']} is not registered for this event")
+                    
+                    registrations = self.event_service.get_event_registrations(event['id'])
+                    if registrations:
+                        st.dataframe(
+                            pd.DataFrame(registrations),
+                            use_container_width=True,
+                            hide_index=True,
+                            column_order=['member_code', 'name', 'status', 'requested_at'],
+                            column_config={
+                                'member_code': 'Member ID',
+                                'name': 'Name',
+                                'status': 'Status',
+                                'requested_at': 'Requested'
+                            }
+                        )
+                    
+                    if event['event_type'] in ('Tournament', 'Competition'):
+                        self._render_fixtures(event, registrations)
         else:
             st.info("No upcoming events scheduled")
         
@@ -1528,33 +5601,94 @@ class SportAIApp:
         if events:
             st.markdown("### All Events")
             
-            events_data = []
-            for event in events:
-                events_data.append({
-                    'Name': event['name'],
-                    'Type': event['event_type'],
-                    'Start Date': event['start_date'][:10],
-                    'End Date': event['end_date'][:10],
-                    'Registered': f"{event['registered']}/{event['capacity']}",
-                    'Price': f"${event['price']:.0f}",
-                    'Status': event['status'],
-                    'Organizer': event['organizer']
-                })
+            st.dataframe(
+                self.event_service.get_events_frame(),
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    'name': 'Name',
+                    'event_type': 'Type',
+                    'start_date': st.column_config.DateColumn('Start Date', format="YYYY-MM-DD"),
+                    'end_date': st.column_config.DateColumn('End Date', format="YYYY-MM-DD"),
+                    'registration': 'Registered',
+                    'price': st.column_config.NumberColumn('Price', format="$%.0f"),
+                    'status': 'Status',
+                    'organizer': 'Organizer'
+                }
+            )
+    
+    def _render_fixtures(self, event: Dict, registrations: List[Dict]):
+        """Render an event's fixture list, or the form that schedules it"""
+        st.markdown("#### 🏆 Fixtures")
+        fixtures = self.tournament_scheduler.get_fixtures(event['id'])
+        
+        if fixtures:
+            st.dataframe(
+                pd.DataFrame(fixtures),
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    'game_number': 'Game',
+                    'round': 'Round',
+                    'home': 'Home',
+                    'away': 'Away',
+                    'booking_date': 'Date',
+                    'start_time': 'Start',
+                    'end_time': 'End',
+                    'facility_name': 'Facility'
+                }
+            )
+        
+        with st.form(f"schedule_fixtures_{event['id']}"):
+            registered = [r['name'] for r in registrations
+                          if r['status'] == 'registered' and r['member_id'] is not None]
+            teams = st.text_area("Teams (one per line, in seed order)", value="\n".join(registered))
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                fixture_format = st.selectbox("Format", TournamentScheduler.FORMATS,
+                                              format_func=lambda f: f.replace('_', ' ').title())
+            with col2:
+                game_minutes = st.number_input("Game Minutes", min_value=15, step=15,
+                                               value=Config.TOURNAMENT_GAME_MINUTES)
+            with col3:
+                rest_minutes = st.number_input("Rest Minutes", min_value=0, step=15,
+                                               value=Config.TOURNAMENT_REST_MINUTES)
             
-            df = pd.DataFrame(events_data)
-            st.dataframe(df, use_container_width=True)
+            if st.form_submit_button("Reschedule Fixtures" if fixtures else "Schedule Fixtures"):
+                plan = self.tournament_scheduler.schedule(
+                    event['id'], teams.splitlines(), fixture_format, int(game_minutes), int(rest_minutes),
+                    replace=bool(fixtures)
+                )
+                if plan.get('error'):
+                    st.error(plan['error'])
+                elif plan['unscheduled']:
+                    kept = "; the current fixtures are unchanged" if fixtures else ""
+                    st.error(f"Only {len(plan['games']) - plan['unscheduled']} of {len(plan['games'])} games fit "
+                             f"on {plan['facilities']} facilities over {plan['days']} days; nothing was booked{kept}")
+                else:
+                    st.success(f"✅ Booked {len(plan['games'])} games in {plan['schedule_ms']:.0f} ms")
+                    st.rerun()
     
     def _render_revenue(self):
         """Render revenue management"""
         st.markdown("## Revenue Management")
         
+        periods = {"Last 7 days": 7, "Last 30 days": 30, "Last 90 days": 90, "Last 365 days": 365}
+        col1, col2 = st.columns(2)
+        with col1:
+            period = st.selectbox("Period", list(periods), index=1, key="revenue_period")
+        with col2:
+            grain = st.selectbox("Trend Grain", ["daily", "weekly", "monthly"], key="revenue_grain",
+                                 format_func=str.capitalize)
+        days = periods[period]
+        
         # Revenue summary
-        revenue_summary = self.revenue_service.get_revenue_summary(30)
+        revenue_summary = self.revenue_service.get_revenue_summary(days)
         
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("30-Day Revenue", f"${revenue_summary['total_revenue']:,.0f}")
+            st.metric(f"{days}-Day Revenue", f"${revenue_summary['total_revenue']:,.0f}")
         with col2:
             st.metric("Transactions", revenue_summary['transaction_count'])
         with col3:
@@ -1593,27 +5727,58 @@ class SportAIApp:
                     else:
                         st.error("Failed to record revenue")
         
-        # Revenue by source chart
-        facilities = self.facility_service.get_all_facilities()
-        
-        if facilities:
-            st.markdown("### Revenue by Facility")
-            
-            revenue_by_facility = {f['name']: f['revenue'] for f in facilities}
-            
-            fig = px.pie(
-                values=list(revenue_by_facility.values()),
-                names=list(revenue_by_facility.keys()),
-                title="Revenue Distribution by Facility"
-            )
+        trend = self.revenue_service.get_revenue_trend(days, grain)
+        if any(point['transactions'] for point in trend):
+            st.markdown("### Revenue Trend")
+            fig = px.bar(pd.DataFrame(trend), x='date', y='revenue', hover_data=['transactions'],
+                         title=f"{grain.capitalize()} Revenue")
             st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("No revenue recorded in this period")
+            return
+        
+        # Revenue by source and facility charts
+        col1, col2 = st.columns(2)
+        for column, by, title in ((col1, 'source', "Revenue by Source"), (col2, 'facility', "Revenue by Facility")):
+            breakdown = self.revenue_service.get_revenue_breakdown(days, by)
+            with column:
+                st.markdown(f"### {title}")
+                fig = px.pie(
+                    values=[row['revenue'] for row in breakdown],
+                    names=[row['label'] for row in breakdown],
+                    title=f"{title} ({period.lower()})"
+                )
+                st.plotly_chart(fig, use_container_width=True)
+    
+    def _render_forecast(self, forecast: Optional[Dict], label: str, title: str, money: bool = False):
+        """History, forecast and prediction band for one monthly series"""
+        if forecast is None:
+            st.info(f"A forecast needs at least {Config.FORECAST_MIN_MONTHS} completed months of "
+                    f"{label.lower()} history")
+            return
+        
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=forecast['forecast_months'] + forecast['forecast_months'][::-1],
+                                 y=forecast['upper'] + forecast['lower'][::-1], fill='toself',
+                                 line={'width': 0}, opacity=0.25, hoverinfo='skip',
+                                 name=f"{Config.FORECAST_INTERVAL:.0%} interval"))
+        fig.add_trace(go.Scatter(x=forecast['months'], y=forecast['history'], mode='lines', name=label))
+        fig.add_trace(go.Scatter(x=forecast['forecast_months'], y=forecast['forecast'], mode='lines',
+                                 line={'dash': 'dash'}, name="Forecast"))
+        fig.update_layout(title=title, xaxis_title="Month", yaxis_title=label)
+        if money:
+            fig.update_yaxes(tickformat='$,.0f')
+        st.plotly_chart(fig, use_container_width=True)
+        
+        score = forecast['backtest'].get(forecast['model'], {}).get('mape')
+        backtest = f", backtest MAPE {score:.1f}%" if score is not None and not math.isnan(score) else ""
+        st.caption(f"Model: {forecast['model'].replace('_', ' ')}{backtest}")
     
     def _render_analytics(self):
         """Render AI analytics and insights"""
         st.markdown("## AI Analytics & Insights")
         
-        dashboard_data = self.analytics_service.generate_dashboard_data()
-        insights = dashboard_data['insights']
+        insights = self.dashboard_publisher.latest().insights
         
         # AI Insights
         st.markdown("### AI-Powered Recommendations")
@@ -1647,106 +5812,77 @@ class SportAIApp:
         
         with col1:
             st.markdown("#### Member Growth Prediction")
-            
-            # Generate prediction data
-            current_members = dashboard_data['summary']['total_members']
-            prediction_data = []
-            
-            for i in range(12):
-                growth_rate = 1.02 + (random.random() * 0.02)  # 2-4% monthly growth
-                predicted_members = current_members * (growth_rate ** (i + 1))
-                
-                prediction_data.append({
-                    'Month': f"Month {i + 1}",
-                    'Predicted Members': int(predicted_members)
-                })
-            
-            pred_df = pd.DataFrame(prediction_data)
-            
-            fig = px.line(
-                pred_df,
-                x='Month',
-                y='Predicted Members',
-                title="12-Month Member Growth Prediction"
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            self._render_forecast(self.forecast_engine.member_forecast(), "Members",
+                                  f"{Config.FORECAST_HORIZON_MONTHS}-Month Member Growth Prediction")
         
         with col2:
             st.markdown("#### Revenue Forecast")
-            
-            # Generate revenue forecast
-            current_revenue = dashboard_data['summary']['total_revenue']
-            forecast_data = []
-            
-            for i in range(12):
-                seasonal_factor = 1 + 0.1 * np.sin(2 * np.pi * i / 12)  # Seasonal variation
-                growth_factor = 1.05 + (random.random() * 0.03)  # 5-8% growth
-                
-                predicted_revenue = current_revenue * growth_factor * seasonal_factor
-                
-                forecast_data.append({
-                    'Month': f"Month {i + 1}",
-                    'Predicted Revenue': predicted_revenue
-                })
-            
-            forecast_df = pd.DataFrame(forecast_data)
-            
-            fig = px.line(
-                forecast_df,
-                x='Month',
-                y='Predicted Revenue',
-                title="12-Month Revenue Forecast"
-            )
-            fig.update_yaxis(tickformat='$,.0f')
-            st.plotly_chart(fig, use_container_width=True)
+            self._render_forecast(self.forecast_engine.revenue_forecast(), "Revenue",
+                                  f"{Config.FORECAST_HORIZON_MONTHS}-Month Revenue Forecast", money=True)
+        
+        facility_forecasts = self.forecast_engine.facility_revenue_forecasts()
+        if facility_forecasts:
+            with st.expander("Revenue forecast by facility"):
+                st.dataframe(pd.DataFrame([{
+                    'Facility': f['facility'],
+                    'Last Month': f['history'][-1],
+                    'Next Month': f['forecast'][0],
+                    f"Next {Config.FORECAST_HORIZON_MONTHS} Months": sum(f['forecast']),
+                    'Model': f['model'].replace('_', ' ').title(),
+                    'Backtest MAPE %': f['backtest'].get(f['model'], {}).get('mape')
+                } for f in facility_forecasts]), hide_index=True, use_container_width=True,
+                    column_config={
+                        'Last Month': st.column_config.NumberColumn(format="$%.0f"),
+                        'Next Month': st.column_config.NumberColumn(format="$%.0f"),
+                        f"Next {Config.FORECAST_HORIZON_MONTHS} Months": st.column_config.NumberColumn(format="$%.0f"),
+                        'Backtest MAPE %': st.column_config.NumberColumn(format="%.1f")
+                    })
         
         # Performance Metrics
         st.markdown("### Performance Metrics")
         
-        facilities = self.facility_service.get_all_facilities()
+        facilities, utilization = self.utilization_engine.snapshot()
         
         if facilities:
-            # Utilization heatmap
-            utilization_data = []
             days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
-            hours = list(range(6, 23))  # 6 AM to 10 PM
+            open_hour, close_hour = Config.OPERATING_HOURS
+            hours = [f"{hour:02d}:00" for hour in range(open_hour, close_hour)]
+            first, last = self.utilization_engine.current_window()
+            st.caption(f"Share of each hour booked, {first:%b %d} – {last:%b %d}")
             
-            for facility in facilities[:5]:  # Limit to first 5 facilities
-                for day in days:
-                    for hour in hours:
-                        # Simulate utilization patterns
-                        base_util = random.uniform(0.3, 0.9)
-                        
-                        # Peak hours (6-9 PM)
-                        if 18 <= hour <= 21:
-                            base_util *= 1.3
-                        # Weekend boost
-                        if day in ['Sat', 'Sun']:
-                            base_util *= 1.2
-                        
-                        utilization_data.append({
-                            'Facility': facility['name'],
-                            'Day': day,
-                            'Hour': f"{hour}:00",
-                            'Utilization': min(100, base_util * 100)
-                        })
+            # Day x hour heatmap for the whole site or any single facility
+            names = ["All facilities"] + [f['name'] for f in facilities]
+            selected = st.selectbox("Facility", range(len(names)), format_func=names.__getitem__,
+                                    key="utilization_facility")
+            week = utilization.mean(axis=0) if selected == 0 else utilization[selected - 1]
             
-            if utilization_data:
-                util_df = pd.DataFrame(utilization_data)
-                
-                # Show heatmap for first facility
-                first_facility = facilities[0]['name']
-                facility_data = util_df[util_df['Facility'] == first_facility]
-                
-                pivot_data = facility_data.pivot(index='Hour', columns='Day', values='Utilization')
-                
-                fig = px.imshow(
-                    pivot_data,
-                    title=f"Utilization Heatmap - {first_facility}",
-                    color_continuous_scale='RdYlBu_r',
-                    aspect='auto'
-                )
-                st.plotly_chart(fig, use_container_width=True)
+            fig = px.imshow(
+                week[:, open_hour:close_hour].T,
+                x=days,
+                y=hours,
+                labels={'x': 'Day', 'y': 'Hour', 'color': 'Utilization %'},
+                title=f"Utilization Heatmap - {names[selected]}",
+                color_continuous_scale='RdYlBu_r',
+                zmin=0,
+                zmax=100,
+                aspect='auto'
+            )
+            st.plotly_chart(fig, use_container_width=True)
+            
+            # Every facility against every operating hour of the week
+            fig = px.imshow(
+                utilization[:, :, open_hour:close_hour].reshape(len(facilities), -1),
+                x=[f"{day} {hour}" for day in days for hour in hours],
+                y=[f['name'] for f in facilities],
+                labels={'x': 'Hour of week', 'y': 'Facility', 'color': 'Utilization %'},
+                title="Utilization by Facility and Hour of Week",
+                color_continuous_scale='RdYlBu_r',
+                zmin=0,
+                zmax=100,
+                aspect='auto',
+                height=max(400, 22 * len(facilities))
+            )
+            st.plotly_chart(fig, use_container_width=True)
     
     def _render_settings(self):
         """Render settings and configuration"""
@@ -1812,6 +5948,26 @@ class SportAIApp:
             
             if st.button("Save Configuration"):
                 st.success("Configuration saved successfully!")
+            
+            with st.expander("📈 Performance Diagnostics"):
+                st.markdown("**Previous page render (request memo)**")
+                st.json(st.session_state.get('request_memo_stats', {}))
+                st.markdown("**Connection pool**")
+                st.json(self.db.pool_stats())
+                st.markdown("**Query result cache**")
+                st.json(self.db.cache_stats())
+                st.markdown("**Background tasks**")
+                st.json([task.stats() for task in self.services.tasks])
+                st.markdown("**Dashboard snapshot**")
+                st.json(self.dashboard_publisher.stats())
+                st.markdown("**Dashboard trend cache**")
+                st.json(self.services.trend_engine.stats())
+                st.markdown("**Forecast models**")
+                st.json(self.forecast_engine.stats())
+                st.markdown("**Insight rules**")
+                insight_engine = self.analytics_service.insight_engine
+                st.json(insight_engine.stats())
+                st.dataframe(pd.DataFrame(insight_engine.rule_timings()), hide_index=True, use_container_width=True)
         
         with tab3:
             st.markdown("### Subscription Management")
@@ -1849,10 +6005,1067 @@ class SportAIApp:
                             if st.button(f"Upgrade to {tier_data['name']}", key=f"upgrade_{tier_key}"):
                                 st.success(f"Upgrade to {tier_data['name']} plan initiated!")
 
+# =============================================================================
+# BENCHMARKS AND DIAGNOSTICS
+# =============================================================================
+
+def _concurrency_worker(db_path: str, profile: str, role: str, operations: int, busy_retries: int,
+                        barrier) -> Dict:
+    """Run one benchmark worker process against a shared database file"""
+    db = DatabaseManager(db_path, pragma_profile=profile, busy_retries=busy_retries)
+    failures = 0
+    barrier.wait()  # Start every worker together, after process spawn and imports
+    start = time.time()
+    
+    for i in range(operations):
+        if role == 'writer':
+            ok = db.execute_update('''
+                INSERT INTO revenue_records (date, source, amount, description)
+                VALUES (date('now'), ?, ?, ?)
+            ''', ("Benchmark", 10.0 + i % 50, f"bench-{i}"))
+        else:
+            ok = bool(db.execute_query(
+                "SELECT COUNT(*) AS n, SUM(amount) AS total FROM revenue_records WHERE date >= date('now', '-30 days')"
+            ))
+        if not ok:
+            failures += 1
+    
+    return {
+        'role': role,
+        'operations': operations,
+        'failures': failures,
+        'started': start,
+        'finished': time.time(),
+        'busy_retries': db.pool_stats()['busy_retries']
+    }
+
+@contextmanager
+def temporary_database():
+    """Fresh migrated database in a temporary directory, closed and removed afterwards"""
+    import tempfile
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(str(Path(tmp) / "bench.db"))
+        try:
+            yield db
+        finally:
+            db.close()
+
+NAME_SYLLABLES = ("ka ri mo na lu shi ta ve jo an el ro mi sa de lo be ha ni co "
+                  "ga fi pu tu wen dor lin mar bel son").split()
+
+def _synthetic_names(rng: random.Random, count: int):
+    """Yield (first, last) names with a realistic spread of shared prefixes"""
+    for _ in range(count):
+        first = ''.join(rng.choice(NAME_SYLLABLES) for _ in range(2)).capitalize()
+        last = ''.join(rng.choice(NAME_SYLLABLES) for _ in range(3)).capitalize()
+        yield first, last
+
+def seed_benchmark_data(db: DatabaseManager, members: int = 100_000, revenue_records: int = 200_000,
+                        bookings: int = 100_000, audit_logs: int = 100_000, events: int = 5_000,
+                        facilities: int = 0):
+    """Bulk-load a large synthetic dataset for benchmarks and query-plan audits"""
+    rng = random.Random(42)
+    tiers = ['Basic', 'Premium', 'Elite']
+    sources = ["Facility Rental", "Equipment Rental", "Membership Fees", "Event Registration", "Concessions"]
+    today = datetime.now().date()
+    
+    if facilities:
+        with db.get_connection() as conn:
+            conn.executemany('''
+                INSERT INTO facilities (name, type, capacity, hourly_rate, utilization, revenue, status, location)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                (f"Facility {i}", rng.choice(["Indoor Court", "Tennis Court", "Soccer Field", "Gym"]),
+                 rng.randrange(10, 500), float(rng.randrange(40, 400)), round(rng.uniform(20, 100), 1),
+                 round(rng.uniform(0, 50000), 2), 'active' if rng.random() < 0.95 else 'inactive', "Campus")
+                for i in range(facilities)
+            ))
+    
+    facility_ids = [row['id'] for row in db.execute_query("SELECT id FROM facilities")] or [1]
+    
+    with db.get_connection() as conn:
+        conn.executemany('''
+            INSERT INTO members (member_id, name, email, phone, tier, join_date, total_spent, status)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            (f"B{i:07d}", f"{first} {last}", f"{first.lower()}.{last.lower()}{i}@example.com",
+             f"555-{rng.randrange(10**7):07d}", rng.choice(tiers),
+             (today - timedelta(days=rng.randrange(1500))).isoformat(),
+             round(rng.uniform(0, 5000), 2), 'active' if rng.random() < 0.9 else 'inactive')
+            for i, (first, last) in enumerate(_synthetic_names(rng, members))
+        ))
+        
+        conn.executemany('''
+            INSERT INTO revenue_records (date, source, amount, facility_id, description)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (
+            ((today - timedelta(days=rng.randrange(730))).isoformat(), rng.choice(sources),
+             round(rng.uniform(5, 500), 2), rng.choice(facility_ids), "benchmark")
+            for _ in range(revenue_records)
+        ))
+        RevenueService.rebuild_rollups(conn)
+        
+        conn.executemany('''
+            INSERT INTO bookings (member_id, facility_id, booking_date, start_time, end_time, total_cost, status)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            (rng.randrange(1, members + 1), rng.choice(facility_ids),
+             (today + timedelta(days=rng.randrange(-365, 60))).isoformat(),
+             f"{hour:02d}:00", f"{hour + 1:02d}:00", 100.0, 'confirmed')
+            for hour in (rng.randrange(6, 22) for _ in range(bookings))
+        ))
+        
+        conn.executemany('''
+            INSERT INTO audit_logs (user_id, action, table_name, record_id, created_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (
+            (1, 'update', 'members', rng.randrange(1, members + 1),
+             (datetime.now() - timedelta(minutes=rng.randrange(525600))).isoformat(sep=' ', timespec='seconds'))
+            for _ in range(audit_logs)
+        ))
+        
+        conn.executemany('''
+            INSERT INTO events (name, event_type, start_date, end_date, facility_id, capacity, registered, price)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            (f"Event {i}", rng.choice(['Tournament', 'Camp', 'Program']), start.isoformat(),
+             (start + timedelta(days=rng.randrange(3))).isoformat(), rng.choice(facility_ids),
+             100, rng.randrange(100), 25.0)
+            for i, start in ((i, today + timedelta(days=rng.randrange(-365, 365))) for i in range(events))
+        ))
+        
+        conn.execute("ANALYZE")
+
+# Arguments used to exercise service methods that have required parameters
+AUDIT_SAMPLE_ARGS = {
+    'get_facility_by_id': (1,),
+    'create_facility': ({'name': 'Audit Court', 'type': 'Indoor Court', 'capacity': 10, 'hourly_rate': 50.0},),
+    'update_facility': (1, {'name': 'Audit Court', 'type': 'Indoor Court', 'capacity': 10, 'hourly_rate': 50.0}),
+    'get_member_by_id': ('M001',),
+    'create_member': ({'member_id': 'AUDIT1', 'name': 'Audit Member', 'email': 'audit@example.com'},),
+    'update_member_spending': ('M001', 10.0),
+    'register_for_event': (1, 1),
+    'cancel_registration': (1, 1),
+    'get_event_registrations': (1,),
+    'record_revenue': ("Facility Rental", 100.0, 1, "audit"),
+}
+
+def _plan_findings(plan: List[str]) -> Dict:
+    """Classify EXPLAIN QUERY PLAN lines into full scans, index scans and temp sorts"""
+    full_scans, index_scans = [], []
+    
+    for detail in plan:
+        if detail.startswith('SCAN ') and 'CONSTANT ROW' not in detail:
+            table = detail.split()[1]
+            (index_scans if ' USING ' in detail else full_scans).append(table)
+    
+    return {
+        'full_scans': full_scans,
+        'index_scans': index_scans,
+        'temp_btree': any('USE TEMP B-TREE' in detail for detail in plan)
+    }
+
+def audit_query_plans(members: int = 100_000, revenue_records: int = 200_000,
+                      bookings: int = 100_000, audit_logs: int = 100_000) -> List[Dict]:
+    """EXPLAIN every SQL statement the core services issue against a seeded large dataset"""
+    import inspect
+    import tempfile
+    
+    report = []
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(str(Path(tmp) / "audit.db"))
+        seed_benchmark_data(db, members, revenue_records, bookings, audit_logs)
+        
+        services = [FacilityService(db), MemberService(db), EventService(db),
+                    RevenueService(db), AnalyticsService(db)]
+        
+        for service in services:
+            for name, method in inspect.getmembers(service, inspect.ismethod):
+                if name.startswith('_'):
+                    continue
+                
+                required = [p for p in inspect.signature(method).parameters.values()
+                            if p.default is p.empty and p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)]
+                if required and name not in AUDIT_SAMPLE_ARGS:
+                    report.append({'service': type(service).__name__, 'method': name, 'skipped': True})
+                    continue
+                
+                with db.trace_queries() as trace:
+                    result = method(*AUDIT_SAMPLE_ARGS.get(name, ()))
+                    if inspect.isgenerator(result):
+                        for _ in result:
+                            pass
+                
+                seen = set()
+                for sql, params in trace:
+                    if sql in seen:
+                        continue
+                    seen.add(sql)
+                    plan = db.explain(sql, params)
+                    report.append({
+                        'service': type(service).__name__,
+                        'method': name,
+                        'sql': ' '.join(sql.split()),
+                        'plan': plan,
+                        **_plan_findings(plan)
+                    })
+        
+        db.close()
+    
+    return report
+
+def _legacy_facility_utilization_stats(db: DatabaseManager) -> Dict:
+    """Pre-aggregation implementation: fetch every facility row and reduce in Python"""
+    facilities = db.execute_query("SELECT * FROM facilities ORDER BY name")
+    if not facilities:
+        return {}
+    
+    return {
+        'total_facilities': len(facilities),
+        'active_facilities': len([f for f in facilities if f['status'] == 'active']),
+        'average_utilization': round(sum(f['utilization'] for f in facilities) / len(facilities), 2),
+        'total_capacity': sum(f['capacity'] for f in facilities),
+        'total_revenue': sum(f['revenue'] for f in facilities),
+        'high_utilization_count': len([f for f in facilities if f['utilization'] > 85]),
+        'low_utilization_count': len([f for f in facilities if f['utilization'] < 60])
+    }
+
+def _legacy_member_statistics(db: DatabaseManager) -> Dict:
+    """Pre-aggregation implementation: fetch every member row and reduce in Python"""
+    members = db.execute_query("SELECT * FROM members ORDER BY name")
+    if not members:
+        return {}
+    
+    tier_counts = {}
+    total_spending = 0
+    for member in members:
+        tier_counts[member['tier']] = tier_counts.get(member['tier'], 0) + 1
+        total_spending += member['total_spent']
+    
+    return {
+        'total_members': len(members),
+        'active_members': len([m for m in members if m['status'] == 'active']),
+        'tier_distribution': tier_counts,
+        'total_spending': round(total_spending, 2),
+        'average_spending': round(total_spending / len(members), 2),
+        'premium_members': tier_counts.get('Premium', 0) + tier_counts.get('Elite', 0)
+    }
+
+def _same_stats(a: Dict, b: Dict) -> bool:
+    """Compare stats dicts, allowing float summation-order differences"""
+    import math
+    
+    if a.keys() != b.keys():
+        return False
+    return all(
+        math.isclose(a[k], b[k], rel_tol=1e-9, abs_tol=0.01) if isinstance(a[k], float) else a[k] == b[k]
+        for k in a
+    )
+
+def benchmark_aggregations(sizes: tuple = (1_000, 100_000, 1_000_000), repeats: int = 3) -> Dict:
+    """Compare Python-side and SQL-side facility/member statistics at several table sizes"""
+    results = {}
+    
+    for size in sizes:
+        with temporary_database() as db:
+            seed_benchmark_data(db, members=size, revenue_records=0, bookings=0, audit_logs=0,
+                                events=0, facilities=size)
+            facility_service = FacilityService(db)
+            member_service = MemberService(db)
+            
+            cases = {
+                'facility_utilization_stats': (lambda: _legacy_facility_utilization_stats(db),
+                                               facility_service.get_facility_utilization_stats),
+                'member_statistics': (lambda: _legacy_member_statistics(db),
+                                      member_service.get_member_statistics)
+            }
+            
+            size_results = {}
+            for name, (legacy, aggregated) in cases.items():
+                timings = {}
+                outputs = {}
+                for label, func in (('python', legacy), ('sql', aggregated)):
+                    best = float('inf')
+                    for _ in range(repeats):
+                        db.cache.clear()  # Measure the query itself, not the result cache
+                        start = time.perf_counter()
+                        outputs[label] = func()
+                        best = min(best, time.perf_counter() - start)
+                    timings[label] = best
+                
+                size_results[name] = {
+                    'python_ms': round(timings['python'] * 1000, 2),
+                    'sql_ms': round(timings['sql'] * 1000, 2),
+                    'speedup': round(timings['python'] / timings['sql'], 1) if timings['sql'] else None,
+                    'results_match': _same_stats(outputs['python'], outputs['sql'])
+                }
+            results[size] = size_results
+    
+    return results
+
+def benchmark_streaming(sizes: tuple = (10_000, 100_000, 500_000),
+                        batch_size: int = Config.DB_FETCH_BATCH_SIZE) -> Dict:
+    """Compare peak traced memory of execute_query and iter_query scans over revenue_records"""
+    import tracemalloc
+    
+    query = "SELECT * FROM revenue_records ORDER BY id"
+    results = {}
+    
+    for size in sizes:
+        with temporary_database() as db:
+            seed_benchmark_data(db, members=0, revenue_records=size, bookings=0, audit_logs=0, events=0)
+            
+            size_results = {}
+            for label, scan in (('fetchall', lambda: db.execute_query(query)),
+                                ('streaming', lambda: db.iter_query(query, batch_size=batch_size))):
+                tracemalloc.start()
+                start = time.perf_counter()
+                total = 0.0
+                rows = 0
+                for row in scan():
+                    total += row['amount']
+                    rows += 1
+                elapsed = time.perf_counter() - start
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                size_results[label] = {
+                    'rows': rows,
+                    'peak_kb': round(peak / 1024, 1),
+                    'seconds': round(elapsed, 3)
+                }
+            results[size] = size_results
+    
+    return results
+
+def benchmark_member_search(members: int = 1_000_000, queries: int = 500) -> Dict:
+    """Latency percentiles of MemberService.search_members for search-as-you-type input"""
+    with temporary_database() as db:
+        start = time.perf_counter()
+        seed_benchmark_data(db, members=members, revenue_records=0, bookings=0, audit_logs=0, events=0)
+        seed_seconds = time.perf_counter() - start
+        service = MemberService(db)
+        
+        rng = random.Random(7)
+        samples = db.execute_query(
+            "SELECT member_id, name, email, phone FROM members WHERE id IN (%s)"
+            % ','.join(str(rng.randrange(1, members + 1)) for _ in range(queries))
+        )
+        
+        # Every prefix a user would type on the way to each sample's name, ID, email or phone
+        workload = []
+        for sample in samples:
+            first, last = sample['name'].split(' ', 1)
+            workload += [('name', first[:k]) for k in range(1, len(first) + 1)]
+            workload += [('name', f"{first} {last[:k]}") for k in range(1, len(last) + 1)]
+            workload += [('member_id', sample['member_id'][:k]) for k in (2, 4, 6, 8)]
+            workload += [('email', sample['email'][:k]) for k in (4, 8, 12)]
+            workload += [('phone', sample['phone'][:k]) for k in (3, 6, 11)]
+        
+        timings = {}
+        misses = 0
+        for kind, text in workload:
+            t0 = time.perf_counter()
+            results = service.search_members(text)
+            timings.setdefault(kind, []).append(time.perf_counter() - t0)
+            misses += not results
+    
+    def percentiles(values):
+        ms = np.array(values) * 1000
+        return {'p50_ms': round(float(np.percentile(ms, 50)), 2),
+                'p95_ms': round(float(np.percentile(ms, 95)), 2),
+                'p99_ms': round(float(np.percentile(ms, 99)), 2),
+                'max_ms': round(float(ms.max()), 2)}
+    
+    overall = percentiles([t for values in timings.values() for t in values])
+    return {
+        'members': members,
+        'searches': len(workload),
+        'empty_results': misses,
+        'fts5': service.search_enabled,
+        'seed_seconds': round(seed_seconds, 1),
+        'overall': overall,
+        'by_kind': {kind: percentiles(values) for kind, values in timings.items()},
+        'p95_under_20ms': overall['p95_ms'] < 20
+    }
+
+def benchmark_bookings(facilities: int = 20, attempts: int = 5_000, checks: int = 20_000) -> Dict:
+    """Booking throughput and conflict-check latency of the in-memory index against SQL"""
+    with temporary_database() as db:
+        seed_benchmark_data(db, members=1_000, revenue_records=0, bookings=0, audit_logs=0, events=0,
+                            facilities=facilities)
+        service = BookingService(db)
+        service.rebuild_index()
+        facility_ids = [row['id'] for row in db.execute_query("SELECT id FROM facilities WHERE status = 'active'")]
+        today = datetime.now().date().isoformat()
+        rng = random.Random(11)
+        
+        def random_slot():
+            start = rng.randrange(6 * 4, 22 * 4) * 15
+            return minutes_to_time(start), minutes_to_time(start + rng.choice((30, 60, 90, 120)))
+        
+        start = time.perf_counter()
+        created = sum(
+            service.create_booking(rng.randrange(1, 1_001), rng.choice(facility_ids), today, *random_slot())
+            is not None
+            for _ in range(attempts)
+        )
+        create_seconds = time.perf_counter() - start
+        
+        probes = [(rng.choice(facility_ids), *random_slot()) for _ in range(checks)]
+        
+        start = time.perf_counter()
+        indexed = [service.find_conflict(f, today, s, e) is not None for f, s, e in probes]
+        index_seconds = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        scanned = [bool(db.execute_query('''
+            SELECT 1 FROM bookings
+            WHERE facility_id = ? AND booking_date = ? AND status != 'cancelled'
+              AND start_time < ? AND end_time > ?
+            LIMIT 1
+        ''', (f, today, e, s))) for f, s, e in probes]
+        sql_seconds = time.perf_counter() - start
+        
+        overlaps = db.execute_query('''
+            SELECT COUNT(*) AS n FROM bookings a JOIN bookings b
+              ON a.facility_id = b.facility_id AND a.booking_date = b.booking_date AND a.id < b.id
+             AND a.start_time < b.end_time AND b.start_time < a.end_time
+        ''')[0]['n']
+    
+    return {
+        'attempts': attempts,
+        'created': created,
+        'rejected': attempts - created,
+        'bookings_per_second': round(attempts / create_seconds, 1),
+        'index_check_us': round(index_seconds / checks * 1e6, 2),
+        'sql_check_us': round(sql_seconds / checks * 1e6, 2),
+        'checks_agree': indexed == scanned,
+        'overlapping_pairs': overlaps
+    }
+
+def benchmark_availability(facilities: int = 300, days: int = 31, repeats: int = 20) -> Dict:
+    """Latency of find_available_slots across every facility and a date range of busy days"""
+    with temporary_database() as db:
+        seed_benchmark_data(db, members=100, revenue_records=0, bookings=0, audit_logs=0, events=0,
+                            facilities=facilities)
+        service = BookingService(db)
+        facility_ids = [row['id'] for row in db.execute_query("SELECT id FROM facilities WHERE status = 'active'")]
+        today = datetime.now().date()
+        rng = random.Random(13)
+        
+        # Back-to-back bookings with random gaps from 06:00 to 22:00 on every facility-day
+        rows = []
+        for facility_id in facility_ids:
+            for offset in range(days):
+                day = (today + timedelta(days=offset)).isoformat()
+                minute = 6 * 60
+                while minute < 22 * 60:
+                    minute += rng.choice((0, 15, 30, 60, 120))
+                    length = rng.choice((45, 60, 90))
+                    rows.append((1, facility_id, day, minutes_to_time(minute),
+                                 minutes_to_time(minute + length), 0.0))
+                    minute += length
+        with db.get_connection() as conn:
+            conn.executemany('''
+                INSERT INTO bookings (member_id, facility_id, booking_date, start_time, end_time, total_cost)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', rows)
+        service.rebuild_index()
+        
+        last_day = (today + timedelta(days=days - 1)).isoformat()
+        query = (today.isoformat(), last_day, "18:00", "21:00", 20, 60)
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            results = service.find_available_slots(*query)
+            timings.append(time.perf_counter() - start)
+        
+        everything = service.find_available_slots(*query, limit=facilities * days)
+        conflicts = sum(service.find_conflict(r['facility_id'], r['date'], *free) is not None
+                        for r in everything for free in r['free_ranges'])
+    
+    ms = np.array(timings) * 1000
+    return {
+        'facilities': len(facility_ids),
+        'days': days,
+        'bookings': len(rows),
+        'matching_facility_days': len(everything),
+        'returned': len(results),
+        'median_ms': round(float(np.median(ms)), 2),
+        'max_ms': round(float(ms.max()), 2),
+        'free_ranges_with_conflicts': conflicts
+    }
+
+def _legacy_revenue_summary(db: DatabaseManager, days: int) -> Dict:
+    """Pre-rollup summary: fetch every record in the window and sum in Python"""
+    start = (datetime.now().date() - timedelta(days=days)).isoformat()
+    records = db.execute_query("SELECT * FROM revenue_records WHERE date >= ? ORDER BY date DESC", (start,))
+    total_revenue = sum(r['amount'] for r in records)
+    return {'total_revenue': total_revenue, 'transaction_count': len(records)}
+
+def benchmark_dashboard(sizes: tuple = (10_000, 100_000, 500_000), reads: int = 1_000) -> Dict:
+    """Dashboard data cost when built per render vs read from the published snapshot, by data size"""
+    results = {}
+    for size in sizes:
+        with temporary_database() as db:
+            seed_benchmark_data(db, members=size, revenue_records=size, bookings=size // 2, audit_logs=0,
+                                events=max(size // 100, 10))
+            booking_service = BookingService(db)
+            analytics = AnalyticsService(db, utilization_engine=UtilizationEngine(db, booking_service))
+            publisher = DashboardPublisher(db, analytics, interval=3600)
+            
+            start = time.perf_counter()
+            publisher.refresh()
+            build_ms = (time.perf_counter() - start) * 1000
+            
+            start = time.perf_counter()
+            for _ in range(reads):
+                publisher.latest()
+            read_us = (time.perf_counter() - start) / reads * 1e6
+            
+            # A write wakes the background task; time until the new snapshot is published
+            publisher.task.start()
+            try:
+                published = publisher.published
+                start = time.perf_counter()
+                RevenueService(db).record_revenue("Concessions", 25.0)
+                while publisher.published == published and time.perf_counter() - start < 30:
+                    time.sleep(0.001)
+                publish_ms = (time.perf_counter() - start) * 1000
+                current = publisher.is_current(publisher.latest())
+            finally:
+                publisher.task.stop()
+            
+            results[size] = {
+                'build_ms': round(build_ms, 1),
+                'snapshot_read_us': round(read_us, 3),
+                'write_to_publish_ms': round(publish_ms, 1),
+                'current_after_write': current
+            }
+    return results
+
+def benchmark_forecasting(facilities: int = 300, months: int = 48, records_per_month: int = 4) -> Dict:
+    """Fit every facility's monthly revenue series end to end and score it on the following year"""
+    horizon = Config.FORECAST_HORIZON_MONTHS
+    rng = np.random.default_rng(23)
+    steps = np.arange(months + horizon)
+    # Trend, yearly season and noise per facility; the last `horizon` months are held back as actuals
+    base = rng.uniform(2_000, 20_000, (facilities, 1))
+    growth = rng.uniform(-0.002, 0.02, (facilities, 1))
+    season = 1 + rng.uniform(0, 0.3, (facilities, 1)) * np.sin(2 * np.pi * (steps + rng.integers(0, 12, (facilities, 1))) / 12)
+    revenue = base * (1 + growth) ** steps * season * rng.normal(1, 0.03, (facilities, months + horizon))
+    history, actual = revenue[:, :months], revenue[:, months:]
+    
+    with temporary_database() as db:
+        seed_benchmark_data(db, members=0, revenue_records=0, bookings=0, audit_logs=0, events=0,
+                            facilities=facilities)
+        facility_ids = [row['id'] for row in db.execute_query("SELECT id FROM facilities ORDER BY id")][-facilities:]
+        current = datetime.now().date().replace(day=1)
+        with db.get_connection() as conn:
+            conn.executemany('''
+                INSERT INTO revenue_records (date, source, amount, facility_id, description)
+                VALUES (?, 'Facility Rental', ?, ?, 'benchmark')
+            ''', (
+                (ForecastEngine._shift_month(current, month - months).replace(day=1 + part * 7).isoformat(),
+                 float(history[row, month]) / records_per_month, facility_id)
+                for row, facility_id in enumerate(facility_ids)
+                for month in range(months)
+                for part in range(records_per_month)
+            ))
+            RevenueService.rebuild_rollups(conn)
+        
+        engine = ForecastEngine(db, history_months=months)
+        start = time.perf_counter()
+        forecasts = engine.facility_revenue_forecasts()
+        cold_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        engine.facility_revenue_forecasts()
+        warm_ms = (time.perf_counter() - start) * 1000
+        
+        start = time.perf_counter()
+        fit = fit_forecasts(history, horizon)
+        fit_ms = (time.perf_counter() - start) * 1000
+    
+    by_id = {f['facility_id']: f for f in forecasts}
+    predicted = np.array([by_id[facility_id]['forecast'] for facility_id in facility_ids])
+    lower = np.array([by_id[facility_id]['lower'] for facility_id in facility_ids])
+    upper = np.array([by_id[facility_id]['upper'] for facility_id in facility_ids])
+    models = [by_id[facility_id]['model'] for facility_id in facility_ids]
+    return {
+        'series': facilities,
+        'history_months': months,
+        'fit_ms': round(fit_ms, 1),
+        'end_to_end_ms': round(cold_ms, 1),
+        'cached_ms': round(warm_ms, 3),
+        'models_chosen': {name: models.count(name) for name in FORECAST_MODELS},
+        'backtest_mape': {name: round(float(np.nanmean(scores['mape'])), 2) for name, scores in fit['backtest'].items()},
+        'holdout_year_mape': round(float(np.mean(np.abs(predicted - actual) / actual)) * 100, 2),
+        'interval_coverage': round(float(((actual >= lower) & (actual <= upper)).mean()), 3),
+        'under_one_second': cold_ms < 1000
+    }
+
+def benchmark_revenue(records: int = 500_000, windows: tuple = (7, 30, 90, 365), repeats: int = 5,
+                      writes: int = 2_000) -> Dict:
+    """Compare summary latency of the raw-record scan and the rollups, and check both agree"""
+    results = {'records': records, 'windows': {}}
+    with temporary_database() as db:
+        seed_benchmark_data(db, members=0, revenue_records=records, bookings=0, audit_logs=0, events=0)
+        service = RevenueService(db)
+        
+        start = time.perf_counter()
+        db.transaction(RevenueService.rebuild_rollups)
+        results['rebuild_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        
+        for days in windows:
+            timings = {'legacy': [], 'rollup': []}
+            for _ in range(repeats):
+                start = time.perf_counter()
+                legacy = _legacy_revenue_summary(db, days)
+                timings['legacy'].append(time.perf_counter() - start)
+                start = time.perf_counter()
+                summary = service.get_revenue_summary(days)
+                timings['rollup'].append(time.perf_counter() - start)
+            
+            results['windows'][days] = {
+                'legacy_median_ms': round(float(np.median(timings['legacy'])) * 1000, 2),
+                'rollup_median_ms': round(float(np.median(timings['rollup'])) * 1000, 2),
+                'transactions': summary['transaction_count'],
+                'totals_agree': (summary['transaction_count'] == legacy['transaction_count']
+                                 and math.isclose(summary['total_revenue'], legacy['total_revenue'], rel_tol=1e-9))
+            }
+        
+        facility_ids = [row['id'] for row in db.execute_query("SELECT id FROM facilities")]
+        rng = random.Random(7)
+        start = time.perf_counter()
+        for i in range(writes):
+            service.record_revenue("Concessions", round(rng.uniform(5, 50), 2), rng.choice(facility_ids + [None]))
+        results['record_ms'] = round((time.perf_counter() - start) / writes * 1000, 3)
+        
+        # Incremental upkeep must leave the rollups exactly where a full rebuild puts them
+        queries = [f"SELECT * FROM {table} ORDER BY {column}, source, facility_id"
+                   for table, column, _ in RevenueService.ROLLUPS.values()]
+        before = [db.execute_query(query) for query in queries]
+        db.transaction(RevenueService.rebuild_rollups)
+        after = [db.execute_query(query) for query in queries]
+        results['rollups_consistent'] = all(
+            len(old) == len(new) and all(
+                a['transactions'] == b['transactions'] and math.isclose(a['amount'], b['amount'], rel_tol=1e-9)
+                for a, b in zip(old, new))
+            for old, new in zip(before, after)
+        )
+    return results
+
+def _legacy_check_out(db: DatabaseManager, equipment_id: int, member_id: Optional[int],
+                      quantity: int = 1) -> Optional[int]:
+    """Pre-atomic read-then-write rental, kept to demonstrate the lost-update race"""
+    equipment = db.execute_query("SELECT * FROM equipment WHERE id = ?", (equipment_id,))
+    if not equipment or equipment[0]['available'] < quantity:
+        return None
+    current = equipment[0]
+    if not db.execute_update(
+        "UPDATE equipment SET available = ?, rented = ? WHERE id = ?",
+        (current['available'] - quantity, current['rented'] + quantity, equipment_id)
+    ):
+        return None
+    now = datetime.now()
+    return db.transaction(lambda conn: conn.execute('''
+        INSERT INTO rentals (equipment_id, member_id, quantity, daily_rate, rented_at, due_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', (equipment_id, member_id, quantity, current['daily_rate'],
+          now.strftime(EquipmentService.TIME_FORMAT),
+          (now + timedelta(days=Config.RENTAL_DEFAULT_DAYS)).strftime(EquipmentService.TIME_FORMAT))).lastrowid)
+
+def _legacy_check_in(db: DatabaseManager, rental_id: int) -> bool:
+    """Pre-atomic read-then-write return, kept to demonstrate the lost-update race"""
+    rental = db.execute_query("SELECT equipment_id, quantity FROM rentals WHERE id = ? AND returned_at IS NULL",
+                              (rental_id,))
+    if not rental:
+        return False
+    equipment_id, quantity = rental[0]['equipment_id'], rental[0]['quantity']
+    equipment = db.execute_query("SELECT * FROM equipment WHERE id = ?", (equipment_id,))
+    if not equipment or equipment[0]['rented'] < quantity:
+        return False
+    current = equipment[0]
+    return db.execute_update(
+        "UPDATE equipment SET available = ?, rented = ? WHERE id = ?",
+        (current['available'] + quantity, current['rented'] - quantity, equipment_id)
+    ) and db.execute_update(
+        "UPDATE rentals SET returned_at = ?, charge = 0 WHERE id = ?",
+        (datetime.now().strftime(EquipmentService.TIME_FORMAT), rental_id)
+    )
+
+def _check_fixtures(db: DatabaseManager, plan: Dict, rest_minutes: int) -> Dict:
+    """Verify a booked plan: no facility overlaps, operating hours, team rest and bracket order"""
+    def minute_of(game: Dict, key: str) -> int:
+        return datetime.fromisoformat(game['booking_date']).toordinal() * 1440 + time_to_minutes(game[key])
+    
+    games = [g for g in plan['games'] if g['booking_date']]
+    open_minute, close_minute = (hour * 60 for hour in Config.OPERATING_HOURS)
+    within_hours = all(open_minute <= time_to_minutes(g['start_time']) and time_to_minutes(g['end_time']) <= close_minute
+                       for g in games)
+    
+    # Rest applies between consecutive games of a team, and between a bracket game and its feeders
+    by_number = {g['game_number']: g for g in games}
+    appearances: Dict[str, List[Dict]] = {}
+    rest_ok = True
+    for game in games:
+        for side in (game['home'], game['away']):
+            feeder = by_number.get(int(side[1:])) if side[:1] == 'W' and side[1:].isdigit() else None
+            if feeder is not None:
+                rest_ok &= minute_of(feeder, 'end_time') + rest_minutes <= minute_of(game, 'start_time')
+            else:
+                appearances.setdefault(side, []).append(game)
+    for played in appearances.values():
+        played.sort(key=lambda g: minute_of(g, 'start_time'))
+        rest_ok &= all(minute_of(a, 'end_time') + rest_minutes <= minute_of(b, 'start_time')
+                       for a, b in zip(played, played[1:]))
+    
+    overlaps = db.execute_query('''
+        SELECT COUNT(*) AS n FROM bookings a JOIN bookings b
+          ON a.facility_id = b.facility_id AND a.booking_date = b.booking_date AND a.id != b.id
+         AND a.status != 'cancelled' AND b.status != 'cancelled'
+         AND a.start_time < b.end_time AND b.start_time < a.end_time
+        WHERE a.event_id = ?
+    ''', (plan['event_id'],))[0]['n']
+    booked = db.execute_query("SELECT COUNT(*) AS n FROM tournament_games WHERE event_id = ?",
+                              (plan['event_id'],))[0]['n']
+    return {'within_hours': within_hours, 'rest_respected': bool(rest_ok), 'overlapping_bookings': overlaps,
+            'games_booked': booked}
+
+def benchmark_tournament(teams: int = 64, courts: int = 4, round_robin_teams: int = 16,
+                         round_robin_courts: int = 8, busy_bookings: int = 10) -> Dict:
+    """Schedule and book tournaments over a weekend around existing bookings, and check every constraint"""
+    results = {}
+    today = datetime.now().date()
+    saturday = today + timedelta(days=(5 - today.weekday()) % 7 or 7)
+    weekend = (saturday.isoformat(), (saturday + timedelta(days=1)).isoformat())
+    
+    with temporary_database() as db:
+        booking_service = BookingService(db)
+        scheduler = TournamentScheduler(db, booking_service)
+        rng = random.Random(20)
+        
+        for fixture_format, size, count in (('elimination', teams, courts),
+                                            ('round_robin', round_robin_teams, round_robin_courts)):
+            # Each tournament gets its own facility type, with member bookings to work around
+            with db.get_connection() as conn:
+                court_ids = [conn.execute('''
+                    INSERT INTO facilities (name, type, capacity, hourly_rate, status, location)
+                    VALUES (?, ?, 20, 60, 'active', 'Campus')
+                ''', (f"{fixture_format} court {i + 1:02d}", f"{fixture_format} court")).lastrowid
+                    for i in range(count)]
+                event_id = conn.execute('''
+                    INSERT INTO events (name, event_type, start_date, end_date, facility_id, capacity)
+                    VALUES (?, 'Tournament', ?, ?, ?, ?)
+                ''', (f"{size}-team {fixture_format}", *weekend, court_ids[0], size)).lastrowid
+            for _ in range(busy_bookings):
+                start = rng.randrange(6 * 4, 20 * 4) * 15
+                booking_service.create_booking(1, rng.choice(court_ids), rng.choice(weekend),
+                                               minutes_to_time(start), minutes_to_time(start + 60))
+            
+            start = time.perf_counter()
+            plan = scheduler.schedule(event_id, [f"Team {i + 1}" for i in range(size)], fixture_format)
+            seconds = time.perf_counter() - start
+            results[f"{fixture_format}_{size}"] = {
+                'courts': count,
+                'games': len(plan['games']),
+                'unscheduled': plan['unscheduled'],
+                'error': plan.get('error'),
+                'seconds': round(seconds, 3),
+                'placement_ms': plan['schedule_ms'],
+                'last_game': max((g['booking_date'], g['end_time']) for g in plan['games'] if g['booking_date'])
+                             if plan['games'] else None,
+                **_check_fixtures(db, plan, Config.TOURNAMENT_REST_MINUTES)
+            }
+    
+    return results
+
+def benchmark_event_registrations(registrations: int = 5_000, members: int = 4_000, capacity: int = 1_000,
+                                  clients: int = 200, arrival_seconds: float = 2.0) -> Dict:
+    """Burst of concurrent registrations (with repeat clicks) against one event, batched vs one per transaction"""
+    results = {}
+    
+    for mode, max_batch in (('batched', Config.REGISTRATION_BATCH_SIZE), ('unbatched', 1)):
+        with temporary_database() as db:
+            seed_benchmark_data(db, members=members, revenue_records=0, bookings=0, audit_logs=0, events=0)
+            with db.get_connection() as conn:
+                event_id = conn.execute('''
+                    INSERT INTO events (name, event_type, start_date, end_date, capacity, registered, price)
+                    VALUES ('Youth Soccer Camp', 'Camp', date('now', '+30 days'), date('now', '+35 days'), ?, 0, 150)
+                ''', (capacity,)).lastrowid
+            service = EventService(db)
+            service.registrations.max_batch = max_batch
+            
+            rng = random.Random(19)
+            requests = [rng.randrange(1, members + 1) for _ in range(registrations)]
+            arrivals = sorted(rng.uniform(0, arrival_seconds) for _ in range(registrations))
+            outcomes: List[Optional[Dict]] = [None] * registrations
+            latencies = [0.0] * registrations
+            start = time.perf_counter()
+            
+            def client(offset: int):
+                for index in range(offset, registrations, clients):
+                    delay = start + arrivals[index] - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    began = time.perf_counter()
+                    outcomes[index] = service.register_for_event(event_id, requests[index])
+                    latencies[index] = time.perf_counter() - began
+            
+            workers = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+            for thread in workers:
+                thread.start()
+            for thread in workers:
+                thread.join()
+            elapsed = time.perf_counter() - start
+            batches = service.registrations.stats()
+            
+            unique_members = len({outcome['member_id'] for outcome in outcomes})
+            counts = {row['status']: row['n'] for row in db.execute_query(
+                "SELECT status, COUNT(*) AS n FROM event_registrations WHERE event_id = ? GROUP BY status",
+                (event_id,))}
+            service.close()
+            
+            results[mode] = {
+                'requests': registrations,
+                'unique_members': unique_members,
+                'seconds': round(elapsed, 2),
+                'transactions': batches['batches'],
+                'average_batch': batches['average_batch'],
+                'latency_ms': {f'p{q}': round(float(np.percentile(latencies, q)) * 1000, 2) for q in (50, 95, 99)},
+                'registered': counts.get('registered', 0),
+                'waitlisted': counts.get('waitlisted', 0)
+            }
+    
+    return results
+
+def stress_equipment_rentals(threads: int = 16, operations: int = 300, stock: int = 20) -> Dict:
+    """Hammer a few items with concurrent check-outs, check-ins and batch check-outs; check inventory invariants"""
+    results = {}
+    
+    for mode in ('legacy', 'atomic'):
+        with temporary_database() as db:
+            service = EquipmentService(db)
+            with db.get_connection() as conn:
+                conn.execute("DELETE FROM rentals")
+                conn.execute("DELETE FROM equipment")
+                conn.executemany(
+                    "INSERT INTO equipment (name, category, available, rented, daily_rate) VALUES (?, 'Stress', ?, 0, 10)",
+                    [(f"Item {i}", stock) for i in range(3)]
+                )
+            item_ids = [row['id'] for row in db.execute_query("SELECT id FROM equipment")]
+            
+            if mode == 'legacy':
+                check_out = lambda item, quantity: _legacy_check_out(db, item, None, quantity)
+                check_in = lambda rental_id: _legacy_check_in(db, rental_id)
+                check_out_batch = lambda items: [check_out(item, quantity) for item, quantity in items.items()]
+            else:
+                check_out = lambda item, quantity: service.check_out(item, None, quantity)
+                check_in = lambda rental_id: service.check_in(rental_id) is not None
+                check_out_batch = lambda items: service.check_out_batch(items, None)
+            
+            failed_check_ins = []
+            low_water = []
+            barrier = threading.Barrier(threads)
+            
+            def worker(index: int):
+                rng = random.Random(index)
+                open_rentals = []  # Only this thread's rentals, so every check-in should succeed
+                barrier.wait()
+                for _ in range(operations):
+                    roll = rng.random()
+                    if roll < 0.45:
+                        rental_id = check_out(rng.choice(item_ids), rng.randint(1, 3))
+                        if rental_id is not None:
+                            open_rentals.append(rental_id)
+                    elif roll < 0.55:
+                        items = {i: rng.randint(1, 2) for i in rng.sample(item_ids, 2)}
+                        open_rentals.extend(r for r in check_out_batch(items) or [] if r is not None)
+                    elif open_rentals:
+                        rental_id = open_rentals.pop(rng.randrange(len(open_rentals)))
+                        if not check_in(rental_id):
+                            failed_check_ins.append(rental_id)
+                    low_water.append(min(row['available'] for row in
+                                         db.execute_query("SELECT available FROM equipment")))
+            
+            workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+            start = time.perf_counter()
+            for thread in workers:
+                thread.start()
+            for thread in workers:
+                thread.join()
+            elapsed = time.perf_counter() - start
+            
+            final = db.execute_query('''
+                SELECT e.id, e.available, e.rented, COALESCE(SUM(r.quantity), 0) AS open_quantity
+                FROM equipment e
+                LEFT JOIN rentals r ON r.equipment_id = e.id AND r.returned_at IS NULL
+                GROUP BY e.id
+            ''')
+            results[mode] = {
+                'operations': threads * operations,
+                'seconds': round(elapsed, 2),
+                'min_available_seen': min(low_water),
+                'failed_check_ins': len(failed_check_ins),
+                'never_negative': min(low_water) >= 0 and all(row['available'] >= 0 and row['rented'] >= 0
+                                                              for row in final),
+                'stock_conserved': all(row['available'] + row['rented'] == stock for row in final),
+                'rented_matches_ledger': all(row['rented'] == row['open_quantity'] for row in final)
+            }
+    
+    return results
+
+def benchmark_concurrency(writers: int = 8, readers: int = 4, operations: int = 200,
+                          profiles: tuple = ('default', 'concurrent'),
+                          busy_retries: int = Config.DB_BUSY_RETRIES) -> Dict:
+    """Measure read/write throughput with N concurrent writer processes per pragma profile"""
+    import multiprocessing
+    import tempfile
+    
+    results = {}
+    
+    for profile in profiles:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = str(Path(tmp) / "bench.db")
+            DatabaseManager(db_path, pragma_profile=profile).close()
+            
+            # Spawn so workers never inherit this process's pooled connections
+            context = multiprocessing.get_context('spawn')
+            with context.Manager() as manager:
+                barrier = manager.Barrier(writers + readers)
+                jobs = [(db_path, profile, 'writer', operations, busy_retries, barrier) for _ in range(writers)]
+                jobs += [(db_path, profile, 'reader', operations, busy_retries, barrier) for _ in range(readers)]
+                
+                with context.Pool(len(jobs)) as workers:
+                    outcomes = workers.starmap(_concurrency_worker, jobs)
+            
+            elapsed = max(o['finished'] for o in outcomes) - min(o['started'] for o in outcomes)
+        
+        summary = {'elapsed': round(elapsed, 3)}
+        for role in ('writer', 'reader'):
+            role_results = [o for o in outcomes if o['role'] == role]
+            completed = sum(o['operations'] - o['failures'] for o in role_results)
+            summary[f'{role}_ops_per_sec'] = round(completed / elapsed, 1) if elapsed > 0 else 0
+            summary[f'{role}_failures'] = sum(o['failures'] for o in role_results)
+            summary[f'{role}_busy_retries'] = sum(o['busy_retries'] for o in role_results)
+        results[profile] = summary
+    
+    return results
+
 # =============================================================================
 # MAIN APPLICATION ENTRY POINT
 # =============================================================================
 
+def run_cli(argv: List[str]) -> int:
+    """Command-line interface for benchmarks and maintenance tasks"""
+    parser = argparse.ArgumentParser(prog="sportai_complete.py", description=f"{Config.APP_NAME} CLI")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    bench = commands.add_parser("bench-concurrency", help="Read/write throughput under concurrent writers")
+    bench.add_argument("--writers", type=int, default=8)
+    bench.add_argument("--readers", type=int, default=4)
+    bench.add_argument("--operations", type=int, default=200)
+    bench.add_argument("--busy-retries", type=int, default=Config.DB_BUSY_RETRIES)
+    
+    audit = commands.add_parser("audit-queries", help="EXPLAIN QUERY PLAN for every service query")
+    audit.add_argument("--members", type=int, default=100_000)
+    audit.add_argument("--revenue-records", type=int, default=200_000)
+    
+    aggregates = commands.add_parser("bench-aggregates", help="Python vs SQL facility/member statistics")
+    aggregates.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    
+    streaming = commands.add_parser("bench-streaming", help="Peak memory of fetchall vs streamed scans")
+    streaming.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 500_000])
+    streaming.add_argument("--batch-size", type=int, default=Config.DB_FETCH_BATCH_SIZE)
+    
+    bookings = commands.add_parser("bench-bookings", help="Booking throughput and conflict-check latency")
+    bookings.add_argument("--facilities", type=int, default=20)
+    bookings.add_argument("--attempts", type=int, default=5_000)
+    
+    availability = commands.add_parser("bench-availability", help="Free-slot search latency")
+    availability.add_argument("--facilities", type=int, default=300)
+    availability.add_argument("--days", type=int, default=31)
+    
+    tournament = commands.add_parser("bench-tournament", help="Weekend tournament scheduling and booking")
+    tournament.add_argument("--teams", type=int, default=64)
+    tournament.add_argument("--courts", type=int, default=4)
+    
+    registrations = commands.add_parser("bench-registrations", help="Event registration burst with waitlist")
+    registrations.add_argument("--requests", type=int, default=5_000)
+    registrations.add_argument("--capacity", type=int, default=1_000)
+    registrations.add_argument("--clients", type=int, default=200)
+    
+    rentals = commands.add_parser("stress-rentals", help="Concurrent check-out/check-in inventory invariants")
+    rentals.add_argument("--threads", type=int, default=16)
+    rentals.add_argument("--operations", type=int, default=300)
+    
+    dashboard = commands.add_parser("bench-dashboard", help="Dashboard build vs snapshot read by data size")
+    dashboard.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 500_000])
+    
+    forecasting = commands.add_parser("bench-forecast", help="Fit and score every facility's revenue forecast")
+    forecasting.add_argument("--facilities", type=int, default=300)
+    forecasting.add_argument("--months", type=int, default=48)
+    
+    revenue = commands.add_parser("bench-revenue", help="Revenue summary latency over raw records vs rollups")
+    revenue.add_argument("--records", type=int, default=500_000)
+    
+    search = commands.add_parser("bench-search", help="Member search latency percentiles")
+    search.add_argument("--members", type=int, default=1_000_000)
+    search.add_argument("--queries", type=int, default=500)
+    
+    export = commands.add_parser("export-revenue", help="Stream all revenue records to a CSV file")
+    export.add_argument("output")
+    export.add_argument("--db-path", default=Config.DATABASE_PATH)
+    
+    args = parser.parse_args(argv)
+    
+    if args.command == "bench-concurrency":
+        result = benchmark_concurrency(args.writers, args.readers, args.operations,
+                                       busy_retries=args.busy_retries)
+    elif args.command == "audit-queries":
+        result = audit_query_plans(args.members, args.revenue_records)
+        flagged = [r for r in result if r.get('full_scans')]
+        print(f"{len(flagged)} of {len(result)} statements perform full table scans", file=sys.stderr)
+    elif args.command == "bench-aggregates":
+        result = benchmark_aggregations(tuple(args.sizes))
+    elif args.command == "bench-streaming":
+        result = benchmark_streaming(tuple(args.sizes), args.batch_size)
+    elif args.command == "bench-bookings":
+        result = benchmark_bookings(args.facilities, args.attempts)
+    elif args.command == "bench-availability":
+        result = benchmark_availability(args.facilities, args.days)
+    elif args.command == "bench-tournament":
+        result = benchmark_tournament(args.teams, args.courts)
+    elif args.command == "bench-registrations":
+        result = benchmark_event_registrations(args.requests, capacity=args.capacity, clients=args.clients)
+    elif args.command == "stress-rentals":
+        result = stress_equipment_rentals(args.threads, args.operations)
+    elif args.command == "bench-dashboard":
+        result = benchmark_dashboard(tuple(args.sizes))
+    elif args.command == "bench-forecast":
+        result = benchmark_forecasting(args.facilities, args.months)
+        if not result['under_one_second']:
+            print(json.dumps(result, indent=2, default=str))
+            return 1
+    elif args.command == "bench-revenue":
+        result = benchmark_revenue(args.records)
+        if not (result['rollups_consistent'] and all(w['totals_agree'] for w in result['windows'].values())):
+            print(json.dumps(result, indent=2, default=str))
+            return 1
+    elif args.command == "bench-search":
+        result = benchmark_member_search(args.members, args.queries)
+    elif args.command == "export-revenue":
+        db = DatabaseManager(args.db_path)
+        try:
+            result = {'output': args.output, 'rows': RevenueService(db).export_revenue_csv(args.output)}
+        finally:
+            db.close()
+    
+    print(json.dumps(result, indent=2, default=str))
+    return 0
+
 def main():
     """Main application entry point"""
     try:
@@ -1864,29 +7077,6 @@ def main():
         logger.error(f"Application error: {e}")
 
 if __name__ == "__main__":
-    main()("rent_equipment"):
-                    available_equipment = [f"{e['name']} (Available: {e['available']})" for e in equipment if e['available'] > 0]
-                    
-                    if available_equipment:
-                        selected_rent = st.selectbox("Select Equipment", available_equipment)
-                        rent_quantity = st.number_input("Quantity", min_value=1, value=1)
-                        
-                        if st.form_submit_button("Rent Equipment"):
-                            # Extract equipment name
-                            equipment_name = selected_rent.split(" (Available:")[0]
-                            equipment_item = next(e for e in equipment if e['name'] == equipment_name)
-                            
-                            success = self.equipment_service.rent_equipment(equipment_item['id'], rent_quantity)
-                            
-                            if success:
-                                st.success("✅ Equipment rented successfully!")
-                                st.rerun()
-                            else:
-                                st.error("❌ Failed to rent equipment")
-                    else:
-                        st.info("No equipment available for rent")
-            
-            with col2:
-                st.markdown("#### 📥 Return Equipment")
-                
-                with st.form
\ No newline at end of file
+    if len(sys.argv) > 1:
+        sys.exit(run_cli(sys.argv[1:]))
+    main()
@@ -0,0 +1,15 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import sportai_complete as app  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    """Fresh migrated database, removed after the test"""
+    with app.temporary_database() as database:
+        yield database
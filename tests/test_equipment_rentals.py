@@ -0,0 +1,88 @@
+import sportai_complete as app
+
+
+def stock(db, equipment_id: int) -> dict:
+    return db.execute_query('''
+        SELECT e.available, e.rented, COALESCE(SUM(r.quantity), 0) AS open_quantity
+        FROM equipment e
+        LEFT JOIN rentals r ON r.equipment_id = e.id AND r.returned_at IS NULL
+        WHERE e.id = ?
+        GROUP BY e.id
+    ''', (equipment_id,))[0]
+
+
+def add_item(db, available: int) -> int:
+    db.execute_update(
+        "INSERT INTO equipment (name, category, available, rented, daily_rate) VALUES ('Kayak', 'Test', ?, 0, 10)",
+        (available,)
+    )
+    return db.execute_query("SELECT MAX(id) AS id FROM equipment")[0]['id']
+
+
+def test_check_out_never_oversells(db):
+    service = app.EquipmentService(db)
+    item = add_item(db, 3)
+    
+    assert service.check_out(item, None, 2) is not None
+    assert service.check_out(item, None, 2) is None
+    assert stock(db, item) == {'available': 1, 'rented': 2, 'open_quantity': 2}
+
+
+def test_check_in_settles_a_rental_once(db):
+    service = app.EquipmentService(db)
+    item = add_item(db, 3)
+    rental_id = service.check_out(item, None, 2)
+    
+    assert service.check_in(rental_id) == 20.0
+    assert service.check_in(rental_id) is None
+    assert stock(db, item) == {'available': 3, 'rented': 0, 'open_quantity': 0}
+
+
+def test_batch_check_out_is_all_or_nothing(db):
+    service = app.EquipmentService(db)
+    first, second = add_item(db, 5), add_item(db, 1)
+    
+    assert service.check_out_batch({first: 2, second: 2}, None) is None
+    assert stock(db, first)['available'] == 5 and stock(db, second)['available'] == 1
+    
+    rental_ids = service.check_out_batch({first: 2, second: 1}, None)
+    assert len(rental_ids) == 2
+    assert stock(db, first) == {'available': 3, 'rented': 2, 'open_quantity': 2}
+    assert stock(db, second) == {'available': 0, 'rented': 1, 'open_quantity': 1}
+
+
+def test_concurrent_rentals_keep_inventory_consistent():
+    atomic = app.stress_equipment_rentals(threads=8, operations=60, stock=10)['atomic']
+    
+    assert atomic['never_negative']
+    assert atomic['stock_conserved']
+    assert atomic['rented_matches_ledger']
+    assert atomic['failed_check_ins'] == 0
+
+
+def test_counter_api_goes_through_the_ledger(db):
+    service = app.EquipmentService(db)
+    item = add_item(db, 5)
+    
+    assert service.rent_equipment(item, 3)
+    assert not service.rent_equipment(item, 3)
+    assert service.return_equipment(item, 2)
+    assert not service.return_equipment(item, 2)
+    assert stock(db, item) == {'available': 4, 'rented': 1, 'open_quantity': 1}
+    
+    assert service.rent_equipment_batch({item: 4})
+    assert not service.rent_equipment_batch({item: 1})
+    assert stock(db, item) == {'available': 0, 'rented': 5, 'open_quantity': 5}
+
+
+def test_counter_returns_leave_member_rentals_open(db):
+    service = app.EquipmentService(db)
+    item = add_item(db, 4)
+    member_id = db.execute_query("SELECT id FROM members LIMIT 1")[0]['id']
+    rental_id = service.check_out(item, member_id, 2)
+    service.rent_equipment(item, 1)
+    
+    assert not service.return_equipment(item, 2)
+    assert service.return_equipment(item, 1)
+    assert service.check_in(rental_id) is not None
+    assert stock(db, item) == {'available': 4, 'rented': 0, 'open_quantity': 0}
@@ -0,0 +1,151 @@
+import random
+import threading
+import time
+
+import pytest
+
+import sportai_complete as app
+
+
+@pytest.fixture
+def events(db):
+    service = app.EventService(db)
+    yield service
+    service.close()
+
+
+def add_event(db, capacity) -> int:
+    return db.transaction(lambda conn: conn.execute('''
+        INSERT INTO events (name, event_type, start_date, end_date, capacity, registered, price)
+        VALUES ('Youth Soccer Camp', 'Camp', date('now', '+30 days'), date('now', '+35 days'), ?, 0, 150)
+    ''', (capacity,)).lastrowid)
+
+
+def member_ids(db, count: int) -> list:
+    return [row['id'] for row in db.execute_query("SELECT id FROM members ORDER BY id LIMIT ?", (count,))]
+
+
+def statuses(db, event_id: int) -> dict:
+    rows = db.execute_query('''
+        SELECT member_id, status FROM event_registrations
+        WHERE event_id = ? AND status != 'cancelled' ORDER BY id
+    ''', (event_id,))
+    return {row['member_id']: row['status'] for row in rows}
+
+
+def test_full_event_waitlists_in_arrival_order(db, events):
+    event_id = add_event(db, 3)
+    members = member_ids(db, 5)
+    
+    outcomes = [events.register_for_event(event_id, member_id) for member_id in members]
+    
+    assert [o['status'] for o in outcomes] == ['registered'] * 3 + ['waitlisted'] * 2
+    assert [o['waitlist_position'] for o in outcomes[3:]] == [1, 2]
+    assert db.execute_query("SELECT registered FROM events WHERE id = ?", (event_id,))[0]['registered'] == 3
+
+
+def test_repeat_registration_returns_the_original(db, events):
+    event_id = add_event(db, 1)
+    first, second = member_ids(db, 2)
+    events.register_for_event(event_id, first)
+    waitlisted = events.register_for_event(event_id, second)
+    
+    again = events.register_for_event(event_id, second)
+    
+    assert again['duplicate']
+    assert (again['registration_id'], again['status'], again['waitlist_position']) == \
+        (waitlisted['registration_id'], 'waitlisted', 1)
+    assert len(statuses(db, event_id)) == 2
+
+
+def test_cancellation_promotes_the_longest_waiting_member(db, events):
+    event_id = add_event(db, 2)
+    members = member_ids(db, 5)
+    for member_id in members:
+        events.register_for_event(event_id, member_id)
+    
+    assert events.cancel_registration(event_id, members[0])
+    
+    live = statuses(db, event_id)
+    assert [m for m, status in live.items() if status == 'registered'] == [members[1], members[2]]
+    assert [m for m, status in live.items() if status == 'waitlisted'] == [members[3], members[4]]
+    assert db.execute_query("SELECT registered FROM events WHERE id = ?", (event_id,))[0]['registered'] == 2
+
+
+def test_event_without_capacity_is_unlimited(db, events):
+    event_id = add_event(db, None)
+    
+    outcomes = [events.register_for_event(event_id, member_id) for member_id in member_ids(db, 5)]
+    
+    assert {o['status'] for o in outcomes} == {'registered'}
+
+
+def test_seeded_registration_counts_have_roster_rows(db):
+    rows = db.execute_query('''
+        SELECT e.registered, (SELECT COUNT(*) FROM event_registrations r
+                              WHERE r.event_id = e.id AND r.status = 'registered') AS roster
+        FROM events e
+    ''')
+    
+    assert rows and all(row['registered'] == row['roster'] for row in rows)
+
+
+def test_timed_out_registration_is_withdrawn(db, events, monkeypatch):
+    event_id = add_event(db, 10)
+    first, second = member_ids(db, 2)
+    allocate = events.registrations._allocate
+    
+    def slow_allocate(conn, batch):
+        time.sleep(0.3)
+        return allocate(conn, batch)
+    
+    monkeypatch.setattr(events.registrations, '_allocate', slow_allocate)
+    events.registrations.max_wait = 0
+    running = threading.Thread(target=events.register_for_event, args=(event_id, first, 0.05))
+    running.start()
+    time.sleep(0.05)
+    
+    # Queued behind a committing batch: reported as rejected, so it must never be seated
+    assert events.register_for_event(event_id, second, timeout=0.05)['status'] == 'rejected'
+    running.join()
+    events.registrations.stop()
+    
+    assert statuses(db, event_id) == {first: 'registered'}
+
+
+def test_burst_respects_capacity_and_idempotency(db, events):
+    app.seed_benchmark_data(db, members=300, revenue_records=0, bookings=0, audit_logs=0, events=0)
+    capacity = 50
+    event_id = add_event(db, capacity)
+    rng = random.Random(19)
+    members = member_ids(db, 300)
+    requests = [rng.choice(members) for _ in range(600)]
+    outcomes = [None] * len(requests)
+    
+    def client(offset: int):
+        for index in range(offset, len(requests), 20):
+            outcomes[index] = events.register_for_event(event_id, requests[index])
+    
+    clients = [threading.Thread(target=client, args=(i,)) for i in range(20)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    
+    live = statuses(db, event_id)
+    unique = set(requests)
+    assert list(live.values()).count('registered') == capacity
+    assert db.execute_query("SELECT registered FROM events WHERE id = ?", (event_id,))[0]['registered'] == capacity
+    assert set(live) == unique
+    
+    by_member = {}
+    for outcome in outcomes:
+        by_member.setdefault(outcome['member_id'], set()).add(outcome['registration_id'])
+    assert all(len(ids) == 1 for ids in by_member.values())
+    
+    # Seats went to the first arrivals: nobody waitlisted registered before anyone seated
+    order = db.execute_query('''
+        SELECT status FROM event_registrations WHERE event_id = ? ORDER BY id
+    ''', (event_id,))
+    assert [row['status'] for row in order] == ['registered'] * capacity + ['waitlisted'] * (len(unique) - capacity)
+    assert events.registrations.stats()['batches'] < len(requests)
@@ -0,0 +1,52 @@
+import tracemalloc
+
+import sportai_complete as app
+
+QUERY = "SELECT * FROM revenue_records ORDER BY id"
+
+
+def peak_kb(scan) -> tuple:
+    """Rows consumed from scan() and the peak traced memory while doing it"""
+    tracemalloc.start()
+    try:
+        rows = sum(1 for _ in scan())
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return rows, peak / 1024
+
+
+def scan_peaks(size: int, batch_size: int) -> dict:
+    with app.temporary_database() as db:
+        app.seed_benchmark_data(db, members=0, revenue_records=size, bookings=0, audit_logs=0, events=0)
+        return {
+            'fetchall': peak_kb(lambda: db.execute_query(QUERY)),
+            'streaming': peak_kb(lambda: db.iter_query(QUERY, batch_size=batch_size)),
+        }
+
+
+def test_streaming_peak_memory_is_flat_in_table_size():
+    small, large = scan_peaks(2_000, 200), scan_peaks(20_000, 200)
+    
+    assert small['streaming'][0] == 2_000 and large['streaming'][0] == 20_000
+    # Ten times the rows: fetchall grows with the table, the stream stays near one batch
+    assert large['fetchall'][1] > 5 * small['fetchall'][1]
+    assert large['streaming'][1] <= 2 * small['streaming'][1]
+    assert large['streaming'][1] < large['fetchall'][1] / 10
+
+
+def test_iter_query_yields_rows_in_batches_and_releases_connection(db):
+    app.seed_benchmark_data(db, members=0, revenue_records=1_050, bookings=0, audit_logs=0, events=0)
+    expected = db.execute_query("SELECT id FROM revenue_records ORDER BY id")
+    
+    rows = db.iter_query("SELECT id FROM revenue_records ORDER BY id", batch_size=100)
+    assert [row['id'] for row in rows] == [row['id'] for row in expected]
+    
+    # Closing a half-read stream must hand its reader back to the pool
+    stream = db.iter_query(QUERY, batch_size=10)
+    next(stream)
+    checked_out = db.pool_stats()
+    assert checked_out['idle_readers'] < checked_out['open_readers']
+    stream.close()
+    released = db.pool_stats()
+    assert released['idle_readers'] == released['open_readers']